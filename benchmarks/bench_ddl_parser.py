@@ -0,0 +1,150 @@
+"""
+Throughput del parser DDL (tokenizer + recursive descent) contra el parser
+anterior basado en regex.
+
+Uso:
+    python benchmarks/bench_ddl_parser.py [--tables 2000] [--repeat 3] [--style company|pg_dump] [--file schema.sql] [--workers 4]
+
+Sin --file se genera un DDL sintético:
+- company: las tablas de src/ddl/company_employee_schema.ddl repetidas con
+  nombres distintos (ambos parsers deben dar el mismo resultado)
+- pg_dump: estilo pg_dump (tipos de Postgres, funciones, secuencias, COPY
+  con datos, ALTER TABLE ... ADD CONSTRAINT). El parser anterior no entiende
+  todo esto, así que acá sólo se compara la velocidad.
+
+Con --workers N también se mide parse_ddl_text(..., workers=N) (pool de
+procesos, sin el umbral de tamaño mínimo).
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.ddl_parser import parse_ddl_text
+from benchmarks.legacy_ddl_parser import parse_ddl_text as legacy_parse_ddl_text
+
+BASE_DDL = os.path.join(os.path.dirname(__file__), "..", "src", "ddl", "company_employee_schema.ddl")
+
+
+def synthetic_ddl(n_tables: int) -> str:
+    with open(BASE_DDL, "r", encoding="utf-8") as f:
+        base = f.read()
+    names = re.findall(r"CREATE TABLE (\w+)", base)
+
+    chunks = []
+    copies = max(1, n_tables // len(names))
+    for i in range(copies):
+        chunk = base
+        for name in names:
+            chunk = re.sub(rf"\b{name}\b", f"{name}_{i}", chunk)
+        chunks.append(chunk)
+    return "\n".join(chunks)
+
+
+PG_DUMP_TABLE = """--
+-- Name: orders_{i}; Type: TABLE; Schema: public; Owner: app
+--
+
+CREATE TABLE public.orders_{i} (
+    id integer NOT NULL,
+    customer_id integer NOT NULL,
+    status character varying(32) DEFAULT 'pending'::character varying NOT NULL,
+    total numeric(12,2) DEFAULT 0 NOT NULL,
+    notes text,
+    created_at timestamp without time zone DEFAULT now() NOT NULL
+);
+
+
+ALTER TABLE public.orders_{i} OWNER TO app;
+
+CREATE SEQUENCE public.orders_{i}_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+CREATE FUNCTION public.touch_orders_{i}() RETURNS trigger
+    LANGUAGE plpgsql
+    AS $$
+BEGIN
+    NEW.created_at := now(); -- keep 'created_at' in sync; (no-op)
+    RETURN NEW;
+END;
+$$;
+
+COPY public.orders_{i} (id, customer_id, status, total, notes, created_at) FROM stdin;
+{rows}
+\\.
+
+ALTER TABLE ONLY public.orders_{i}
+    ADD CONSTRAINT orders_{i}_pkey PRIMARY KEY (id);
+
+"""
+
+
+def pg_dump_ddl(n_tables: int, rows_per_table: int = 20) -> str:
+    rows = "\n".join(
+        f"{r}\t{r * 7}\tpending\t{r * 1.5:.2f}\tit's a note; with (parens\t2024-01-01 00:00:00"
+        for r in range(1, rows_per_table + 1)
+    )
+    return "SET statement_timeout = 0;\n\n" + "".join(
+        PG_DUMP_TABLE.format(i=i, rows=rows) for i in range(n_tables)
+    )
+
+
+def bench(parse, text: str, repeat: int) -> tuple:
+    best = float("inf")
+    tables = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tables = parse(text)
+        best = min(best, time.perf_counter() - start)
+    return best, tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--style", choices=("company", "pg_dump"), default="company")
+    parser.add_argument("--file", help="DDL a parsear en lugar del sintético")
+    parser.add_argument("--workers", type=int, default=1, help="procesos para el modo paralelo")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            text = f.read()
+    elif args.style == "pg_dump":
+        text = pg_dump_ddl(args.tables)
+    else:
+        text = synthetic_ddl(args.tables)
+
+    size_mb = len(text.encode("utf-8")) / 1e6
+    print(f"DDL: {size_mb:.2f} MB")
+
+    parsers = [("legacy (regex)", legacy_parse_ddl_text), ("tokenizer", parse_ddl_text)]
+    if args.workers > 1:
+        parsers.append((
+            f"{args.workers} workers",
+            lambda text: parse_ddl_text(text, workers=args.workers, min_parallel_size=0),
+        ))
+
+    results = {}
+    for label, parse in parsers:
+        seconds, tables = bench(parse, text, args.repeat)
+        results[label] = tables
+        print(f"{label:>15}: {seconds:8.3f}s  {size_mb / seconds:8.2f} MB/s  {len(tables)} tables")
+
+    same = results["legacy (regex)"] == results["tokenizer"]
+    print(f"Same output: {same}")
+    if args.workers > 1:
+        print(f"Parallel same as sequential: {results[f'{args.workers} workers'] == results['tokenizer']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Carga de un schema grande: JSON (save_schema_json) contra el formato
+binario de schema_converter (save_schema_binary / SchemaFile).
+
+Uso:
+    python benchmarks/bench_schema_format.py [--tables 5000] [--repeat 5]
+
+Mide el tamaño en disco, la carga completa (json.load contra
+load_schema_binary) y la carga de una sola tabla con SchemaFile.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.ddl_parser import parse_ddl_text
+from src.schema_converter import SchemaFile, load_schema_binary, schema_dict_to_binary, schema_to_dict
+from benchmarks.bench_ddl_parser import synthetic_ddl
+
+
+def best_of(repeat: int, fn) -> tuple:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def load_json(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_one_table(path: str, name: str) -> dict:
+    with SchemaFile(path) as schema:
+        return schema.table(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    schema = schema_to_dict(parse_ddl_text(synthetic_ddl(args.tables)))
+    name = list(schema["tables"])[len(schema["tables"]) // 2]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "schema.json")
+        binary_path = os.path.join(tmp, "schema.bin")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(schema, f, indent=2, ensure_ascii=False)
+        with open(binary_path, "wb") as f:
+            f.write(schema_dict_to_binary(schema))
+
+        print(f"{len(schema['tables'])} tables")
+        print(f"{'json size':>18}: {os.path.getsize(json_path) / 1e6:8.2f} MB")
+        print(f"{'binary size':>18}: {os.path.getsize(binary_path) / 1e6:8.2f} MB")
+
+        json_seconds, from_json = best_of(args.repeat, lambda: load_json(json_path))
+        binary_seconds, from_binary = best_of(args.repeat, lambda: load_schema_binary(binary_path))
+        table_seconds, table = best_of(args.repeat, lambda: load_one_table(binary_path, name))
+
+        print(f"{'json.load':>18}: {json_seconds * 1000:8.1f} ms")
+        print(f"{'load_schema_binary':>18}: {binary_seconds * 1000:8.1f} ms")
+        print(f"{'one table (lazy)':>18}: {table_seconds * 1000:8.3f} ms")
+        print(f"Same dict: {from_json == from_binary == schema and table == schema['tables'][name]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Memoria de un catálogo parseado: las clases con __slots__ de src.ddl_parser
+contra el layout anterior (dataclasses con `raw` copiado en cada objeto).
+
+Uso:
+    python benchmarks/bench_schema_memory.py [--tables 6600]
+
+El layout anterior se mide con el parser de benchmarks/legacy_ddl_parser.py
+creando las dataclasses originales (LegacyColumn, ...), que es lo que
+producía el parser antes. Con --tables 6600 son unas 50k columnas.
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.ddl_parser import parse_ddl_text
+from benchmarks import legacy_ddl_parser
+from benchmarks.bench_ddl_parser import synthetic_ddl
+
+
+@dataclass
+class LegacyColumn:
+    name: str
+    raw_type: str
+    not_null: bool = False
+    default: Optional[str] = None
+    is_primary: bool = False
+    is_unique: bool = False
+    auto_increment: bool = False
+    check: Optional[str] = None
+    raw: str = ""
+
+@dataclass
+class LegacyForeignKey:
+    cols: List[str]
+    ref_table: str
+    ref_cols: List[str]
+    raw: str = ""
+
+@dataclass
+class LegacyTable:
+    name: str
+    columns: List[LegacyColumn] = field(default_factory=list)
+    primary_keys: List[str] = field(default_factory=list)
+    foreign_keys: List[LegacyForeignKey] = field(default_factory=list)
+    raw_body: str = ""
+
+
+def parse_legacy_layout(text: str):
+    legacy_ddl_parser.Column = LegacyColumn
+    legacy_ddl_parser.ForeignKey = LegacyForeignKey
+    legacy_ddl_parser.Table = LegacyTable
+    return legacy_ddl_parser.parse_ddl_text(text)
+
+
+def measure(parse, text: str) -> tuple:
+    """(bytes que quedan vivos después de parsear, tablas)."""
+    gc.collect()
+    tracemalloc.start()
+    tables = parse(text)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=6600)
+    args = parser.parse_args()
+
+    text = synthetic_ddl(args.tables)
+    print(f"DDL: {len(text.encode('utf-8')) / 1e6:.2f} MB")
+
+    results = {}
+    for label, parse in (("dataclasses", parse_legacy_layout), ("slots", parse_ddl_text)):
+        size, tables = measure(parse, text)
+        n_columns = sum(len(t.columns) for t in tables)
+        results[label] = size
+        print(f"{label:>12}: {size / 1e6:8.2f} MB  {size / n_columns:6.0f} B/column  {n_columns} columns")
+
+    print(f"Saved: {1 - results['slots'] / results['dataclasses']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
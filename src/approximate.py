@@ -0,0 +1,107 @@
+import math
+from statistics import NormalDist
+
+from src.sql_query_builder import SQLQueryBuilder
+from src.utils.rows import as_tuple
+
+
+class ApproximateAggregator:
+    """
+    Modo aproximado (opt-in) para intents count/aggregate.
+
+    - COUNT sin filtros en Postgres: `pg_class.reltuples` (estadísticas del
+      planner); la cota de error son las filas modificadas desde el último
+      ANALYZE (`n_mod_since_analyze`).
+    - El resto: muestreo de la tabla (`TABLESAMPLE SYSTEM` en Postgres, filtro
+      aleatorio por fila en SQLite) y escalado del resultado. Las cotas son
+      intervalos de confianza normales que asumen filas independientes; con
+      SYSTEM (muestreo por bloques) son optimistas si los datos están
+      agrupados físicamente.
+
+    `build` devuelve (sql, params, plan) y `estimate(plan, rows)` convierte
+    las filas devueltas en [{"group", "estimate", "error_bound"}].
+    """
+
+    def __init__(self, sample_percent: float = 1.0, dialect: str = "postgresql", confidence: float = 0.95):
+        if not 0 < sample_percent <= 100:
+            raise ValueError("sample_percent must be in (0, 100]")
+        if dialect not in ("postgresql", "sqlite"):
+            raise ValueError(f"Unsupported dialect: {dialect}")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be in (0, 1)")
+
+        self.sample_percent = sample_percent
+        self.dialect = dialect
+        self.confidence = confidence
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self._builder = SQLQueryBuilder()
+
+    def build(self, intent: dict) -> tuple:
+        return self._builder.build_approximate(intent, self.sample_percent, self.dialect)
+
+    # -------------------------
+    # Estimates
+    # -------------------------
+
+    def estimate(self, plan: dict, rows) -> list:
+        rows = [as_tuple(r) for r in (rows or [])]
+
+        if plan["method"] in ("reltuples", "max_rowid"):
+            if not rows or rows[0][0] is None or rows[0][0] < 0:
+                return []
+            total, modified = rows[0]
+            bound = int(modified) if modified is not None else None
+            return [{"group": None, "estimate": max(0, int(total)), "error_bound": bound}]
+
+        q = plan["sample_percent"] / 100.0
+        estimates = []
+        for row in rows:
+            group = row[0] if plan["grouped"] else None
+            values = row[1:] if plan["grouped"] else row
+            estimate, bound = self._estimate_values(plan["metric"], values, q)
+            estimates.append({"group": group, "estimate": estimate, "error_bound": bound})
+
+        if not plan["grouped"] and not estimates:
+            estimates.append({"group": None, "estimate": None, "error_bound": None})
+        return estimates
+
+    def describe(self, plan: dict) -> str:
+        """Cómo se obtuvo la estimación, para la explicación."""
+        if plan["method"] == "reltuples":
+            return "from planner statistics; bound = rows modified since last ANALYZE"
+        if plan["method"] == "max_rowid":
+            return "from the table's highest rowid; no error bound"
+        return f"{self.confidence:.0%} confidence, {plan['sample_percent']:g}% sample"
+
+    def _estimate_values(self, metric: str, values: tuple, q: float) -> tuple:
+        if metric in ("min", "max"):
+            # El mínimo/máximo de la muestra no tiene cota estadística útil
+            return _number(values[0]), None
+
+        if metric == "count":
+            n = _number(values[0]) or 0
+            return n / q, self.z * math.sqrt(n * (1 - q)) / q
+
+        _, n, total, total_sq = (_number(v) for v in values)
+        n = n or 0
+        total = total or 0.0
+        total_sq = total_sq or 0.0
+
+        if metric == "sum":
+            return total / q, self.z * math.sqrt((1 - q) * total_sq) / q
+
+        # avg
+        if n == 0:
+            return None, None
+        mean = total / n
+        if n < 2:
+            return mean, None
+        variance = max(0.0, (total_sq - total * total / n) / (n - 1))
+        return mean, self.z * math.sqrt(variance / n)
+
+
+def _number(value):
+    # psycopg2 devuelve Decimal para NUMERIC
+    if value is None:
+        return None
+    return float(value)
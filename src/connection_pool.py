@@ -0,0 +1,278 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    """
+    Pool thread-safe de conexiones DB-API (psycopg2 por defecto).
+
+    - Mantiene entre `min_connections` y `max_connections` conexiones abiertas.
+    - Hace health check de las conexiones inactivas antes de entregarlas.
+    - Descarta las conexiones que quedan rotas después de un error.
+    """
+
+    def __init__(
+        self,
+        connection_factory,
+        min_connections: int = 1,
+        max_connections: int = 10,
+        acquire_timeout: float = 30.0,
+        health_check_interval: float = 30.0,
+        health_check_sql: str = "SELECT 1",
+    ):
+        if min_connections < 0:
+            raise ValueError("min_connections must be >= 0")
+        if max_connections < 1 or max_connections < min_connections:
+            raise ValueError("max_connections must be >= max(1, min_connections)")
+
+        self.connection_factory = connection_factory
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self.health_check_sql = health_check_sql
+
+        self._cond = threading.Condition()
+        self._idle = []       # [(conn, last_used)]
+        self._in_use = set()  # ids de conexiones prestadas
+        self._sessions = {}   # id(conn) -> dict de estado por conexión
+        self._size = 0
+        self._opened = False
+        self._closed = False
+
+        self._stats = {
+            "created": 0,
+            "discarded": 0,
+            "acquired": 0,
+            "released": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "health_checks": 0,
+            "health_check_failures": 0,
+            "resets": 0,
+        }
+
+    # -------------------------
+    # Public API
+    # -------------------------
+
+    @contextmanager
+    def connection(self):
+        """
+        Presta una conexión. Si el bloque falla la conexión se resetea
+        (rollback) o se descarta si quedó inutilizable. También cubre
+        GeneratorExit, para generadores que se cierran a mitad de camino.
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+        except BaseException:
+            self.release(conn, broken=not self._reset(conn))
+            raise
+        else:
+            self.release(conn)
+
+    def acquire(self, timeout: float = None):
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        self._fill_to_min()
+
+        # El health check y el close pueden tardar (van al servidor), así
+        # que se hacen fuera del lock con la conexión ya sacada de `_idle`.
+        while True:
+            with self._cond:
+                entry = self._take_idle(timeout, deadline)
+            if entry is None:
+                break
+            conn, last_used = entry
+            if self._is_healthy(conn, last_used):
+                with self._cond:
+                    if not self._closed:
+                        return self._checkout(conn)
+            self._discard(conn)
+
+        conn = self._create_reserved()
+        with self._cond:
+            return self._checkout(conn)
+
+    def release(self, conn, broken: bool = False) -> None:
+        with self._cond:
+            if id(conn) not in self._in_use:
+                return
+            self._in_use.discard(id(conn))
+            self._stats["released"] += 1
+
+            discard = broken or self._closed or _is_closed(conn)
+            if discard:
+                self._forget(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+
+            self._cond.notify()
+
+        if discard:
+            _close_quietly(conn)
+
+    def session_state(self, conn) -> dict:
+        """
+        Estado asociado a una conexión física (por ejemplo prepared statements).
+        Se pierde cuando la conexión se descarta.
+        """
+        with self._cond:
+            return self._sessions.setdefault(id(conn), {})
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "min_connections": self.min_connections,
+                "max_connections": self.max_connections,
+                **self._stats,
+            }
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            for conn in idle:
+                self._forget(conn)
+            self._cond.notify_all()
+
+        for conn in idle:
+            _close_quietly(conn)
+
+    # -------------------------
+    # Internals
+    # -------------------------
+
+    def _fill_to_min(self) -> None:
+        with self._cond:
+            if self._opened:
+                return
+            self._opened = True
+            missing = max(0, self.min_connections - self._size)
+            self._size += missing
+
+        # Los lugares se reservan juntos; si una conexión falla se liberan
+        # los que faltan y el próximo acquire vuelve a intentar el llenado.
+        for created in range(missing):
+            try:
+                conn = self._create_reserved()
+            except Exception:
+                with self._cond:
+                    self._size -= missing - created - 1
+                    self._opened = False
+                    self._cond.notify_all()
+                raise
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    def _take_idle(self, timeout: float, deadline: float):
+        """
+        Con el lock tomado: saca una conexión inactiva ((conn, last_used)) o
+        reserva un lugar en `_size` para abrir una nueva (None). Espera si
+        el pool está lleno.
+        """
+        while True:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+
+            if self._idle:
+                return self._idle.pop()
+
+            if self._size < self.max_connections:
+                self._size += 1
+                return None
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._stats["timeouts"] += 1
+                raise RuntimeError(
+                    f"Timed out after {timeout}s waiting for a connection "
+                    f"(max_connections={self.max_connections})"
+                )
+            self._stats["waits"] += 1
+            self._cond.wait(remaining)
+
+    def _create_reserved(self):
+        """Abre una conexión para un lugar ya reservado en `_size`."""
+        try:
+            conn = self.connection_factory()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats["created"] += 1
+        return conn
+
+    def _checkout(self, conn):
+        self._in_use.add(id(conn))
+        self._stats["acquired"] += 1
+        return conn
+
+    def _discard(self, conn) -> None:
+        """Saca del pool una conexión que no está en `_idle` y la cierra (sin el lock)."""
+        with self._cond:
+            self._forget(conn)
+        _close_quietly(conn)
+
+    def _forget(self, conn) -> None:
+        """Con el lock tomado: deja de contar la conexión y libera su lugar."""
+        self._size -= 1
+        self._stats["discarded"] += 1
+        self._sessions.pop(id(conn), None)
+        self._cond.notify()
+
+    def _is_healthy(self, conn, last_used: float) -> bool:
+        """Se llama sin el lock: el SELECT 1 puede tardar lo que tarde el servidor."""
+        if _is_closed(conn):
+            return False
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+
+        with self._cond:
+            self._stats["health_checks"] += 1
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(self.health_check_sql)
+            finally:
+                cursor.close()
+            conn.rollback()
+            return True
+        except Exception:
+            with self._cond:
+                self._stats["health_check_failures"] += 1
+            return False
+
+    def _reset(self, conn) -> bool:
+        """Rollback tras un error. Devuelve False si la conexión no es reutilizable."""
+        with self._cond:
+            self._stats["resets"] += 1
+        if _is_closed(conn):
+            return False
+        try:
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+
+def _close_quietly(conn) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def _is_closed(conn) -> bool:
+    # psycopg2 expone `closed` como entero (0 = abierta)
+    closed = getattr(conn, "closed", 0)
+    return isinstance(closed, (bool, int)) and bool(closed)
@@ -0,0 +1,198 @@
+import json
+import re
+
+AGGREGATE_RE = re.compile(r"\b(COUNT|SUM|AVG|MIN|MAX)\s*\(|\bGROUP\s+BY\b", re.IGNORECASE)
+SINGLE_TABLE_RE = re.compile(
+    r"\bFROM\s+([A-Za-z_][A-Za-z0-9_.]*)(?=\s*(?:WHERE\b|LIMIT\b|ORDER\b|;|$))",
+    re.IGNORECASE,
+)
+JOIN_RE = re.compile(r"\bJOIN\b|\bFROM\b[^;]*\bFROM\b", re.IGNORECASE)
+# LIMIT final de la consulta: "LIMIT n", "LIMIT n OFFSET m" o "LIMIT m, n" (SQLite)
+OUTER_LIMIT_RE = re.compile(
+    r"\bLIMIT\s+(\d+)(?:\s*,\s*(\d+)|\s+OFFSET\s+\d+)?\s*;?\s*$",
+    re.IGNORECASE,
+)
+
+
+class CostGuard:
+    """
+    Chequeo previo (pre-flight) basado en EXPLAIN.
+
+    A partir de las estimaciones del planner decide si una consulta:
+      - "allow": se ejecuta tal cual
+      - "limit": se reescribe con LIMIT (y muestreo si está configurado)
+      - "reject": no se ejecuta
+
+    Un COUNT / agregado que sólo se pasa de max_cost se permite con
+    "warning": True y el motivo en "reason" (un LIMIT sobre su resultado no
+    baja el costo: el recorrido es el mismo).
+
+    max_rows / max_cost: por encima de estos valores se limita la consulta
+    reject_cost: por encima de este costo se rechaza directamente
+    row_limit: LIMIT aplicado al reescribir (por defecto max_rows)
+    sample_percent: porcentaje de muestreo para SELECTs de una sola tabla
+    """
+
+    def __init__(
+        self,
+        max_rows: int = 10000,
+        max_cost: float = None,
+        reject_cost: float = None,
+        row_limit: int = None,
+        sample_percent: float = None,
+    ):
+        if sample_percent is not None and not 0 < sample_percent <= 100:
+            raise ValueError("sample_percent must be in (0, 100]")
+
+        self.max_rows = max_rows
+        self.max_cost = max_cost
+        self.reject_cost = reject_cost
+        self.row_limit = row_limit or max_rows
+        self.sample_percent = sample_percent
+
+    def evaluate(self, sql: str, estimate: dict, dialect: str = "postgresql") -> dict:
+        """
+        estimate: {"estimated_rows": int|None, "estimated_cost": float|None}
+        Devuelve la decisión con las estimaciones y el SQL a ejecutar.
+        """
+        rows = estimate.get("estimated_rows")
+        cost = estimate.get("estimated_cost")
+        decision = {
+            "action": "allow",
+            "estimated_rows": rows,
+            "estimated_cost": cost,
+            "reason": None,
+            "sql": sql,
+        }
+
+        if rows is None and cost is None:
+            decision["reason"] = "No cost estimate available."
+            return decision
+
+        if self.reject_cost is not None and cost is not None and cost > self.reject_cost:
+            decision["action"] = "reject"
+            decision["sql"] = None
+            decision["reason"] = (
+                f"Query rejected: estimated cost {cost:,.0f} exceeds the limit of {self.reject_cost:,.0f}."
+            )
+            return decision
+
+        too_many_rows = self.max_rows is not None and rows is not None and rows > self.max_rows
+        too_costly = self.max_cost is not None and cost is not None and cost > self.max_cost
+        if not (too_many_rows or too_costly):
+            return decision
+
+        if not too_many_rows and AGGREGATE_RE.search(sql):
+            decision["warning"] = True
+            decision["reason"] = (
+                f"Expensive query: estimated cost {cost:,.0f} exceeds {self.max_cost:,.0f}."
+            )
+            return decision
+
+        decision["action"] = "limit"
+        decision["sql"], sampled = self._rewrite(sql, dialect)
+
+        what = f"~{rows:,} rows" if too_many_rows else f"estimated cost {cost:,.0f}"
+        reason = f"Output truncated to {self.row_limit:,} rows: query would return {what}."
+        if sampled:
+            reason += f" Rows come from a {self.sample_percent:g}% sample of the table."
+        decision["reason"] = reason
+        decision["sampled"] = sampled
+        return decision
+
+    # -------------------------
+    # Rewrites
+    # -------------------------
+
+    def _rewrite(self, sql: str, dialect: str) -> tuple:
+        inner = sql.strip().rstrip(";").strip()
+        sampled = False
+
+        if self.sample_percent and self._is_sampleable(inner):
+            if dialect == "postgresql":
+                inner = SINGLE_TABLE_RE.sub(
+                    lambda m: f"FROM {m.group(1)} TABLESAMPLE SYSTEM ({self.sample_percent:g})",
+                    inner,
+                    count=1,
+                )
+            else:
+                # SQLite no tiene TABLESAMPLE: muestreo Bernoulli por fila
+                inner = (
+                    f"SELECT * FROM ({inner}) AS sampled "
+                    f"WHERE abs(random()) % 10000 < {int(self.sample_percent * 100)}"
+                )
+            sampled = True
+
+        return f"SELECT * FROM ({inner}) AS guarded LIMIT {int(self.row_limit)};", sampled
+
+    def _is_sampleable(self, sql: str) -> bool:
+        # Muestrear un agregado cambiaría su resultado: sólo SELECTs simples
+        if AGGREGATE_RE.search(sql) or JOIN_RE.search(sql):
+            return False
+        return bool(SINGLE_TABLE_RE.search(sql))
+
+
+# -------------------------
+# EXPLAIN parsers
+# -------------------------
+
+def parse_postgres_explain(explain_rows) -> dict:
+    """
+    explain_rows: resultado de `EXPLAIN (FORMAT JSON) ...` (una fila, una columna).
+    """
+    value = explain_rows[0]
+    value = list(value.values())[0] if isinstance(value, dict) else value[0]
+    if isinstance(value, str):
+        value = json.loads(value)
+
+    plan = value[0]["Plan"]
+    return {
+        "estimated_rows": int(plan.get("Plan Rows", 0)),
+        "estimated_cost": float(plan.get("Total Cost", 0.0)),
+    }
+
+
+SQLITE_SCAN_RE = re.compile(r"^SCAN\s+(?:TABLE\s+)?([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+SQLITE_SEARCH_RE = re.compile(r"^SEARCH\s+(?:TABLE\s+)?([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+
+def estimate_sqlite_plan(conn, sql: str) -> dict:
+    """
+    SQLite no da estimaciones de filas en EXPLAIN QUERY PLAN: para cada tabla
+    recorrida completa (SCAN) se usa MAX(rowid) como tamaño estimado. Las
+    búsquedas por índice (SEARCH) se consideran baratas.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+    details = [row[-1] for row in cursor.fetchall()]
+
+    scanned = []
+    for detail in details:
+        m = SQLITE_SCAN_RE.match(detail)
+        if m:
+            scanned.append(m.group(1))
+
+    if not scanned and not any(SQLITE_SEARCH_RE.match(d) for d in details):
+        return {"estimated_rows": None, "estimated_cost": None}
+
+    sizes = []
+    for table in scanned:
+        try:
+            cursor.execute(f'SELECT MAX(rowid) FROM "{table}"')
+            sizes.append(cursor.fetchone()[0] or 0)
+        except Exception:
+            # WITHOUT ROWID o subconsulta materializada: sin estimación
+            continue
+
+    rows = max(sizes) if sizes else 0
+    if AGGREGATE_RE.search(sql) and not re.search(r"\bGROUP\s+BY\b", sql, re.IGNORECASE):
+        rows = 1
+
+    # el planner de Postgres ya tiene en cuenta el LIMIT; acá hay que hacerlo a mano
+    limit = OUTER_LIMIT_RE.search(sql.strip())
+    if limit:
+        rows = min(rows, int(limit.group(2) or limit.group(1)))
+
+    return {
+        "estimated_rows": rows,
+        "estimated_cost": float(sum(sizes)),
+    }
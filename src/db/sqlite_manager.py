@@ -62,4 +62,20 @@ def run_query(sql: str):
 
     connection.close()
 
-    return df
\ No newline at end of file
+    return df
+
+def apply_migration(statements: list):
+    """
+    Runs schema migration statements (see schema_diff.sqlite_migration)
+    in a single transaction.
+    """
+    if not statements:
+        return
+
+    connection = get_connection()
+    try:
+        with connection:
+            for statement in statements:
+                connection.execute(statement)
+    finally:
+        connection.close()
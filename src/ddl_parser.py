@@ -1,134 +1,647 @@
-from dataclasses import dataclass, field
-from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+import os
 import re
+import sys
 
-@dataclass
-class Column:
-    name: str
-    raw_type: str
-    not_null: bool = False
-    default: Optional[str] = None
-    is_primary: bool = False
-    is_unique: bool = False
-    auto_increment: bool = False
-    check: Optional[str] = None
-    raw: str = ""
+# Subirlo cuando cambie el resultado del parser (invalida SchemaCache)
+PARSER_VERSION = 3
 
-@dataclass
-class ForeignKey:
-    cols: List[str]
-    ref_table: str
-    ref_cols: List[str]
-    raw: str = ""
+# -------------------------
+# Schema objects
+# -------------------------
+# Clases con __slots__ (sin __dict__ por instancia). Los booleanos de Column
+# van en un entero de flags, nombres y tipos se internan (se repiten mucho
+# entre tablas) y `raw` es un rango dentro de un texto compartido: el
+# parser usa el Table.raw_body de la tabla, así que el DDL no queda copiado
+# una vez por columna. Constructor, atributos, == y repr son los mismos que
+# cuando eran dataclasses.
 
-@dataclass
-class Table:
-    name: str
-    columns: List[Column] = field(default_factory=list)
-    primary_keys: List[str] = field(default_factory=list)
-    foreign_keys: List[ForeignKey] = field(default_factory=list)
-    raw_body: str = ""
-
-# Helper regexes
-CREATE_TABLE_RE = re.compile(r"CREATE\s+TABLE\s+([^\s(]+)\s*\((.*?)\)\s*;", flags=re.IGNORECASE | re.DOTALL)
-FK_TABLELEVEL_RE = re.compile(r"FOREIGN\s+KEY\s*\(([^)]+)\)\s*REFERENCES\s+([^\s(]+)\s*\(([^)]+)\)", flags=re.IGNORECASE)
-PK_TABLELEVEL_RE = re.compile(r"PRIMARY\s+KEY\s*\(([^)]+)\)", flags=re.IGNORECASE)
-DEFAULT_RE = re.compile(r"\bDEFAULT\s+(('([^']*)')|(\"([^\"]*)\")|([^\s,]+))", flags=re.IGNORECASE)
-NOT_NULL_RE = re.compile(r"\bNOT\s+NULL\b", flags=re.IGNORECASE)
-UNIQUE_RE = re.compile(r"\bUNIQUE\b", flags=re.IGNORECASE)
-INLINE_PK_RE = re.compile(r"\bPRIMARY\b", flags=re.IGNORECASE)
-AUTO_INC_RE = re.compile(r"\bAUTO_INCREMENT\b", flags=re.IGNORECASE)
-CHECK_RE = re.compile(r"^\s*CHECK\s*\(", flags=re.IGNORECASE)
-
-def _split_columns_block(body: str) -> List[str]:
+NOT_NULL = 1
+PRIMARY = 2
+UNIQUE = 4
+AUTO_INCREMENT = 8
+
+def _flag(bit: int) -> property:
+    def get(self) -> bool:
+        return bool(self._flags & bit)
+
+    def set(self, value: bool):
+        self._flags = self._flags | bit if value else self._flags & ~bit
+
+    return property(get, set)
+
+class _SchemaObject:
+    __slots__ = ()
+    _fields = ()  # campos públicos, en el orden de la dataclass original
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self._fields)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{f}={getattr(self, f)!r}" for f in self._fields)
+        return f"{self.__class__.__name__}({args})"
+
+class _RawText(_SchemaObject):
+    __slots__ = ("_source", "_raw_start", "_raw_end")
+
+    @property
+    def raw(self) -> str:
+        return self._source[self._raw_start:self._raw_end]
+
+    @raw.setter
+    def raw(self, value: str):
+        self._source, self._raw_start, self._raw_end = value, 0, len(value)
+
+    def _set_raw_span(self, source: str, start: int, end: int):
+        self._source, self._raw_start, self._raw_end = source, start, end
+
+class Column(_RawText):
+    __slots__ = ("name", "raw_type", "default", "check", "_flags")
+    _fields = ("name", "raw_type", "not_null", "default", "is_primary", "is_unique", "auto_increment", "check", "raw")
+
+    def __init__(
+        self,
+        name: str,
+        raw_type: str,
+        not_null: bool = False,
+        default: Optional[str] = None,
+        is_primary: bool = False,
+        is_unique: bool = False,
+        auto_increment: bool = False,
+        check: Optional[str] = None,
+        raw: str = "",
+    ):
+        self.name = sys.intern(name)
+        self.raw_type = sys.intern(raw_type)
+        self.default = default
+        self.check = check
+        self._flags = (
+            (NOT_NULL if not_null else 0)
+            | (PRIMARY if is_primary else 0)
+            | (UNIQUE if is_unique else 0)
+            | (AUTO_INCREMENT if auto_increment else 0)
+        )
+        self.raw = raw
+
+    not_null = _flag(NOT_NULL)
+    is_primary = _flag(PRIMARY)
+    is_unique = _flag(UNIQUE)
+    auto_increment = _flag(AUTO_INCREMENT)
+
+class ForeignKey(_RawText):
+    __slots__ = ("cols", "ref_table", "ref_cols")
+    _fields = ("cols", "ref_table", "ref_cols", "raw")
+
+    def __init__(self, cols: List[str], ref_table: str, ref_cols: List[str], raw: str = ""):
+        self.cols = cols
+        self.ref_table = sys.intern(ref_table)
+        self.ref_cols = ref_cols
+        self.raw = raw
+
+class Table(_SchemaObject):
+    __slots__ = ("name", "columns", "primary_keys", "foreign_keys", "raw_body")
+    _fields = __slots__
+
+    def __init__(
+        self,
+        name: str,
+        columns: Optional[List[Column]] = None,
+        primary_keys: Optional[List[str]] = None,
+        foreign_keys: Optional[List[ForeignKey]] = None,
+        raw_body: str = "",
+    ):
+        self.name = name
+        self.columns = [] if columns is None else columns
+        self.primary_keys = [] if primary_keys is None else primary_keys
+        self.foreign_keys = [] if foreign_keys is None else foreign_keys
+        self.raw_body = raw_body
+
+# -------------------------
+# Tokenizer
+# -------------------------
+
+# Un token por match, sin backtracking: strings, identificadores entre
+# comillas y comentarios de bloque sin cerrar se consumen hasta el final.
+TOKEN_RE = re.compile(
+    r"""\s*(?:
+        (?P<word>[^\W\d][\w$]*)
+      | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)
+      | (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+      | (?P<string>'[^']*(?:''[^']*)*'?)
+      | (?P<qident>"[^"]*(?:""[^"]*)*"?|`[^`]*`?)
+      | (?P<dollar>\$(?:[^\W\d]\w*)?\$)
+      | (?P<punct>::|\S)
+    )""",
+    flags=re.VERBOSE | re.DOTALL,
+)
+
+# grupo de TOKEN_RE (m.lastindex) -> tipo de token
+TOKEN_KINDS = (None, "word", "number", "comment", "string", "qident", "dollar", "punct")
+
+# Una sentencia hasta su ';' (sin incluirlo), respetando strings,
+# comentarios y $$...$$. Es una sola llamada a match: los tramos sin
+# comillas se consumen de a bloques, no de a token.
+STATEMENT_RE = re.compile(
+    r"""(?:
+        [^;'"`$\-/]+
+      | '[^']*(?:''[^']*)*'?
+      | "[^"]*(?:""[^"]*)*"?
+      | `[^`]*`?
+      | --[^\n]*
+      | /\*.*?(?:\*/|\Z)
+      | \$\$.*?(?:\$\$|\Z)
+      | \$(?P<tag>[^\W\d]\w*)\$.*?(?:\$(?P=tag)\$|\Z)
+      | [-/$]
+    )*""",
+    flags=re.VERBOSE | re.DOTALL,
+)
+
+# Comienzo de las únicas sentencias que se tokenizan; el resto se saltea
+STATEMENT_HEAD_RE = re.compile(
+    r"""(?:\s+|--[^\n]*|/\*.*?(?:\*/|\Z))*
+    (?:
+        (?P<create>CREATE\s+(?:(?:GLOBAL|LOCAL|TEMP|TEMPORARY|UNLOGGED)\s+)*TABLE\b)
+      | (?P<alter>ALTER\s+TABLE\b)
+      | (?P<copy>COPY\b)
+    )?""",
+    flags=re.VERBOSE | re.DOTALL | re.IGNORECASE,
+)
+
+# COPY ... FROM stdin: los datos siguen a la sentencia, hasta "\\."
+COPY_STDIN_RE = re.compile(r"\bFROM\s+STDIN\s*$", flags=re.IGNORECASE)
+
+# Palabras que terminan el tipo de una columna (y el DEFAULT)
+CONSTRAINT_WORDS = {
+    "NOT", "NULL", "DEFAULT", "PRIMARY", "UNIQUE", "CHECK", "REFERENCES",
+    "CONSTRAINT", "AUTO_INCREMENT", "AUTOINCREMENT", "COLLATE", "GENERATED",
+    "ON", "COMMENT",
+}
+# Ítems del cuerpo que no son columnas y no se guardan
+IGNORED_ITEMS = {"CHECK", "UNIQUE", "KEY", "INDEX", "EXCLUDE", "FULLTEXT", "SPATIAL", "LIKE"}
+
+def _tokenize(text: str, start: int, end: int) -> tuple:
     """
-    Divide el cuerpo del CREATE TABLE en ítems separados por comas,
-    pero evita cortar dentro de paréntesis o dentro de comillas simples/dobles.
-    Maneja correctamente ENUM('A','B'), CHECK(...) y DEFAULT 'x,y'.
+    Tokens de text[start:end] como (tipo, inicio, fin, clave); `clave` es la
+    palabra en mayúsculas o el signo de puntuación (None para el resto).
+    Devuelve (tokens, comentarios), con los comentarios como (inicio, fin).
     """
-    items = []
-    current = []
-    depth = 0
-    in_single_quote = False
-    in_double_quote = False
-
-    for ch in body:
-        if ch == "'" and not in_double_quote:
-            in_single_quote = not in_single_quote
-            current.append(ch)
-        elif ch == '"' and not in_single_quote:
-            in_double_quote = not in_double_quote
-            current.append(ch)
-        elif ch == "(" and not in_single_quote and not in_double_quote:
-            depth += 1
-            current.append(ch)
-        elif ch == ")" and not in_single_quote and not in_double_quote:
-            depth = max(0, depth - 1)
-            current.append(ch)
-        elif ch == "," and depth == 0 and not in_single_quote and not in_double_quote:
-            item = "".join(current).strip()
-            if item:
-                items.append(item)
-            current = []
+    tokens = []
+    comments = []
+    append = tokens.append
+    pos = start
+    while pos < end:
+        for m in TOKEN_RE.finditer(text, pos, end):
+            index = m.lastindex
+            s, e = m.span(index)
+            if index == 1:
+                append(("word", s, e, text[s:e].upper()))
+            elif index == 7:
+                append(("punct", s, e, text[s:e]))
+            elif index == 3:
+                comments.append((s, e))
+            elif index == 6:
+                # $tag$ ... $tag$: un solo token, se sigue después del cierre
+                close = text.find(text[s:e], e, end)
+                pos = end if close < 0 else close + (e - s)
+                append(("string", s, pos, None))
+                break
+            else:
+                append((TOKEN_KINDS[index], s, e, None))
         else:
-            current.append(ch)
+            break
+    return tokens, comments
 
-    last = "".join(current).strip()
-    if last:
-        items.append(last)
+# -------------------------
+# Parser
+# -------------------------
 
-    # Filtrar líneas vacías o comentarios completos
-    return [it.strip().rstrip(",") for it in items if it.strip() and not it.strip().startswith("--")]
-
-def _extract_type(rest: str) -> (str, str):
+class _Parser:
     """
-    Dado el resto de la definición (después del nombre), extrae el tipo completo
-    (ej 'VARCHAR(255)', 'ENUM('a','b')', 'DECIMAL(10,2)', 'INT', 'TEXT') y devuelve
-    (tipo, restante_constraints).
-    Maneja paréntesis y comillas dentro del paréntesis.
+    Parser recursivo descendente. Recorre el texto de a sentencias
+    (STATEMENT_RE); sólo CREATE TABLE, ALTER TABLE y COPY se tokenizan.
+
+    `scan` se puede llamar varias veces sobre un buffer que va creciendo
+    (ver iter_ddl_file): las tablas ya vistas se recuerdan para los
+    ALTER TABLE posteriores.
     """
-    rest = rest.strip()
-    if not rest:
-        return "", ""
-    # Si comienza con un identificador seguido de paréntesis, extraer hasta paréntesis emparejado
-    m = re.match(r"^([A-Za-z_][A-Za-z0-9_]*)\s*(\()", rest)
-    if m:
-        typename = m.group(1)
-        # encontrar el cierre correspondiente desde m.start(2)
-        start_idx = m.start(2)  # position of '('
-        i = start_idx
+
+    def __init__(self, text: str = ""):
+        self.text = text
+        self.by_name = {}
+        self._in_copy = False  # a mitad de los datos de un COPY ... FROM stdin
+        # texto al que apuntan los `raw` que se están creando (ver _with_raw)
+        self._source = text
+        self._base = 0
+        # si es una lista, los ALTER TABLE de tablas que todavía no se vieron
+        # se guardan acá (texto de la sentencia) en lugar de ignorarse
+        self.pending_alters = None
+
+    def parse(self) -> List[Table]:
+        return self.scan(self.text)[0]
+
+    def scan(self, text: str, final: bool = True) -> tuple:
+        """
+        Parsea las sentencias completas de `text`. Devuelve (tablas nuevas,
+        posición hasta la que se consumió el texto). Con final=False la
+        última sentencia sin ';' (o un COPY sin su "\\.") queda pendiente.
+        """
+        self.text = text
+        tables = []
+        pos = 0
+
+        if self._in_copy:
+            pos = self._skip_copy_data(text, pos, final)
+            if self._in_copy:
+                return tables, pos
+
+        while pos < len(text):
+            head = STATEMENT_HEAD_RE.match(text, pos)
+            end = STATEMENT_RE.match(text, head.end()).end()
+            if end >= len(text) and not final:
+                break  # falta el resto de la sentencia
+
+            if head.group("create"):
+                table = self._parse_create(*_tokenize(text, head.end(), end))
+                if table is not None:
+                    tables.append(table)
+            elif head.group("alter"):
+                applied = self._parse_alter(_tokenize(text, head.end(), end)[0])
+                if not applied and self.pending_alters is not None:
+                    self.pending_alters.append(text[head.end():end])
+            elif head.group("copy"):
+                if COPY_STDIN_RE.search(text, head.end(), end) and end < len(text):
+                    self._in_copy = True
+                    end = self._skip_copy_data(text, end, final)
+                    if self._in_copy:
+                        return tables, end
+
+            pos = end + 1  # ';'
+        return tables, min(pos, len(text))
+
+    def _skip_copy_data(self, text: str, pos: int, final: bool) -> int:
+        end = _copy_data_end(text, pos, final)
+        if end >= 0:
+            self._in_copy = False
+            return end
+        # los datos se descartan; se guarda sólo la última línea incompleta
+        return max(pos, text.rfind("\n", pos))
+
+    # --- sentencias ---
+
+    def _parse_create(self, tokens: list, comments: list):
+        # [IF NOT EXISTS] nombre ( ítems ) [opciones]
+        i = 3 if _key(tokens, 0) == "IF" else 0
+        name, i = self._name_at(tokens, i)
+        if not name or _key(tokens, i) != "(":
+            return None
+
+        items = []
         depth = 0
-        in_single = False
-        in_double = False
-        while i < len(rest):
-            ch = rest[i]
-            if ch == "'" and not in_double:
-                in_single = not in_single
-            elif ch == '"' and not in_single:
-                in_double = not in_double
-            elif ch == "(" and not in_single and not in_double:
+        start = i + 1
+        close = len(tokens)
+        for j in range(start, len(tokens)):
+            key = tokens[j][3]
+            if key == "(":
                 depth += 1
-            elif ch == ")" and not in_single and not in_double:
-                depth -= 1
+            elif key == ")":
                 if depth == 0:
-                    # include closing paren
-                    type_str = rest[:i+1].strip()
-                    remaining = rest[i+1:].strip()
-                    return type_str, remaining
+                    close = j
+                    break
+                depth -= 1
+            elif key == "," and depth == 0:
+                items.append((start, j))
+                start = j + 1
+        items.append((start, close))
+
+        body_start = tokens[i][2]
+        body_end = tokens[close][1] if close < len(tokens) else (tokens[-1][2] if tokens else body_start)
+        body = self.text[body_start:body_end]
+        table = Table(name=name, raw_body=body.strip())
+        # los `raw` de columnas y FKs son rangos dentro de raw_body
+        self._source = table.raw_body
+        self._base = body_start + len(body) - len(body.lstrip())
+
+        c = 0  # próximo comentario sin asignar (ambas listas están ordenadas)
+        for n, (a, b) in enumerate(items):
+            if a == b:
+                continue
+            column = self._parse_item(table, tokens[a:b])
+            next_start = tokens[items[n + 1][0]][1] if n + 1 < len(items) and items[n + 1][0] < len(tokens) else body_end
+            while c < len(comments) and comments[c][0] < next_start:
+                if column is not None:
+                    self._attach_comment(table, column, tokens[a][1], tokens[b - 1][2], comments[c])
+                c += 1
+
+        self.by_name[table.name] = table
+        return table
+
+    def _parse_alter(self, tokens: list) -> bool:
+        """
+        [IF EXISTS] [ONLY] t ADD [CONSTRAINT c] PRIMARY KEY / FOREIGN KEY ...
+        Devuelve False si es un ADD sobre una tabla que todavía no se vio.
+        """
+        i = 2 if _key(tokens, 0) == "IF" else 0
+        if _key(tokens, i) == "ONLY":
             i += 1
-        # si no empareja, fallback: toma hasta primer espacio
-        parts = rest.split(None, 1)
-        if len(parts) == 1:
-            return parts[0], ""
-        else:
-            return parts[0], parts[1]
-    else:
-        # tipo sin paréntesis: toma la primera palabra como tipo
-        parts = rest.split(None, 1)
-        if len(parts) == 1:
-            return parts[0], ""
+        name, i = self._name_at(tokens, i)
+        if _key(tokens, i) != "ADD" or i + 1 >= len(tokens):
+            return True
+        table = self.by_name.get(name)
+        if table is None:
+            return False
+        self._base = tokens[i + 1][1]
+        self._source = self.text[self._base:tokens[-1][2]]
+        self._parse_constraint_item(table, tokens[i + 1:])
+        return True
+
+    # --- ítems del CREATE TABLE ---
+
+    def _parse_item(self, table: Table, tokens: list) -> Optional[Column]:
+        """Agrega el ítem a `table`. Devuelve la columna, si lo era."""
+        if self._parse_constraint_item(table, tokens):
+            return None
+        if tokens[0][3] in IGNORED_ITEMS:
+            return None
+
+        column = self._parse_column(tokens, table) if len(tokens) > 1 else None
+        if column is None:
+            # no parece una columna: se guarda tal cual para revisarlo a mano
+            column = Column(name=f"_raw_{len(table.columns)+1}", raw_type="")
+            table.columns.append(self._with_raw(column, tokens))
+            return None
+
+        table.columns.append(column)
+        if column.is_primary and column.name not in table.primary_keys:
+            table.primary_keys.append(column.name)
+        return column
+
+    def _parse_constraint_item(self, table: Table, tokens: list) -> bool:
+        """PRIMARY KEY (...) / FOREIGN KEY (...) REFERENCES ... (con o sin CONSTRAINT)."""
+        i = 2 if tokens[0][3] == "CONSTRAINT" else 0
+        word = _key(tokens, i)
+
+        if word == "PRIMARY" and _key(tokens, i + 1) == "KEY":
+            cols, _ = self._ident_list(tokens, i + 2)
+            for col in cols:
+                if col not in table.primary_keys:
+                    table.primary_keys.append(col)
+            return True
+
+        if word == "FOREIGN" and _key(tokens, i + 1) == "KEY":
+            cols, i = self._ident_list(tokens, i + 2)
+            if _key(tokens, i) == "REFERENCES":
+                ref_table, i = self._name_at(tokens, i + 1)
+                ref_cols, _ = self._ident_list(tokens, i)
+                fk = ForeignKey(cols=cols, ref_table=ref_table, ref_cols=ref_cols)
+                table.foreign_keys.append(self._with_raw(fk, tokens))
+            return True
+
+        return i > 0  # CONSTRAINT x UNIQUE/CHECK/...: se ignora
+
+    def _parse_column(self, tokens: list, table: Table) -> Optional[Column]:
+        if tokens[0][0] not in ("word", "qident"):
+            return None
+        name = self._ident(tokens[0])
+
+        # tipo: palabras (DOUBLE PRECISION, character varying), (...), [], .
+        i = 1
+        type_start = tokens[1][1]
+        type_end = type_start
+        while i < len(tokens):
+            kind, _, end, key = tokens[i]
+            if (kind == "word" and key not in CONSTRAINT_WORDS) or kind == "qident" or key in (".", "[", "]"):
+                type_end = end
+                i += 1
+            elif key == "(" and type_end > type_start:
+                i, type_end = _skip_group(tokens, i)
+            else:
+                break
+        if type_end == type_start:
+            return None
+
+        column = self._with_raw(Column(name=name, raw_type=self.text[type_start:type_end]), tokens)
+
+        while i < len(tokens):
+            word = tokens[i][3]
+            i += 1
+            if word == "NOT" and _key(tokens, i) == "NULL":
+                column.not_null = True
+                i += 1
+            elif word == "DEFAULT":
+                start = i
+                i = _expression_end(tokens, i)
+                if i > start:
+                    column.default = self.text[tokens[start][1]:tokens[i - 1][2]]
+            elif word == "PRIMARY":
+                column.is_primary = True
+            elif word == "UNIQUE":
+                column.is_unique = True
+            elif word in ("AUTO_INCREMENT", "AUTOINCREMENT"):
+                column.auto_increment = True
+            elif word == "CHECK" and _key(tokens, i) == "(":
+                group_start = i
+                i, _ = _skip_group(tokens, i)
+                if column.check is None:
+                    column.check = self.text[tokens[group_start][2]:tokens[i - 1][1]].strip()
+            elif word == "REFERENCES":
+                ref_table, i = self._name_at(tokens, i)
+                ref_cols, i = self._ident_list(tokens, i)
+                fk = ForeignKey(cols=[name], ref_table=ref_table, ref_cols=ref_cols)
+                table.foreign_keys.append(self._with_raw(fk, tokens))
+            elif word == "CONSTRAINT":
+                i += 1
+        return column
+
+    def _with_raw(self, obj, tokens: list):
+        """obj.raw = texto de `tokens`, como rango dentro de self._source."""
+        obj._set_raw_span(self._source, tokens[0][1] - self._base, tokens[-1][2] - self._base)
+        return obj
+
+    # --- nombres ---
+
+    def _ident(self, tok) -> str:
+        value = self.text[tok[1]:tok[2]]
+        if tok[0] == "qident":
+            quote = value[0]
+            value = value[1:-1] if len(value) > 1 and value.endswith(quote) else value[1:]
+            return value.replace(quote * 2, quote)
+        return value
+
+    def _name_at(self, tokens: list, i: int) -> tuple:
+        """Nombre (posiblemente calificado: schema.tabla) en tokens[i]."""
+        parts = []
+        while i < len(tokens) and tokens[i][0] in ("word", "qident"):
+            parts.append(self._ident(tokens[i]))
+            i += 1
+            if _key(tokens, i) != ".":
+                break
+            i += 1
+        return ".".join(parts), i
+
+    def _ident_list(self, tokens: list, i: int) -> tuple:
+        """(a, b, ...) en tokens[i]. Devuelve (nombres, índice siguiente)."""
+        if _key(tokens, i) != "(":
+            return [], i
+        end, _ = _skip_group(tokens, i)
+        names = [self._ident(t) for t in tokens[i + 1:end - 1] if t[0] in ("word", "qident")]
+        return names, end
+
+    # --- comentarios ---
+
+    def _attach_comment(self, table: Table, column: Column, item_start: int, item_end: int, comment: tuple):
+        """
+        Un `-- comentario` dentro de una columna, o en la misma línea que su
+        final, se considera suyo. Si menciona una FK ("foreign key to X
+        table"), se agrega la relación.
+        """
+        start, end = comment
+        if start < item_start:
+            return
+        if start > item_end and "\n" in self.text[item_end:start]:
+            return
+        fk = _comment_foreign_key(column.name, self.text[start:end].lstrip("-/* ").rstrip("*/ "))
+        if fk is not None:
+            table.foreign_keys.append(fk)
+
+
+def _key(tokens: list, i: int):
+    return tokens[i][3] if 0 <= i < len(tokens) else None
+
+def _skip_group(tokens: list, i: int) -> tuple:
+    """tokens[i] es '('. Devuelve (índice después del ')', fin del ')')."""
+    depth = 0
+    while i < len(tokens):
+        key = tokens[i][3]
+        if key == "(":
+            depth += 1
+        elif key == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1, tokens[i][2]
+        i += 1
+    return i, tokens[-1][2]
+
+def _expression_end(tokens: list, i: int) -> int:
+    # al menos un token (DEFAULT NULL), después hasta la próxima restricción
+    first = True
+    while i < len(tokens):
+        key = tokens[i][3]
+        if not first and tokens[i][0] == "word" and key in CONSTRAINT_WORDS:
+            break
+        if key == "(":
+            i, _ = _skip_group(tokens, i)
         else:
-            return parts[0], parts[1]
+            i += 1
+        first = False
+    return i
+
+def _copy_data_end(text: str, pos: int, final: bool = True) -> int:
+    """
+    Posición del '\\n' que cierra los datos de un COPY ... FROM stdin. Si
+    todavía no llegaron (final=False), -1.
+    """
+    end = text.find("\n\\.", pos)
+    line_end = text.find("\n", end + 3) if end >= 0 else -1
+    if line_end < 0:
+        return len(text) if final else -1
+    return line_end
+
+def _comment_foreign_key(column_name: str, comment: str) -> Optional[ForeignKey]:
+    # heurística: si hay inline comment que mencione FK/reference
+    lowered = comment.lower()
+    if "foreign key" not in lowered and "references" not in lowered:
+        return None
+    ref_search = re.search(r"to\s+([A-Za-z0-9_]+)\s+table", comment, flags=re.IGNORECASE)
+    if not ref_search:
+        return None
+    return ForeignKey(
+        cols=[column_name],
+        ref_table=ref_search.group(1),
+        ref_cols=[f"{column_name.split('_')[0]}_id"],
+        raw=f"comment:{comment}",
+    )
+
+# -------------------------
+# Parseo en paralelo
+# -------------------------
+
+def _split_statements(text: str, parts: int) -> List[int]:
+    """
+    Posiciones de corte, siempre al final de una sentencia, que dividen
+    `text` en hasta `parts` rangos de tamaño parecido. Incluye 0 y len(text).
+    """
+    target = len(text) / parts
+    cuts = [0]
+    pos = 0
+    while pos < len(text):
+        head = STATEMENT_HEAD_RE.match(text, pos)
+        end = STATEMENT_RE.match(text, head.end()).end()
+        if head.group("copy") and end < len(text) and COPY_STDIN_RE.search(text, head.end(), end):
+            end = _copy_data_end(text, end)
+        pos = end + 1
+        if pos - cuts[-1] >= target and pos < len(text):
+            cuts.append(pos)
+    cuts.append(len(text))
+    return cuts
+
+def _parse_range(text: str) -> tuple:
+    # corre en un proceso del pool
+    parser = _Parser(text)
+    parser.pending_alters = []
+    return parser.parse(), parser.pending_alters
+
+def _parse_parallel(text: str, workers: int) -> List[Table]:
+    cuts = _split_statements(text, workers)
+    ranges = [text[a:b] for a, b in zip(cuts, cuts[1:])]
+    if len(ranges) < 2:
+        return _Parser(text).parse()
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+        results = list(pool.map(_parse_range, ranges))
+
+    # Los ALTER de un rango sobre tablas de rangos anteriores se aplican acá,
+    # en orden, viendo sólo las tablas creadas antes (como en secuencial).
+    merger = _Parser()
+    tables = []
+    for range_tables, pending_alters in results:
+        for alter in pending_alters:
+            merger.text = alter
+            merger._parse_alter(_tokenize(alter, 0, len(alter))[0])
+        tables.extend(range_tables)
+        merger.by_name.update((table.name, table) for table in range_tables)
+    return tables
+
+# -------------------------
+# API
+# -------------------------
+
+# Por debajo de este tamaño (en caracteres) no conviene levantar un pool
+PARALLEL_MIN_SIZE = 2_000_000
+
+def parse_ddl_text(ddl_text: str, workers: Optional[int] = 1, min_parallel_size: int = PARALLEL_MIN_SIZE) -> List[Table]:
+    """
+    Parsea los CREATE TABLE (y los ALTER TABLE ... ADD PRIMARY/FOREIGN KEY)
+    de un script DDL en una sola pasada. Soporta identificadores entre
+    comillas, comentarios, IF NOT EXISTS y dumps de pg_dump (los datos de
+    COPY ... FROM stdin se saltean).
+
+    Con workers > 1 (None = os.cpu_count()) y un texto de al menos
+    `min_parallel_size` caracteres, el DDL se corta en rangos de sentencias
+    que se parsean en un ProcessPoolExecutor. El resultado es idéntico al
+    secuencial.
+    """
+    ddl_text = ddl_text.replace("\r\n", "\n")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(ddl_text) >= min_parallel_size:
+        return _parse_parallel(ddl_text, workers)
+    return _Parser(ddl_text).parse()
 
 def parse_column_definition(item_core: str):
     """
@@ -137,157 +650,234 @@ def parse_column_definition(item_core: str):
     Si la línea no parece ser una definición de columna, devuelve None.
     """
     item_core = item_core.strip().rstrip(",")
-    # debe empezar con un nombre válido
-    m = re.match(r'^\s*("?[\w\d_]+"?)\s+(.*)$', item_core)
-    if not m:
+    tokens, _ = _tokenize(item_core, 0, len(item_core))
+    if len(tokens) < 2:
         return None
-    col_name = m.group(1).strip().strip('"')
-    rest = m.group(2).strip()
-    if rest == "":
+    column = _Parser(item_core)._parse_column(tokens, Table(name=""))
+    if column is None:
         return None
-    # extraer tipo completo
-    col_type, constraints = _extract_type(rest)
-    # ahora constraints contiene "NOT NULL DEFAULT 'x' UNIQUE ..." or similar
-    
-    # Detectar CHECK(...)
-    check_val = None
-    check_match = re.search(r"CHECK\s*\((.*?)\)", constraints, flags=re.IGNORECASE)
-    if check_match:
-        check_val = check_match.group(1).strip()
-
-    not_null = bool(NOT_NULL_RE.search(constraints))
-    unique = bool(UNIQUE_RE.search(constraints))
-    default_val = None
-    def_m = DEFAULT_RE.search(constraints)
-    if def_m:
-        default_val = def_m.group(1).strip()
-    inline_pk = bool(INLINE_PK_RE.search(constraints)) or bool(re.search(r"\bPRIMARY\s+KEY\b", constraints, flags=re.IGNORECASE))
-    auto_inc = bool(AUTO_INC_RE.search(constraints))
     return {
-        "name": col_name,
-        "raw_type": col_type,
-        "not_null": not_null,
-        "default": default_val,
-        "is_primary": inline_pk,
-        "is_unique": unique,
-        "auto_increment": auto_inc,
-        "check": check_val,
+        "name": column.name,
+        "raw_type": column.raw_type,
+        "not_null": column.not_null,
+        "default": column.default,
+        "is_primary": column.is_primary,
+        "is_unique": column.is_unique,
+        "auto_increment": column.auto_increment,
+        "check": column.check,
         "raw": item_core,
     }
 
-def parse_ddl_text(ddl_text: str) -> List[Table]:
-    tables: List[Table] = []
-    text = ddl_text.replace("\r\n", "\n")
-
-    for match in CREATE_TABLE_RE.finditer(text):
-        tbl_name = match.group(1).strip().strip('"')
-        body = match.group(2).strip()
-        table = Table(name=tbl_name, raw_body=body)
-
-        items = _split_columns_block(body)
-        for item in items:
-            inline_comment = None
-            if "--" in item:
-                parts = item.split("--", 1)
-                item_core = parts[0].strip()
-                inline_comment = parts[1].strip()
-            else:
-                item_core = item.strip()
+def iter_ddl_file(path: str, chunk_size: int = 1 << 20, encoding: str = "utf-8") -> Iterator[Table]:
+    """
+    Como parse_ddl_file, pero lee el archivo de a `chunk_size` caracteres y
+    va devolviendo cada Table apenas se termina de parsear su sentencia. En
+    memoria queda sólo la sentencia en curso (los datos de COPY se
+    descartan línea a línea), así que sirve para dumps grandes.
 
-            # ignore empty
-            if not item_core:
-                continue
+    Los ALTER TABLE ... ADD PRIMARY/FOREIGN KEY que aparecen después (como
+    en pg_dump) modifican la Table ya devuelta.
+    """
+    parser = _Parser()
+    buffer = ""
+    read_size = chunk_size
+    # en modo texto los "\r\n" se normalizan aunque queden entre dos chunks
+    with open(path, "r", encoding=encoding) as f:
+        while True:
+            chunk = f.read(read_size)
+            buffer += chunk
+            tables, pos = parser.scan(buffer, final=not chunk)
+            yield from tables
+            if not chunk:
+                return
+            buffer = buffer[pos:]
+            # una sentencia más larga que el buffer: se lee más de una vez
+            # para no re-escanearla en cada chunk
+            read_size = chunk_size if pos else max(chunk_size, len(buffer))
 
-            # table-level FK
-            fk_match = FK_TABLELEVEL_RE.search(item_core)
-            if fk_match:
-                cols = [c.strip().strip('"') for c in fk_match.group(1).split(",")]
-                ref_table = fk_match.group(2).strip().strip('"')
-                ref_cols = [c.strip().strip('"') for c in fk_match.group(3).split(",")]
-                table.foreign_keys.append(ForeignKey(cols=cols, ref_table=ref_table, ref_cols=ref_cols, raw=item_core))
-                continue
+def parse_ddl_file(path: str, workers: Optional[int] = 1) -> List[Table]:
+    if workers == 1:
+        return list(iter_ddl_file(path))
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_ddl_text(f.read(), workers=workers)
 
-            # table-level PK
-            pk_match = PK_TABLELEVEL_RE.search(item_core)
-            if pk_match:
-                pk_cols = [c.strip().strip('"') for c in pk_match.group(1).split(",")]
-                for pk in pk_cols:
-                    if pk not in table.primary_keys:
-                        table.primary_keys.append(pk)
-                continue
+@dataclass
+class DependencyAnalysis:
+    """
+    Resultado de analyze_dependencies.
 
-            # ignore pure constraints lines (CHECK, CONSTRAINT, UNIQUE at table level)
-            if item_core.strip().upper().startswith(("CONSTRAINT", "CHECK", "UNIQUE", "KEY", "INDEX")):
-                continue
+    - order: tablas en orden de carga (nivel por nivel).
+    - levels: las tablas de un mismo nivel no dependen entre sí y se pueden
+      cargar/generar en paralelo; cada una depende sólo de niveles anteriores.
+    - components: componentes fuertemente conexas, en orden de carga.
+    - cycles: las componentes con un ciclo (más de una tabla, o una FK a sí
+      misma).
+    - deferred: (tabla, ForeignKey) que hay que diferir (cargar en NULL y
+      completar después, o crear la constraint al final) para romper los
+      ciclos. Sin ellas, `order` respeta todas las FKs.
+    """
+    order: List[str]
+    levels: List[List[str]]
+    components: List[List[str]]
+    cycles: List[List[str]]
+    deferred: List[Tuple[str, ForeignKey]]
 
-            # try parse as column definition
-            parsed = parse_column_definition(item_core)
-            if parsed:
-                col = Column(
-                    name=parsed["name"],
-                    raw_type=parsed["raw_type"],
-                    not_null=parsed["not_null"],
-                    default=parsed["default"],
-                    is_primary=parsed["is_primary"],
-                    is_unique=parsed["is_unique"],
-                    auto_increment=parsed["auto_increment"],
-                    check=parsed.get("check"),
-                    raw=parsed["raw"],
-                )
-                table.columns.append(col)
-                if parsed["is_primary"] and col.name not in table.primary_keys:
-                    table.primary_keys.append(col.name)
-                # heurística: si hay inline comment que mencione FK/reference
-                if inline_comment:
-                    if "foreign key" in inline_comment.lower() or "references" in inline_comment.lower():
-                        ref_search = re.search(r"to\s+([A-Za-z0-9_]+)\s+table", inline_comment, flags=re.IGNORECASE)
-                        if ref_search:
-                            ref_tbl = ref_search.group(1)
-                            table.foreign_keys.append(
-                                ForeignKey(
-                                    cols=[col.name],
-                                    ref_table=ref_tbl,
-                                    ref_cols=[f"{col.name.split('_')[0]}_id"],
-                                    raw=f"comment:{inline_comment}",
-                                )
-                            )
-                continue
+def analyze_dependencies(tables: List[Table]) -> DependencyAnalysis:
+    """
+    Análisis de dependencias por FK en tiempo lineal: Tarjan (iterativo)
+    para las componentes fuertemente conexas y niveles topológicos sobre el
+    grafo sin las FKs diferidas. Las FKs a tablas que no están en `tables`
+    se ignoran.
+    """
+    return analyze_dependency_graph(
+        [t.name for t in tables],
+        ((t.name, fk.ref_table, fk) for t in tables for fk in t.foreign_keys),
+    )
 
-            # fallback: if none matched, keep raw as-is for manual inspection (rare)
-            table.columns.append(Column(name=f"_raw_{len(table.columns)+1}", raw_type="", raw=item_core))
-        tables.append(table)
-    return tables
+def analyze_dependency_graph(names, references) -> DependencyAnalysis:
+    """
+    Como analyze_dependencies, sobre un grafo genérico: `names` son las
+    tablas y `references` tuplas (tabla, tabla referenciada, fk), donde `fk`
+    es lo que se devuelve en `deferred` (por ejemplo el dict de FK de
+    schema_to_dict).
+    """
+    position = {}
+    for name in names:
+        position.setdefault(name, len(position))
 
-def parse_ddl_file(path: str) -> List[Table]:
-    with open(path, "r", encoding="utf-8") as f:
-        text = f.read()
-    return parse_ddl_text(text)
+    deps = {name: {} for name in position}  # tabla -> {tabla referenciada: [FKs]}
+    for name, ref_table, fk in references:
+        if ref_table in deps:
+            deps[name].setdefault(ref_table, []).append(fk)
 
-def tables_dependency_order(tables: List[Table]) -> List[str]:
-    adj = {t.name: set() for t in tables}
-    indeg = {t.name: 0 for t in tables}
-    for t in tables:
-        for fk in t.foreign_keys:
-            ref = fk.ref_table
-            if ref == t.name:
-                continue
-            if ref in adj:
-                if t.name not in adj[ref]:
-                    adj[ref].add(t.name)
-                    indeg[t.name] += 1
-    q = [name for name, d in indeg.items() if d == 0]
+    components = _strongly_connected_components(position, deps)
+
+    # Los ciclos se rompen difiriendo sus back edges; los niveles se
+    # calculan sobre el grafo que queda (acíclico), así dos tablas de un
+    # mismo ciclo sólo comparten nivel si no hay FK no diferida entre ellas.
+    # Tarjan devuelve cada componente después de las que referencia, y
+    # _order_component ordena la componente según sus FKs no diferidas.
+    cycles = []
+    deferred = []
+    back_edges = set()
+    ordered = []
+    for component in components:
+        members = sorted(component, key=position.__getitem__)
+        if len(members) > 1 or members[0] in deps[members[0]]:
+            members, component_back_edges = _order_component(members, deps)
+            cycles.append(members)
+            for name, ref, fks in component_back_edges:
+                back_edges.add((name, ref))
+                deferred.extend((name, fk) for fk in fks)
+        ordered.append(members)
+
+    level_of = {}
+    for members in ordered:
+        for name in members:
+            level_of[name] = max(
+                (level_of[ref] + 1 for ref in deps[name] if (name, ref) not in back_edges),
+                default=0,
+            )
+
+    ordered.sort(key=lambda members: (level_of[members[0]], position[members[0]]))
+
+    levels = []
+    for members in ordered:
+        for name in members:
+            while len(levels) <= level_of[name]:
+                levels.append([])
+            levels[level_of[name]].append(name)
+
+    return DependencyAnalysis(
+        order=[name for level in levels for name in level],
+        levels=levels,
+        components=ordered,
+        cycles=cycles,
+        deferred=deferred,
+    )
+
+def _strongly_connected_components(nodes, edges: dict) -> List[List[str]]:
+    # Tarjan iterativo (sin recursión: los schemas grandes pasan el límite)
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(edges[root]))]
+        while work:
+            node, neighbours = work[-1]
+            for neighbour in neighbours:
+                if neighbour not in index:
+                    index[neighbour] = low[neighbour] = len(index)
+                    stack.append(neighbour)
+                    on_stack.add(neighbour)
+                    work.append((neighbour, iter(edges[neighbour])))
+                    break
+                if neighbour in on_stack:
+                    low[node] = min(low[node], index[neighbour])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        name = stack.pop()
+                        on_stack.discard(name)
+                        component.append(name)
+                        if name == node:
+                            break
+                    components.append(component)
+    return components
+
+def _order_component(members: List[str], deps: dict) -> tuple:
+    """
+    Orden de carga dentro de un ciclo: DFS sobre las FKs internas, en
+    postorden. Las FKs que vuelven a una tabla todavía en la pila (back
+    edges) son las que se difieren; el resto queda respetado por el orden.
+    Devuelve (orden, [(tabla, tabla referenciada, FKs diferidas)]).
+    """
+    inside = set(members)
+    state = {}  # tabla -> 1 en la pila, 2 terminada
     order = []
-    while q:
-        n = q.pop(0)
-        order.append(n)
-        for neigh in list(adj[n]):
-            indeg[neigh] -= 1
-            adj[n].remove(neigh)
-            if indeg[neigh] == 0:
-                q.append(neigh)
-    remaining = [t.name for t in tables if t.name not in order]
-    order.extend(remaining)
-    return order
+    deferred = []
+    for root in members:
+        if root in state:
+            continue
+        state[root] = 1
+        work = [(root, iter(deps[root].items()))]
+        while work:
+            node, refs = work[-1]
+            for ref, fks in refs:
+                if ref not in inside:
+                    continue
+                if ref not in state:
+                    state[ref] = 1
+                    work.append((ref, iter(deps[ref].items())))
+                    break
+                if state[ref] == 1:
+                    deferred.append((node, ref, fks))
+            else:
+                work.pop()
+                state[node] = 2
+                order.append(node)
+    return order, deferred
+
+def tables_dependency_order(tables: List[Table]) -> List[str]:
+    """
+    Orden sugerido para generar/cargar las tablas: cada tabla después de
+    las que referencia. Con ciclos, el orden sólo viola las FKs de
+    analyze_dependencies(tables).deferred.
+    """
+    return analyze_dependencies(tables).order
 
 def print_tables_summary(tables: List[Table]):
     for t in tables:
@@ -2,11 +2,15 @@ import random
 import re
 from faker import Faker
 
+from src.schema_index import SchemaIndex
+
 fake = Faker()
 
 class DataGenerator:
-    def __init__(self, schema: dict):
-        self.schema = schema
+    def __init__(self, schema):
+        """schema: dict de schema_converter o un SchemaIndex ya armado."""
+        self.index = SchemaIndex.of(schema)
+        self.schema = self.index.to_dict()
         self.generated_data = {}
         self.auto_counters = {}
 
@@ -16,7 +20,7 @@ class DataGenerator:
         self.generated_data = {}
         self.auto_counters = {}
 
-        sorted_tables = self._sort_tables_by_dependencies(tables)
+        sorted_tables = self._sort_tables_by_dependencies()
 
         for table_name in sorted_tables:
             self.generated_data[table_name] = self._generate_table_data(
@@ -48,16 +52,12 @@ class DataGenerator:
     # --------------------------------------------------------------------------------------------
     def _get_foreign_key_value(self, table_name, column_name):
         """Si la columna es FK, devuelve un valor existente de la tabla referenciada."""
-        table = self.schema["tables"][table_name]
-        for fk in table.get("foreign_keys", []):
-            if column_name in fk["columns"]:
-                ref_table = fk["ref_table"]
-                ref_col = fk["ref_columns"][0]
-                existing_rows = self.generated_data.get(ref_table)
-                if existing_rows and len(existing_rows) > 0:
-                    return random.choice(existing_rows)[ref_col]
-                else:
-                    return None
+        fk = self.index.foreign_key_for(table_name, column_name)
+        if fk is None:
+            return None
+        existing_rows = self.generated_data.get(fk["ref_table"])
+        if existing_rows:
+            return random.choice(existing_rows)[fk["ref_columns"][0]]
         return None
 
     # --------------------------------------------------------------------------------------------
@@ -133,23 +133,12 @@ class DataGenerator:
         return None
 
     # --------------------------------------------------------------------------------------------
-    def _sort_tables_by_dependencies(self, tables: dict) -> list:
-        """Ordena las tablas considerando dependencias de claves foráneas."""
-        sorted_tables = []
-        remaining = dict(tables)
-
-        while remaining:
-            progress = False
-            for table_name, table_def in list(remaining.items()):
-                fks = [fk["ref_table"] for fk in table_def.get("foreign_keys", [])]
-                if all(ref in sorted_tables for ref in fks):
-                    sorted_tables.append(table_name)
-                    del remaining[table_name]
-                    progress = True
-            if not progress:
-                raise ValueError("Ciclo de dependencias detectado en las tablas.")
-        return sorted_tables
-    
+    def _sort_tables_by_dependencies(self) -> list:
+        """Ordena las tablas considerando dependencias de claves foráneas (precalculado en el índice)."""
+        if self.index.cycles:
+            raise ValueError("Ciclo de dependencias detectado en las tablas.")
+        return list(self.index.order)
+
     def _parse_check_constraint(self, check_str):
         """Extrae los límites numéricos de una cláusula CHECK (ej: 'rating >= 1 AND rating <= 5')."""
         if not check_str:
@@ -7,6 +7,7 @@ import random
 from typing import Any, Dict, List, Optional
 
 from src.generator import DataGenerator
+from src.schema_index import SchemaIndex
 from faker import Faker
 
 fake = Faker()
@@ -18,7 +19,9 @@ class InstructionEngine:
     """
 
     def __init__(self, schema: Dict[str, Any], generator_cls=DataGenerator):
-        self.schema = schema
+        # schema puede ser el dict de schema_converter o un SchemaIndex
+        self.index = SchemaIndex.of(schema)
+        self.schema = self.index.to_dict()
         self.generator_cls = generator_cls
         self.params = {
             "num_rows": 5,
@@ -37,10 +40,10 @@ class InstructionEngine:
         self.params[key] = value
 
     def add_override(self, table: str, column: str, strategy: Dict[str, Any]) -> None:
-        if table not in self.schema["tables"]:
+        if not self.index.has_table(table):
             raise ValueError(f"Tabla desconocida: {table}")
 
-        if column not in self.schema["tables"][table]["columns"]:
+        if not self.index.has_column(table, column):
             raise ValueError(f"Columna desconocida: {table}.{column}")
 
         self.overrides.setdefault(table, {})[column] = strategy
@@ -57,7 +60,7 @@ class InstructionEngine:
         if num_rows is None:
             num_rows = self.params.get("num_rows", 5)
         # Construir generator con schema actual
-        generator = self.generator_cls(self.schema)
+        generator = self.generator_cls(self.index)
         data = generator.generate(num_rows=num_rows)
         self.generated_data = data
         # Aplicar overrides post-generación (manteniendo integridad FK)
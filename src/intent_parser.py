@@ -1,24 +1,33 @@
 import re
 
+from src.schema_index import SchemaIndex
+from src.utils.keyword_index import KeywordIndex
+
 class IntentParser:
-    def __init__(self, schema: dict):
+    def __init__(self, schema: dict, synonyms: dict = None):
         """
-        schema: dict generado por schema_converter
+        schema: dict generado por schema_converter (o un SchemaIndex ya armado)
+        synonyms: {"staff": "Employees", ...} frases extra que apuntan a una tabla
         """
+        self.index = SchemaIndex.of(schema)
         self.schema = schema
-        self.tables = {t["name"].lower(): t for t in schema["tables"]}
+        self.table_index = self._build_table_index(synonyms or {})
+        self.column_index = self._build_column_index()
+        self._table_column_indexes = {}
 
     def parse(self, text: str) -> dict:
-        text = text.lower().strip()
+        # raw conserva mayúsculas para los valores de los filtros
+        raw = text.strip()
+        text = raw.lower()
 
         if self._is_count(text):
-            return self._build_count_intent(text)
+            return self._build_count_intent(text, raw)
 
         if self._is_aggregate(text):
-            return self._build_aggregate_intent(text)
+            return self._build_aggregate_intent(text, raw)
 
         if self._is_select(text):
-            return self._build_select_intent(text)
+            return self._build_select_intent(text, raw)
 
         return self._empty_intent("unknown")
 
@@ -35,43 +44,59 @@ class IntentParser:
     def _is_aggregate(self, text: str) -> bool:
         return any(word in text for word in ["average", "avg", "max", "min", "suma", "sum"])
 
+    def _is_approximate(self, text: str) -> bool:
+        return bool(re.search(r"\b(approx\w*|roughly|estimated?|aproximad\w*)\b", text))
+
     # ------------------------
     # Intent builders
     # ------------------------
 
-    def _build_select_intent(self, text: str) -> dict:
+    def _build_select_intent(self, text: str, raw: str) -> dict:
+        table = self._extract_table(text)
+        filters, used_spans = self._extract_filters(text, raw, table)
+
         return {
             "action": "select",
-            "table": self._extract_table(text),
-            "columns": None,
-            "filters": [],
+            "table": table,
+            "columns": self._extract_columns(text, table, used_spans),
+            "filters": filters,
             "limit": self._extract_limit(text),
             "group_by": None,
             "metric": None,
+            "approximate": False,
         }
 
-    def _build_count_intent(self, text: str) -> dict:
+    def _build_count_intent(self, text: str, raw: str) -> dict:
+        table = self._extract_table(text)
+        filters, _ = self._extract_filters(text, raw, table)
+
         return {
             "action": "count",
-            "table": self._extract_table(text),
+            "table": table,
             "columns": None,
-            "filters": [],
+            "filters": filters,
             "limit": None,
             "group_by": None,
             "metric": None,
+            "approximate": self._is_approximate(text),
         }
 
-    def _build_aggregate_intent(self, text: str) -> dict:
+    def _build_aggregate_intent(self, text: str, raw: str) -> dict:
         metric = self._extract_metric(text)
+        table = self._extract_table(text)
+        filters, used_spans = self._extract_filters(text, raw, table)
+        group_by = self._extract_group_by(text)
+        target = self._extract_metric_column(text, table, used_spans, group_by)
 
         return {
             "action": "aggregate",
-            "table": self._extract_table(text),
-            "columns": None,
-            "filters": [],
+            "table": table,
+            "columns": [target] if target else None,
+            "filters": filters,
             "limit": None,
-            "group_by": self._extract_group_by(text),
+            "group_by": group_by,
             "metric": metric,
+            "approximate": self._is_approximate(text),
         }
 
     # ------------------------
@@ -79,9 +104,15 @@ class IntentParser:
     # ------------------------
 
     def _extract_table(self, text: str):
-        for table_name in self.tables.keys():
-            if table_name in text:
-                return self.tables[table_name]["name"]
+        # La tabla es la primera mencionada (el sujeto); ante nombres
+        # solapados gana el más largo. Lo que sigue a "by" es el GROUP BY
+        # (ver _extract_group_by), no la tabla.
+        by = re.search(r"\bby\s+", text)
+        if by:
+            text = text[:by.start()]
+        match = self.table_index.longest_match(text)
+        if match:
+            return match[3]
         return None
 
     def _extract_limit(self, text: str):
@@ -102,19 +133,178 @@ class IntentParser:
         return None
 
     def _extract_group_by(self, text: str):
-        match = re.search(r"by\s+([\w_]+)", text)
+        match = re.search(r"\bby\s+", text)
         if not match:
             return None
 
-        candidate = match.group(1)
+        # La columna tiene que empezar justo después de "by"
+        rest = text[match.end():]
+        best = None
+        for start, end, _, column in self.column_index.find_all(rest):
+            if start > 0:
+                break
+            if best is None or end > best[0]:
+                best = (end, column)
+
+        return best[1] if best else None
+
+    def _extract_columns(self, text: str, table: str, used_spans: list):
+        """
+        Columnas de `table` mencionadas en el texto (fuera de los filtros).
+        None = todas (SELECT *), también si alguna de las pedidas no es una
+        columna: es mejor devolver de más que perder las que se querían.
+        """
+        if not table:
+            return None
+
+        # Lo que sigue a "by" es el orden o la agrupación, no la proyección
+        by = re.search(r"\bby\b", text)
+        if by:
+            text = text[:by.start()]
+
+        index = self._columns_of(table)
+        if not self._projection_resolves(text, index):
+            return None
+
+        columns = []
+        for start, end, _, column in index.find_all(text):
+            if any(s <= start < e for s, e in used_spans):
+                continue
+            if column not in columns:
+                columns.append(column)
+
+        return columns or None
+
+    def _projection_resolves(self, text: str, index: KeywordIndex) -> bool:
+        """
+        Lo pedido antes de la tabla ("show the name and email of employees")
+        se separa por comas / "and": si alguna parte nombra una columna,
+        todas tienen que nombrar una.
+        """
+        subject = self.table_index.longest_match(text)
+        if subject is None:
+            return True
+
+        pieces = [piece for piece in re.split(r",|\band\b", text[:subject[0]]) if piece.strip()]
+        found = [bool(index.find_all(piece)) for piece in pieces]
+        return all(found) or not any(found)
+
+    def _extract_metric_column(self, text: str, table: str, used_spans: list, group_by: str):
+        """Columna sobre la que se calcula la métrica ("average salary" -> salary)."""
+        if not table:
+            return None
+
+        for start, _, _, column in self._columns_of(table).find_all(text):
+            if any(s <= start < e for s, e in used_spans) or column == group_by:
+                continue
+            return column
+        return None
+
+    def _extract_filters(self, text: str, raw: str, table: str) -> tuple:
+        """
+        Predicados simples sobre columnas de `table`:
+          salary > 5000, city = 'Rosario', status is active,
+          salary between 1000 and 2000, hired since 2020-01-01 ...
+        Devuelve (filters, spans usados en el texto).
+        """
+        if not table:
+            return [], []
+
+        filters = []
+        spans = []
+        mentions = self._columns_of(table).find_all(text)
+
+        for start, end, _, column in mentions:
+            if any(s <= start < e for s, e in spans):
+                continue
+
+            between = BETWEEN_RE.match(raw, end)
+            if between:
+                low = _parse_value(between, "low")
+                high = _parse_value(between, "high")
+                filters.append({"column": column, "op": ">=", "value": low})
+                filters.append({"column": column, "op": "<=", "value": high})
+                spans.append((start, between.end()))
+                continue
 
-        for table in self.schema["tables"]:
-            for column in table["columns"]:
-                if column["name"].lower() == candidate:
-                    return column["name"]
+            for pattern, op in COMPARISON_PATTERNS:
+                m = pattern.match(raw, end)
+                if m:
+                    op = SYMBOL_OPERATORS.get(m.group("op"), m.group("op")) if op is None else op
+                    filters.append({"column": column, "op": op, "value": _parse_value(m)})
+                    spans.append((start, m.end()))
+                    break
+
+        for m in DATE_FILTER_RE.finditer(raw):
+            if any(s <= m.start() < e for s, e in spans):
+                continue
+            column = self._date_column_before(mentions, m.start(), text) or self._default_date_column(table)
+            if column is None:
+                continue
+            op, value = _date_bound(m.group("word").lower(), m.group("date"))
+            filters.append({"column": column, "op": op, "value": value})
+            spans.append((m.start(), m.end()))
+
+        return filters, spans
+
+    def _date_column_before(self, mentions: list, pos: int, text: str):
+        for start, end, _, column in mentions:
+            if end <= pos and not text[end:pos].strip():
+                return column
+        return None
 
+    def _default_date_column(self, table: str):
+        columns = self.index.columns(self.index.resolve_table(table)).values()
+        for column in columns:
+            if str(column.get("type", "")).upper().startswith(("DATE", "TIMESTAMP")):
+                return column["name"]
+        for column in columns:
+            name = column["name"].lower()
+            if "date" in name or name.endswith("_at"):
+                return column["name"]
         return None
 
+    # ------------------------
+    # Indexes
+    # ------------------------
+
+    def _columns_of(self, table: str) -> KeywordIndex:
+        """Índice de columnas de una tabla (se arma la primera vez que se usa)."""
+        key = table.lower()
+        index = self._table_column_indexes.get(key)
+        if index is None:
+            index = KeywordIndex()
+            for name in self.index.columns(self.index.resolve_table(table)):
+                index.add(name, name)
+                index.add(name.replace("_", " "), name)
+            index.build()
+            self._table_column_indexes[key] = index
+        return index
+
+    def _build_table_index(self, synonyms: dict) -> KeywordIndex:
+        index = KeywordIndex()
+        for name in self.index.table_names:
+            for variant in _name_variants(name):
+                index.add(variant, name)
+
+        for phrase, table_name in synonyms.items():
+            name = self.index.resolve_table(table_name)
+            if name is None:
+                raise ValueError(f"Synonym '{phrase}' points to unknown table: {table_name}")
+            for variant in _name_variants(phrase):
+                index.add(variant, name)
+
+        index.build()
+        return index
+
+    def _build_column_index(self) -> KeywordIndex:
+        index = KeywordIndex()
+        for name in self.index.column_names:
+            index.add(name, name)
+            index.add(name.replace("_", " "), name)
+        index.build()
+        return index
+
     # ------------------------
 
     def _empty_intent(self, action: str):
@@ -126,4 +316,84 @@ class IntentParser:
             "limit": None,
             "group_by": None,
             "metric": None,
-        }
\ No newline at end of file
+            "approximate": False,
+        }
+
+# ------------------------
+# Filter patterns
+# ------------------------
+
+VALUE_PATTERN = (
+    r"(?:'(?P<{0}_sq>[^']*)'|\"(?P<{0}_dq>[^\"]*)\""
+    r"|(?P<{0}_date>\d{{4}}-\d{{2}}-\d{{2}})"
+    r"|(?P<{0}_num>-?\d+(?:\.\d+)?)(?![\w-])"
+    r"|(?P<{0}_word>[\w@.-]+))"
+)
+
+def _comparison(words: str, op):
+    return re.compile(r"\s+(?:is\s+)?" + words + r"\s+" + VALUE_PATTERN.format("value"), re.IGNORECASE), op
+
+SYMBOL_OPERATORS = {"<>": "!=", "==": "="}
+
+COMPARISON_PATTERNS = [
+    (re.compile(r"\s*(?P<op>>=|<=|!=|<>|==|=|>|<)\s*" + VALUE_PATTERN.format("value")), None),
+    _comparison(r"(?:greater|more|higher)\s+than", ">"),
+    _comparison(r"(?:less|lower|fewer)\s+than", "<"),
+    _comparison(r"(?:above|over)", ">"),
+    _comparison(r"(?:below|under)", "<"),
+    _comparison(r"at\s+least", ">="),
+    _comparison(r"at\s+most", "<="),
+    _comparison(r"not(?:\s+equal\s+to)?", "!="),
+    (re.compile(r"\s+(?:is|equals|equal\s+to)\s+" + VALUE_PATTERN.format("value"), re.IGNORECASE), "="),
+]
+
+BETWEEN_RE = re.compile(
+    r"\s+(?:is\s+)?between\s+" + VALUE_PATTERN.format("low") + r"\s+and\s+" + VALUE_PATTERN.format("high"),
+    re.IGNORECASE,
+)
+
+DATE_FILTER_RE = re.compile(
+    r"\b(?P<word>since|after|before)\s+(?P<date>\d{4}-\d{2}-\d{2}|\d{4})\b",
+    re.IGNORECASE,
+)
+
+def _parse_value(match, prefix: str = "value"):
+    if match.group(f"{prefix}_sq") is not None:
+        return match.group(f"{prefix}_sq")
+    if match.group(f"{prefix}_dq") is not None:
+        return match.group(f"{prefix}_dq")
+    if match.group(f"{prefix}_date") is not None:
+        return match.group(f"{prefix}_date")
+    if match.group(f"{prefix}_num") is not None:
+        num = match.group(f"{prefix}_num")
+        return float(num) if "." in num else int(num)
+    return match.group(f"{prefix}_word").rstrip(".")
+
+def _date_bound(word: str, date: str) -> tuple:
+    """"since 2020" -> (">=", "2020-01-01"), "after 2020" -> (">", "2020-12-31") ..."""
+    if len(date) == 4:
+        if word == "after":
+            return ">", f"{date}-12-31"
+        return (">=" if word == "since" else "<"), f"{date}-01-01"
+    return {"since": ">=", "after": ">", "before": "<"}[word], date
+
+
+def _name_variants(name: str) -> set:
+    """
+    Variantes con las que un nombre puede aparecer en una pregunta:
+    "Order_Items" -> order_items, order items, order_item, order item.
+    """
+    base = name.lower()
+    variants = {base}
+
+    if base.endswith("ies"):
+        variants.add(base[:-3] + "y")
+    elif base.endswith("s") and not base.endswith("ss"):
+        variants.add(base[:-1])
+    elif base.endswith("y"):
+        variants.add(base[:-1] + "ies")
+    else:
+        variants.add(base + "s")
+
+    variants |= {v.replace("_", " ") for v in variants}
+    return variants
@@ -0,0 +1,290 @@
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from google import genai
+from google.genai import errors
+
+from src.llm.client_registry import get_gemini_client
+
+
+class QuotaExhausted(RuntimeError):
+    """RESOURCE_EXHAUSTED que siguió después de todos los reintentos."""
+
+
+class TokenBucket:
+    """
+    Rate limit de `rate` pedidos por segundo, con ráfagas de hasta
+    `capacity` (por defecto 1: pedidos espaciados uniformemente).
+
+    acquire() reserva su turno en el momento (los tokens pueden quedar en
+    negativo) y espera lo que falte, así los pedidos salen en orden de
+    llegada sin un lock async atado a un event loop.
+    """
+
+    def __init__(self, rate: float, capacity: float = None, clock=time.monotonic, sleep=asyncio.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else 1.0
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    async def acquire(self) -> None:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            await self._sleep(wait)
+
+    def drain(self) -> None:
+        """Descarta la ráfaga acumulada (después de un error de cuota)."""
+        with self._lock:
+            self._tokens = min(self._tokens, 0.0)
+
+
+class AsyncGeminiClient:
+    """
+    API async sobre un GeminiClient (por defecto el compartido de
+    client_registry): usa sus defaults de temperature / max_tokens, su
+    ResponseCache y la API key / http_options de su genai.Client.
+
+    El cliente HTTP async (httpx) deja conexiones keep-alive atadas al event
+    loop que las abrió, y Streamlit y los scripts hacen un asyncio.run por
+    operación: por eso cada event loop usa su propio genai.Client (y su
+    semáforo), y los de loops ya cerrados se descartan.
+
+    - max_concurrency: pedidos en vuelo a la vez (un stream ocupa su lugar
+      hasta terminar).
+    - requests_per_minute: token bucket para no pasarse de la cuota
+      (None = sin límite); burst es el tamaño de la ráfaga.
+    - RESOURCE_EXHAUSTED (429) se reintenta hasta max_retries veces con
+      backoff exponencial con jitter (full jitter, tope max_delay), nunca
+      menos que el retryDelay que indique el servidor. Si sigue, se lanza
+      QuotaExhausted. Los demás errores se propagan sin reintentar.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        max_concurrency: int = 4,
+        requests_per_minute: float = None,
+        burst: float = None,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        sleep=asyncio.sleep,
+        rng=random.random,
+        clock=time.monotonic,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+
+        self.client = client or get_gemini_client()
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst, clock, sleep) if requests_per_minute else None
+        self._sleep = sleep
+        self._rng = rng
+        # event loop -> semáforo / genai.Client (ver docstring)
+        self._loop_lock = threading.Lock()
+        self._semaphores = {}
+        self._aio_clients = {}
+        self._stats = {"requests": 0, "retries": 0, "quota_errors": 0, "cache_hits": 0}
+
+    # --------------------------------------------------
+    # Public API
+    # --------------------------------------------------
+
+    async def generate_json(self, prompt: str, temperature=None, max_tokens=None):
+        options = self.client._options(temperature, max_tokens)
+        key, entry = self.client._lookup("json", prompt, options)
+        if entry is not None:
+            self._stats["cache_hits"] += 1
+            return entry["value"]
+
+        response = await self._call(prompt, options)
+        value = response.parsed or response.candidates[0].content.parts[0].text
+        self.client._store(key, {"value": value})
+        return value
+
+    async def generate(self, prompt: str, temperature=None, max_tokens=None) -> str:
+        options = self.client._options(temperature, max_tokens)
+        key, entry = self.client._lookup("text", prompt, options)
+        if entry is not None:
+            self._stats["cache_hits"] += 1
+            return entry["value"]
+
+        response = await self._call(prompt, options)
+        text = response.candidates[0].content.parts[0].text
+        self.client._store(key, {"value": text})
+        return text
+
+    async def generate_stream(self, prompt: str, temperature=None, max_tokens=None):
+        options = self.client._options(temperature, max_tokens)
+        key, entry = self.client._lookup("stream", prompt, options)
+        if entry is not None:
+            self._stats["cache_hits"] += 1
+            for chunk in entry["chunks"]:
+                yield chunk
+            return
+
+        chunks = []
+        attempt = 0
+        while True:
+            async with self._slot():
+                try:
+                    stream = await self._aio().models.generate_content_stream(
+                        model=self.client.geminiModel,
+                        contents=prompt,
+                        config=self.client._config(options),
+                    )
+                    async for chunk in stream:
+                        text = _chunk_text(chunk)
+                        if text is not None:
+                            chunks.append(text)
+                            yield text
+                    break
+                except errors.APIError as error:
+                    # si ya se entregó parte del stream no se puede reintentar
+                    delay = None if chunks else self._retry_delay(attempt, error)
+                    if delay is None:
+                        raise
+            await self._sleep(delay)
+            attempt += 1
+
+        self.client._store(key, {"chunks": chunks})
+
+    def stats(self) -> dict:
+        return dict(self._stats)
+
+    # --------------------------------------------------
+    # Internals
+    # --------------------------------------------------
+
+    async def _call(self, prompt: str, options: tuple):
+        attempt = 0
+        while True:
+            async with self._slot():
+                try:
+                    return await self._aio().models.generate_content(
+                        model=self.client.geminiModel,
+                        contents=prompt,
+                        config=self.client._config(options),
+                    )
+                except errors.APIError as error:
+                    delay = self._retry_delay(attempt, error)
+                    if delay is None:
+                        raise
+            # se espera fuera del semáforo para no frenar a los demás pedidos
+            await self._sleep(delay)
+            attempt += 1
+
+    @asynccontextmanager
+    async def _slot(self):
+        semaphore = self._semaphore()
+        async with semaphore:
+            if self.bucket is not None:
+                await self.bucket.acquire()
+            self._stats["requests"] += 1
+            yield
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        return self._for_loop(self._semaphores, lambda: asyncio.Semaphore(self.max_concurrency))
+
+    def _aio(self):
+        return self._for_loop(self._aio_clients, lambda: _loop_client(self.client.client)).aio
+
+    def _for_loop(self, store: dict, create):
+        """Valor de `store` para el event loop actual; descarta los de loops cerrados."""
+        loop = asyncio.get_running_loop()
+        with self._loop_lock:
+            for closed in [other for other in store if other.is_closed()]:
+                del store[closed]
+            value = store.get(loop)
+            if value is None:
+                value = create()
+                store[loop] = value
+            return value
+
+    def _retry_delay(self, attempt: int, error: errors.APIError):
+        """Segundos a esperar antes de reintentar, o None si no es un error de cuota."""
+        if not _is_quota_error(error):
+            return None
+
+        self._stats["quota_errors"] += 1
+        if self.bucket is not None:
+            self.bucket.drain()
+        if attempt >= self.max_retries:
+            raise QuotaExhausted(
+                f"Gemini quota exceeded after {self.max_retries} retries: {error.message}"
+            ) from error
+
+        self._stats["retries"] += 1
+        delay = self._rng() * min(self.max_delay, self.base_delay * 2 ** attempt)
+        return max(delay, _server_retry_delay(error))
+
+
+def _loop_client(client: genai.Client) -> genai.Client:
+    """genai.Client nuevo (con su propio cliente httpx) con la API key y las http_options de `client`."""
+    api_client = client._api_client
+    http_options = api_client._http_options.model_copy(update={"httpx_async_client": None})
+    return genai.Client(api_key=api_client.api_key, http_options=http_options)
+
+
+def _is_quota_error(error: errors.APIError) -> bool:
+    return error.code == 429 or error.status == "RESOURCE_EXHAUSTED"
+
+
+def _server_retry_delay(error: errors.APIError) -> float:
+    """retryDelay de RetryInfo en la respuesta de error ("2s", "0.5s"), o 0."""
+    body = error.details if isinstance(error.details, dict) else {}
+    for detail in body.get("error", {}).get("details", []) or []:
+        delay = detail.get("retryDelay") if isinstance(detail, dict) else None
+        if isinstance(delay, str) and delay.endswith("s"):
+            try:
+                return float(delay[:-1])
+            except ValueError:
+                return 0.0
+    return 0.0
+
+
+def _chunk_text(chunk):
+    if chunk.candidates:
+        parts = chunk.candidates[0].content.parts
+        if parts and hasattr(parts[0], "text"):
+            return parts[0].text
+    return None
+
+
+# (GeminiClient, max_concurrency, requests_per_minute) -> AsyncGeminiClient.
+# La clave es el objeto y no su id: después de ClientRegistry.close() un
+# GeminiClient nuevo podría reutilizar el id de uno ya cerrado.
+_shared_clients = {}
+_shared_lock = threading.Lock()
+
+
+def get_async_gemini_client(max_concurrency: int = 4, requests_per_minute: float = None, **kwargs) -> AsyncGeminiClient:
+    """
+    AsyncGeminiClient compartido sobre get_gemini_client(): todas las
+    sesiones usan el mismo token bucket, que es lo que hace falta para
+    respetar una cuota por API key (el semáforo es por event loop).
+    """
+    client = get_gemini_client(**kwargs)
+    key = (client, max_concurrency, requests_per_minute)
+    with _shared_lock:
+        async_client = _shared_clients.get(key)
+        if async_client is None:
+            async_client = AsyncGeminiClient(client, max_concurrency=max_concurrency, requests_per_minute=requests_per_minute)
+            _shared_clients[key] = async_client
+        return async_client
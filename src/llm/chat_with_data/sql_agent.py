@@ -1,15 +1,19 @@
 from pathlib import Path
 from src.db.sqlite_manager import get_connection
+from src.metrics import NULL_METRICS
 
 BASE_DIR = Path(__file__).resolve().parent
 DB_FILE = BASE_DIR / "database" / "data_assistant.db"
 
 class SQLAgent:
 
-    def __init__(self, llm_client, db_path=DB_FILE):
+    def __init__(self, llm_client, db_path=DB_FILE, metrics=None):
 
         self.llm = llm_client
         self.db_path = db_path
+        # metrics: registra chat_schema_seconds, chat_llm_ttft_seconds y
+        #   chat_llm_total_seconds
+        self.metrics = metrics or NULL_METRICS
 
     def get_schema_from_db(self):
 
@@ -41,7 +45,10 @@ class SQLAgent:
 
     def generate_sql_stream(self, question):
 
-        schema_text = self.get_schema_from_db()
+        start = self.metrics.now()
+
+        with self.metrics.timer("chat_schema_seconds"):
+            schema_text = self.get_schema_from_db()
 
         prompt = f"""
     You are a SQL expert.
@@ -63,5 +70,12 @@ class SQLAgent:
         
         stream = self.llm.generate_stream(prompt)
 
-        for chunk in stream:
-            yield chunk
\ No newline at end of file
+        first = True
+        try:
+            for chunk in stream:
+                if first:
+                    self.metrics.observe("chat_llm_ttft_seconds", self.metrics.now() - start)
+                    first = False
+                yield chunk
+        finally:
+            self.metrics.observe("chat_llm_total_seconds", self.metrics.now() - start)
@@ -1,9 +1,18 @@
 import pandas as pd
 
 from src.db.sqlite_manager import get_connection
+from src.cost_guard import estimate_sqlite_plan
+from src.metrics import NULL_METRICS
 
 class SQLExecutor:
 
+    def __init__(self, cost_guard=None, metrics=None):
+        # cost_guard: CostGuard opcional, se evalúa antes de ejecutar
+        # metrics: registra chat_preflight_seconds, chat_query_seconds
+        #   (consulta + DataFrame) y chat_rows
+        self.cost_guard = cost_guard
+        self.metrics = metrics or NULL_METRICS
+
     def clean_sql(self, sql):
         sql = sql.strip()
         sql = sql.replace("```sql", "")
@@ -12,14 +21,46 @@ class SQLExecutor:
 
         return sql
 
+    def preflight(self, sql):
+        """Decisión del cost guard para `sql` (None si no hay guard)."""
+        if self.cost_guard is None:
+            return None
+
+        conn = get_connection()
+        try:
+            estimate = estimate_sqlite_plan(conn, sql)
+        finally:
+            conn.close()
+
+        return self.cost_guard.evaluate(sql, estimate, dialect="sqlite")
+
     def run_query(self, sql):
+        """
+        Ejecuta la consulta y devuelve un DataFrame. Si hay cost guard, su
+        decisión queda en `df.attrs["cost_guard"]`.
+        """
         sql = self.clean_sql(sql)
 
         try:
-            conn = get_connection()
-            df = pd.read_sql_query(sql, conn)
-            conn.close()
+            with self.metrics.timer("chat_preflight_seconds"):
+                decision = self.preflight(sql)
+        except Exception as e:
+            raise RuntimeError(f"SQL execution error: {str(e)}")
+
+        if decision and decision["action"] == "reject":
+            raise RuntimeError(decision["reason"])
+
+        if decision:
+            sql = decision["sql"]
+
+        try:
+            with self.metrics.timer("chat_query_seconds"):
+                conn = get_connection()
+                df = pd.read_sql_query(sql, conn)
+                conn.close()
+            self.metrics.observe("chat_rows", len(df))
 
+            df.attrs["cost_guard"] = decision
             return df
 
         except Exception as e:
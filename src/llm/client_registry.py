@@ -0,0 +1,81 @@
+import os
+import threading
+
+from google import genai
+
+from src.llm.gemini_client import GeminiClient
+
+
+class ClientRegistry:
+    """
+    Clientes de Gemini compartidos entre sesiones de Streamlit y reruns.
+
+    Crear un genai.Client arma su cliente HTTP (y su pool de conexiones),
+    así que se crea uno solo por API key y todos los GeminiClient de esa key
+    lo comparten. Como temperature y max_tokens se pasan por llamada, basta
+    un GeminiClient por (API key, cache, replay_only): cualquier sesión y
+    cualquier combinación de parámetros reutiliza el mismo.
+
+    `client_factory(api_key)` crea el genai.Client (inyectable en tests).
+    """
+
+    def __init__(self, client_factory=None):
+        self.client_factory = client_factory or (lambda api_key: genai.Client(api_key=api_key))
+        self._lock = threading.Lock()
+        self._http_clients = {}  # api_key -> genai.Client
+        self._clients = {}       # (api_key, id(cache), replay_only) -> GeminiClient
+        self._stats = {"hits": 0, "created": 0, "http_clients": 0}
+
+    def get(self, api_key: str = None, cache=None, replay_only: bool = False) -> GeminiClient:
+        """
+        GeminiClient compartido. api_key por defecto sale de GEMINI_API_KEY;
+        replay_only no la necesita (ver GeminiClient).
+        """
+        if not replay_only:
+            api_key = api_key or os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                raise RuntimeError("GEMINI_API_KEY not found in environment variables")
+
+        key = (api_key, id(cache) if cache is not None else None, replay_only)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._stats["hits"] += 1
+                return client
+
+            http_client = None
+            if not replay_only:
+                http_client = self._http_clients.get(api_key)
+                if http_client is None:
+                    http_client = self.client_factory(api_key)
+                    self._http_clients[api_key] = http_client
+                    self._stats["http_clients"] += 1
+
+            client = GeminiClient(cache=cache, replay_only=replay_only, client=http_client)
+            # el cache se guarda en el cliente: su id no se reutiliza mientras viva
+            self._clients[key] = client
+            self._stats["created"] += 1
+            return client
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self) -> None:
+        """Cierra los clientes HTTP; el próximo get() los vuelve a crear."""
+        with self._lock:
+            http_clients = list(self._http_clients.values())
+            self._http_clients = {}
+            self._clients = {}
+        for http_client in http_clients:
+            close = getattr(http_client, "close", None)
+            if close is not None:
+                close()
+
+
+# Registro del proceso: lo comparten todas las sesiones de la app
+DEFAULT_REGISTRY = ClientRegistry()
+
+
+def get_gemini_client(api_key: str = None, cache=None, replay_only: bool = False) -> GeminiClient:
+    return DEFAULT_REGISTRY.get(api_key=api_key, cache=cache, replay_only=replay_only)
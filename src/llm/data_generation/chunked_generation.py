@@ -0,0 +1,159 @@
+import asyncio
+from typing import List, Sequence, Tuple
+
+from src.ddl_parser import parse_ddl_text
+from src.schema_converter import schema_to_index
+from src.schema_index import SchemaIndex
+from src.llm.data_generation.prompt_builder import build_generation_prompt
+from src.llm.data_generation.response_parser import parse_llm_response
+
+DEFAULT_ROWS_PER_CHUNK = 50
+
+
+async def generate_rows(
+    client,
+    schema,
+    user_prompt: str,
+    total_rows: int,
+    rows_per_chunk: int = DEFAULT_ROWS_PER_CHUNK,
+    table_name: str = None,
+    temperature=None,
+    max_tokens=None,
+) -> List[dict]:
+    """
+    Genera `total_rows` filas con el LLM en chunks de `rows_per_chunk`,
+    todos los prompts a la vez (`client` es un AsyncGeminiClient: su
+    semáforo y su token bucket limitan cuántos van en paralelo).
+
+    Cada respuesta se recorta a las filas pedidas y se une con merge_chunks
+    usando las claves de `table_name` en el schema. Si algún chunk falla se
+    propaga el error, como con un solo llamado.
+    """
+    counts = split_rows(total_rows, rows_per_chunk)
+    prompts = [
+        build_generation_prompt(
+            schema=schema,
+            user_prompt=user_prompt,
+            rows_per_table=count,
+            chunk_index=n,
+            chunk_count=len(counts),
+        )
+        for n, count in enumerate(counts)
+    ]
+    responses = await asyncio.gather(*(
+        client.generate_json(prompt, temperature=temperature, max_tokens=max_tokens)
+        for prompt in prompts
+    ))
+
+    chunks = []
+    for count, response in zip(counts, responses):
+        data = parse_llm_response(response)
+        if "data" not in data:
+            raise ValueError("JSON does not contain 'data' key")
+        chunks.append(data["data"][:count])
+
+    primary_key, unique = key_columns(schema, table_name)
+    return merge_chunks(chunks, primary_key, unique)
+
+
+def split_rows(total_rows: int, rows_per_chunk: int) -> List[int]:
+    """Filas de cada chunk: split_rows(120, 50) == [50, 50, 20]."""
+    if total_rows < 1:
+        raise ValueError("total_rows must be >= 1")
+    if rows_per_chunk < 1:
+        raise ValueError("rows_per_chunk must be >= 1")
+    return [min(rows_per_chunk, total_rows - start) for start in range(0, total_rows, rows_per_chunk)]
+
+
+# -------------------------
+# Keys
+# -------------------------
+
+def key_columns(schema, table_name: str = None) -> Tuple[List[str], List[str]]:
+    """
+    (primary key, columnas UNIQUE) de la tabla según el schema, que puede
+    ser texto DDL o el dict de schema_converter. Si no se puede saber se
+    asume (["id"], []).
+    """
+    index = _schema_index(schema)
+    name = index.resolve_table(table_name) if index is not None and table_name else None
+    if name is None:
+        return ["id"], []
+
+    columns = index.columns(name)
+    primary_key = list(index.table(name).get("primary_keys") or [])
+    if not primary_key:
+        primary_key = [col for col, spec in columns.items() if spec.get("primary_key")]
+    unique = [col for col, spec in columns.items() if spec.get("unique") and col not in primary_key]
+    return primary_key or ["id"], unique
+
+
+def _schema_index(schema):
+    try:
+        if isinstance(schema, str):
+            return schema_to_index(parse_ddl_text(schema))
+        if isinstance(schema, dict) and "tables" in schema:
+            return SchemaIndex.of(schema)
+    except (KeyError, TypeError, ValueError):
+        # JSON subido a mano sin la forma de schema_converter
+        return None
+    return None
+
+
+# -------------------------
+# Merge
+# -------------------------
+
+def merge_chunks(chunks: Sequence[list], primary_key: Sequence[str] = ("id",), unique: Sequence[str] = ()) -> List[dict]:
+    """
+    Une las filas de los chunks, en orden, para que las claves no se repitan.
+
+    Cada chunk numera sus ids por su cuenta (todos empiezan en 1), así que
+    una primary key de una sola columna entera se renumera 1..N. Una
+    primary key compuesta o no entera, y las columnas UNIQUE, se
+    deduplican: la fila repetida se descarta (puede quedar alguna fila
+    menos que las pedidas).
+    """
+    rows = [row for chunk in chunks for row in chunk if isinstance(row, dict)]
+    primary_key = [col for col in primary_key if any(col in row for row in rows)]
+
+    renumber = None
+    if len(primary_key) == 1 and all(_is_integer(row.get(primary_key[0])) for row in rows):
+        renumber = primary_key[0]
+    dedupe = [tuple(primary_key)] if primary_key and renumber is None else []
+    dedupe += [(col,) for col in unique if any(col in row for row in rows)]
+
+    seen = {cols: set() for cols in dedupe}
+    merged = []
+    for row in rows:
+        keys = [(cols, _key(row, cols)) for cols in dedupe]
+        if any(key is not None and key in seen[cols] for cols, key in keys):
+            continue
+        for cols, key in keys:
+            if key is not None:
+                seen[cols].add(key)
+        merged.append(row)
+
+    if renumber is not None:
+        for n, row in enumerate(merged, start=1):
+            row[renumber] = n
+    return merged
+
+
+def _is_integer(value) -> bool:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, int):
+        return True
+    return isinstance(value, str) and value.strip().isdigit()
+
+
+def _key(row: dict, cols: tuple):
+    """Clave hasheable de la fila en `cols`, o None si falta alguna (NULL no choca)."""
+    values = []
+    for col in cols:
+        value = row.get(col)
+        if value is None:
+            return None
+        values.append(value if isinstance(value, (str, int, float, bool)) else repr(value))
+    return tuple(values)
@@ -1,6 +1,19 @@
 import json
 
-def build_generation_prompt(schema, user_prompt, rows_per_table=10):
+def build_generation_prompt(schema, user_prompt, rows_per_table=10, chunk_index=0, chunk_count=1):
+    """
+    chunk_index / chunk_count: cuando las filas se piden en varios llamados
+    en paralelo (ver chunked_generation), cada prompt dice qué parte es para
+    que el modelo no repita las mismas filas (y el prompt, y su entrada en el
+    cache de respuestas, sea distinto).
+    """
+    batch = ""
+    if chunk_count > 1:
+        batch = (
+            f"- This is batch {chunk_index + 1} of {chunk_count} generated in parallel: "
+            "make these rows different from the other batches\n"
+        )
+
     return f"""
 You are a system that ONLY outputs raw JSON.
 
@@ -18,7 +31,8 @@ RULES (MANDATORY):
 - Do NOT explain anything
 - Do NOT wrap in markdown
 - JSON must be syntactically valid
-
+- "data" MUST contain exactly {rows_per_table} rows
+{batch}
 OUTPUT FORMAT:
 {{
   "data": [
@@ -2,30 +2,58 @@ import os
 from google import genai
 from google.genai import types
 
+from src.llm.response_cache import ReplayMiss
+
 class GeminiClient:
-    def __init__(self, temperature=0.5, max_tokens=5000):
+    def __init__(self, temperature=0.5, max_tokens=5000, cache=None, replay_only=False, client=None):
+        """
+        temperature / max_tokens: valores por defecto; cada llamada puede
+          pasar los suyos, así un mismo cliente sirve para cualquier
+          combinación de parámetros (ver client_registry).
+        cache: ResponseCache opcional; las respuestas se buscan ahí antes de
+          llamar a la API y se graban después.
+        replay_only: sólo responde desde el cache (no necesita
+          GEMINI_API_KEY ni red); un pedido no grabado lanza ReplayMiss.
+        client: genai.Client ya creado para compartir su cliente HTTP; si
+          no se pasa se crea uno con GEMINI_API_KEY.
+        """
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.geminiModel = "gemini-2.5-flash"
+        self.cache = cache
+        self.replay_only = replay_only
+
+        if replay_only:
+            if cache is None:
+                raise ValueError("replay_only requires a response cache")
+            self.client = None
+            return
+
+        if client is not None:
+            self.client = client
+            return
+
         api_key = os.getenv("GEMINI_API_KEY")
 
         if not api_key:
             raise RuntimeError("GEMINI_API_KEY not found in environment variables")
 
         self.client = genai.Client(api_key=api_key)
-        self.temperature = temperature
-        self.max_tokens = max_tokens
-        self.geminiModel = "gemini-2.5-flash"
 
     # --------------------------------------------------
     # MODULE 1 → DATA GENERATION
     # --------------------------------------------------
 
-    def generate_json(self, prompt: str) -> dict:
+    def generate_json(self, prompt: str, temperature=None, max_tokens=None) -> dict:
+        options = self._options(temperature, max_tokens)
+        key, entry = self._lookup("json", prompt, options)
+        if entry is not None:
+            return entry["value"]
+
         response = self.client.models.generate_content(
             model=self.geminiModel,
             contents=prompt,
-            config=types.GenerateContentConfig(
-                temperature=self.temperature,
-                max_output_tokens=self.max_tokens,
-            ),
+            config=self._config(options),
         )
 
         print("\n" + "=" * 80)
@@ -40,9 +68,11 @@ class GeminiClient:
         print("=" * 80 + "\n")
 
         if response.parsed:
+            self._store(key, {"value": response.parsed})
             return response.parsed
 
         text = response.candidates[0].content.parts[0].text
+        self._store(key, {"value": text})
 
         try:
             return text
@@ -53,35 +83,86 @@ class GeminiClient:
     # MODULE 2 → NORMAL TEXT GENERATION
     # --------------------------------------------------
 
-    def generate(self, prompt: str):
+    def generate(self, prompt: str, temperature=None, max_tokens=None):
+        options = self._options(temperature, max_tokens)
+        key, entry = self._lookup("text", prompt, options)
+        if entry is not None:
+            return entry["value"]
+
         response = self.client.models.generate_content(
             model=self.geminiModel,
             contents=prompt,
-            config=types.GenerateContentConfig(
-                temperature=self.temperature,
-                max_output_tokens=self.max_tokens,
-            ),
+            config=self._config(options),
         )
 
-        return response.candidates[0].content.parts[0].text
+        text = response.candidates[0].content.parts[0].text
+        self._store(key, {"value": text})
+        return text
 
     # --------------------------------------------------
     # MODULE 2 → STREAMING (CHAT)
     # --------------------------------------------------
 
-    def generate_stream(self, prompt: str):
+    def generate_stream(self, prompt: str, temperature=None, max_tokens=None):
+        options = self._options(temperature, max_tokens)
+        key, entry = self._lookup("stream", prompt, options)
+        if entry is not None:
+            # se reproduce chunk por chunk, como el stream original
+            yield from entry["chunks"]
+            return
+
         stream = self.client.models.generate_content_stream(
             model=self.geminiModel,
             contents=prompt,
-            config=types.GenerateContentConfig(
-                temperature=self.temperature,
-                max_output_tokens=self.max_tokens,
-            ),
+            config=self._config(options),
         )
 
+        chunks = []
         for chunk in stream:
             if chunk.candidates:
                 parts = chunk.candidates[0].content.parts
 
                 if parts and hasattr(parts[0], "text"):
+                    chunks.append(parts[0].text)
                     yield parts[0].text
+
+        # sólo se graba el stream completo (no si el consumidor cortó antes)
+        self._store(key, {"chunks": chunks})
+
+    # --------------------------------------------------
+    # OPTIONS
+    # --------------------------------------------------
+
+    def _options(self, temperature, max_tokens) -> tuple:
+        """(temperature, max_tokens) de la llamada, con los defaults del cliente."""
+        return (
+            self.temperature if temperature is None else temperature,
+            self.max_tokens if max_tokens is None else max_tokens,
+        )
+
+    def _config(self, options: tuple):
+        temperature, max_tokens = options
+        return types.GenerateContentConfig(
+            temperature=temperature,
+            max_output_tokens=max_tokens,
+        )
+
+    # --------------------------------------------------
+    # RESPONSE CACHE
+    # --------------------------------------------------
+
+    def _lookup(self, kind: str, prompt: str, options: tuple):
+        """(clave, entrada) del cache; clave None si la llamada no se cachea."""
+        temperature, max_tokens = options
+        if self.cache is None or not (self.replay_only or self.cache.accepts(temperature)):
+            return None, None
+
+        key = self.cache.key(kind, self.geminiModel, temperature, max_tokens, prompt)
+        entry = self.cache.get(key)
+        if entry is None and self.replay_only:
+            raise ReplayMiss(f"No recorded {kind} response for this prompt (key {key[:12]})")
+        return key, entry
+
+    def _store(self, key, entry: dict) -> None:
+        if key is not None:
+            self.cache.put(key, entry)
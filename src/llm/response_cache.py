@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+ENTRY_SUFFIX = ".llm.z"
+
+
+class ReplayMiss(RuntimeError):
+    """Pedido sin respuesta grabada en modo replay (sin acceso a la API)."""
+
+
+class ResponseCache:
+    """
+    Cache en disco de respuestas de GeminiClient.
+
+    La clave es el sha256 de (tipo de llamada, modelo, temperature,
+    max_tokens, sha256 del prompt). Cada entrada es un JSON comprimido con
+    zlib en `<clave>.llm.z`: el valor de generate_json / generate, o la
+    lista de chunks de generate_stream, que se reproducen uno por uno.
+
+    Por defecto sólo se cachean las llamadas deterministas
+    (temperature <= max_temperature); max_temperature=None cachea todas,
+    que es lo que hace falta para grabar respuestas y después reproducirlas
+    con GeminiClient(replay_only=True).
+
+    Límites: `max_bytes` en total (se borran las entradas usadas hace más
+    tiempo, como SchemaCache) y `max_age` segundos desde que se grabó cada
+    entrada (None = sin vencimiento).
+    """
+
+    def __init__(
+        self,
+        directory: str = ".llm_cache",
+        max_bytes: int = 64 * 1024 * 1024,
+        max_age: Optional[float] = 7 * 24 * 3600,
+        max_temperature: Optional[float] = 0.0,
+        compress_level: int = 6,
+        clock=time.time,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_temperature = max_temperature
+        self.compress_level = compress_level
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "writes": 0, "evictions": 0, "errors": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(kind: str, model: str, temperature: float, max_tokens: int, prompt: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        payload = json.dumps([kind, model, temperature, max_tokens, prompt_hash])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def accepts(self, temperature: float) -> bool:
+        """Si las llamadas con esta temperature se cachean."""
+        return self.max_temperature is None or temperature <= self.max_temperature
+
+    # -------------------------
+    # Lookup
+    # -------------------------
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """La entrada grabada ({"value": ...} o {"chunks": [...]}) o None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = json.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        except Exception:
+            self._count("misses")
+            self._count("errors")
+            self._remove(path)
+            return None
+
+        if self.max_age is not None and self._clock() - entry["created"] > self.max_age:
+            self._count("misses")
+            self._count("expired")
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)  # para el LRU
+        except FileNotFoundError:
+            pass
+        self._count("hits")
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> bool:
+        """Graba la entrada. Devuelve False si no es serializable o no entra."""
+        try:
+            data = json.dumps({**entry, "created": self._clock()}, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return False
+        data = zlib.compress(data.encode("utf-8"), self.compress_level)
+        if len(data) > self.max_bytes:
+            return False
+
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        self._count("writes")
+        self._evict()
+        return True
+
+    # -------------------------
+    # Maintenance
+    # -------------------------
+
+    def clear(self) -> int:
+        """Borra todas las entradas. Devuelve cuántas había."""
+        entries = self._entries()
+        for path, _, _ in entries:
+            self._remove(path)
+        return len(entries)
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "entries": len(entries),
+            "size_bytes": sum(size for _, size, _ in entries),
+            "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+        }
+
+    # -------------------------
+    # Internals
+    # -------------------------
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def _entries(self) -> list:
+        """[(path, tamaño, mtime)] de las entradas del directorio."""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if not item.name.endswith(ENTRY_SUFFIX):
+                    continue
+                try:
+                    st = item.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((item.path, st.st_size, st.st_mtime))
+        return entries
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            self._count("evictions")
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
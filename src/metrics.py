@@ -0,0 +1,143 @@
+import json
+import math
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Metrics:
+    """
+    Tiempos por etapa, time-to-first-token y cantidad de filas.
+
+    Cada métrica es un histograma: se guardan las últimas `max_samples`
+    observaciones (para p50/p95/p99) y el count/sum totales. Los tiempos se
+    registran en segundos; por convención sus nombres terminan en
+    `_seconds`.
+
+    Con `enabled=False` todos los métodos vuelven enseguida (sin tomar
+    tiempos ni locks); es lo que usan por defecto los componentes que
+    aceptan `metrics=None` (ver NULL_METRICS).
+    """
+
+    def __init__(self, enabled: bool = True, max_samples: int = 10000, clock=time.perf_counter):
+        self.enabled = enabled
+        self.max_samples = max_samples
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._histograms = {}  # nombre -> {"samples": deque, "count": int, "sum": float}
+
+    def observe(self, name: str, value: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = {
+                    "samples": deque(maxlen=self.max_samples),
+                    "count": 0,
+                    "sum": 0.0,
+                }
+            histogram["samples"].append(value)
+            histogram["count"] += 1
+            histogram["sum"] += value
+
+    def timer(self, name: str):
+        """Context manager que registra la duración del bloque en `name`."""
+        if not self.enabled:
+            return _NOOP_TIMER
+        return self._timer(name)
+
+    @contextmanager
+    def _timer(self, name: str):
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.observe(name, self._clock() - start)
+
+    def now(self) -> float:
+        return self._clock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    # -------------------------
+    # Export
+    # -------------------------
+
+    def summary(self) -> dict:
+        """{nombre: {"count", "sum", "min", "max", "p50", "p95", "p99"}}"""
+        with self._lock:
+            snapshot = {
+                name: (sorted(h["samples"]), h["count"], h["sum"])
+                for name, h in self._histograms.items()
+            }
+
+        out = {}
+        for name, (samples, count, total) in sorted(snapshot.items()):
+            entry = {
+                "count": count,
+                "sum": total,
+                "min": samples[0] if samples else None,
+                "max": samples[-1] if samples else None,
+            }
+            for q in QUANTILES:
+                entry[_quantile_label(q)] = _quantile(samples, q)
+            out[name] = entry
+        return out
+
+    def to_prometheus(self, prefix: str = "nl2sql_") -> str:
+        """Formato de texto de Prometheus (un `summary` por métrica)."""
+        lines = []
+        for name, entry in self.summary().items():
+            metric = _prometheus_name(prefix + name)
+            lines.append(f"# TYPE {metric} summary")
+            for q in QUANTILES:
+                value = entry[_quantile_label(q)]
+                lines.append(f'{metric}{{quantile="{q}"}} {_prometheus_value(value)}')
+            lines.append(f"{metric}_sum {_prometheus_value(entry['sum'])}")
+            lines.append(f"{metric}_count {entry['count']}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def export_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def export_prometheus(self, path: str, prefix: str = "nl2sql_") -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus(prefix))
+
+
+class _NoopTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_TIMER = _NoopTimer()
+
+NULL_METRICS = Metrics(enabled=False)
+
+
+def _quantile(samples: list, q: float):
+    # nearest-rank sobre las muestras ya ordenadas
+    if not samples:
+        return None
+    rank = max(1, math.ceil(q * len(samples)))
+    return samples[rank - 1]
+
+def _quantile_label(q: float) -> str:
+    return f"p{q * 100:g}"
+
+def _prometheus_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_:]", "_", name)
+
+def _prometheus_value(value) -> str:
+    return "NaN" if value is None else repr(float(value))
@@ -1,41 +1,488 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from src.intent_parser import IntentParser
 from src.sql_query_builder import SQLQueryBuilder
 from src.query_executor import QueryExecutor
+from src.approximate import ApproximateAggregator
+from src.metrics import NULL_METRICS
+from src.utils.rows import as_tuple
 
 class NLToSQLPipeline:
-    def __init__(self, schema: dict, connection_params: dict):
+    def __init__(
+        self,
+        schema: dict,
+        connection_params: dict,
+        cost_guard=None,
+        cache=None,
+        approximator=None,
+        preaggregates=None,
+        metrics=None,
+        **executor_options,
+    ):
+        """
+        cost_guard: CostGuard opcional; cada consulta pasa antes por EXPLAIN
+        cache: QueryCache opcional (texto -> intent/SQL y SQL -> resultado)
+        approximator: ApproximateAggregator usado en modo aproximado
+            (por defecto muestreo del 1%)
+        preaggregates: PreAggregateManager opcional; los count/aggregate
+            frecuentes se leen de vistas materializadas
+        metrics: Metrics opcional; registra la duración de cada etapa
+            (pipeline_parse_seconds, pipeline_build_seconds,
+            pipeline_explain_seconds, pipeline_execute_seconds,
+            pipeline_total_seconds) y las filas devueltas (pipeline_rows)
+        executor_options: opciones del pool de QueryExecutor
+            (min_connections, max_connections, acquire_timeout, ...)
+        """
         self.intent_parser = IntentParser(schema)
         self.query_builder = SQLQueryBuilder()
-        self.query_executor = QueryExecutor(connection_params)
+        self.query_executor = QueryExecutor(connection_params, **executor_options)
+        self.cost_guard = cost_guard
+        self.cache = cache
+        self.approximator = approximator or ApproximateAggregator()
+        self.metrics = metrics or NULL_METRICS
+        self.preaggregates = preaggregates
+        if preaggregates is not None and preaggregates.executor is None:
+            preaggregates.executor = self.query_executor
+
+    def run(self, text: str, approximate: bool = False) -> dict:
+        """
+        approximate: responder count/aggregate con una estimación (muestreo o
+        estadísticas) y su cota de error. También se activa si la pregunta
+        lo pide ("approximately", "roughly", ...).
+        """
+        with self.metrics.timer("pipeline_total_seconds"):
+            # 1. Parse intent + build SQL (memoizado si hay cache)
+            intent, sql, params = self._plan(text)
+            return self._dispatch(intent, sql, params, approximate)
+
+    def invalidate(self, table: str = None) -> int:
+        """Invalida resultados cacheados (de una tabla o todos)."""
+        if self.cache is None:
+            return 0
+        return self.cache.invalidate(table)
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats() if self.cache is not None else {}
+
+    def run_many(self, texts: list, max_workers: int = None, approximate: bool = False) -> list:
+        """
+        Ejecuta muchas preguntas a la vez. El parseo de intents se hace en el
+        hilo actual; build + ejecución se reparten en un pool de hilos acotado
+        (por defecto, tantos como conexiones máximas del pool de Postgres).
+
+        Devuelve una respuesta por pregunta, en el mismo orden. Cada respuesta
+        tiene la clave "error": None si salió bien, o el mensaje del error.
+        """
+        if max_workers is None:
+            max_workers = self.query_executor.pool.max_connections
+
+        plans = []
+        for text in texts:
+            try:
+                plans.append(self._plan(text))
+            except Exception as e:
+                plans.append(e)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            futures = [
+                None if isinstance(plan, Exception) else pool.submit(self._dispatch, *plan, approximate)
+                for plan in plans
+            ]
+
+            responses = []
+            for plan, future in zip(plans, futures):
+                if future is None:
+                    responses.append(self._error_response(None, plan))
+                    continue
+                try:
+                    response = future.result()
+                    response["error"] = None
+                except Exception as e:
+                    response = self._error_response(plan[0], e)
+                responses.append(response)
+
+        return responses
+
+    def run_batch(self, texts: list, approximate: bool = False) -> list:
+        """
+        Como `run_many`, pero junta las preguntas compatibles en menos
+        consultas:
+
+        - count/aggregate sin GROUP BY: una sola consulta de una fila para
+          todas (una subconsulta por tabla, ver SQLQueryBuilder.build_batch)
+        - aggregate con la misma tabla, GROUP BY y filtros: un solo recorrido
+
+        El resultado combinado se separa en una respuesta por pregunta, en el
+        mismo orden y con la misma forma que `run` (más la clave "batch" con
+        la consulta combinada). El resto de las preguntas, las que salen del
+        cache o de una vista materializada, y las aproximadas, se ejecutan
+        una por una.
+        """
+        responses = [None] * len(texts)
+        flat = []
+        grouped = {}
+
+        for i, text in enumerate(texts):
+            intent = None
+            try:
+                intent, sql, params = self._plan(text)
+                if intent["action"] not in ("count", "aggregate") or (approximate or intent.get("approximate")):
+                    responses[i] = self._with_error(self._dispatch(intent, sql, params, approximate))
+                    continue
+
+                routed = self._route_preaggregate(intent)
+                if routed is not None:
+                    responses[i] = self._with_error(self._execute_plan(intent, *routed))
+                    continue
+
+                cached = self.cache.get_result(sql, params) if self.cache is not None else None
+                if cached is not None:
+                    response = self._build_response(intent, params, **cached)
+                    response["cached"] = True
+                    responses[i] = self._with_error(response)
+                    continue
+            except Exception as e:
+                responses[i] = self._error_response(intent, e)
+                continue
+
+            item = (i, intent, sql, params)
+            if intent.get("group_by"):
+                key = (intent["table"], intent["group_by"], repr(intent.get("filters") or []))
+                grouped.setdefault(key, []).append(item)
+            else:
+                flat.append(item)
+
+        for items in [flat, *grouped.values()]:
+            if not items:
+                continue
+            for i, response in self._run_batched(items):
+                responses[i] = response
+
+        return responses
 
-    def run(self, text: str) -> dict:
-        # 1. Parse intent
-        intent = self.intent_parser.parse(text)
+    def _run_batched(self, items: list) -> list:
+        """[(índice, intent, sql, params)] -> [(índice, respuesta)]."""
+        if len(items) == 1:
+            return self._run_each(items)
 
+        intents = [intent for _, intent, _, _ in items]
+        grouped = bool(intents[0].get("group_by"))
+
+        try:
+            if grouped:
+                batch_sql, batch_params = self.query_builder.build_grouped_batch(intents)
+                positions = list(range(1, len(intents) + 1))
+            else:
+                batch_sql, batch_params, positions = self.query_builder.build_batch(intents)
+
+            if self.cost_guard is not None:
+                estimate = self.query_executor.explain(batch_sql, batch_params)
+                if self.cost_guard.evaluate(batch_sql, estimate)["action"] != "allow":
+                    # cada pregunta pasa sola por el guard
+                    return self._run_each(items)
+
+            with self.metrics.timer("pipeline_batch_execute_seconds"):
+                rows = [as_tuple(row) for row in self.query_executor.execute(batch_sql, batch_params) or []]
+        except Exception:
+            # una pregunta inválida hace fallar toda la consulta combinada:
+            # se ejecutan de a una para que el error quede solo en la suya
+            return self._run_each(items)
+
+        out = []
+        for (i, intent, sql, params), position in zip(items, positions):
+            if grouped:
+                result = [(row[0], row[position]) for row in rows]
+            else:
+                result = [(rows[0][position],)] if rows else []
+
+            if self.cache is not None:
+                self.cache.put_result(
+                    sql, params,
+                    {"sql": sql, "result": result, "cost_guard": None, "preaggregate": None},
+                    table=intent.get("table"),
+                )
+
+            response = self._build_response(intent, params, sql, result, None)
+            response["batch"] = {"sql": batch_sql, "params": batch_params, "size": len(items)}
+            out.append((i, self._with_error(response)))
+        return out
+
+    def _run_each(self, items: list) -> list:
+        return [(i, self._with_error(self._safe_execute(intent, sql, params))) for i, intent, sql, params in items]
+
+    def _safe_execute(self, intent: dict, sql: str, params: tuple) -> dict:
+        try:
+            return self._execute_plan(intent, sql, params)
+        except Exception as e:
+            return self._error_response(intent, e)
+
+    @staticmethod
+    def _with_error(response: dict) -> dict:
+        response.setdefault("error", None)
+        return response
+
+    def _dispatch(self, intent: dict, sql: str, params: tuple, approximate: bool = False) -> dict:
+        if (approximate or intent.get("approximate")) and intent["action"] in ("count", "aggregate"):
+            return self._run_approximate(intent, sql, params)
+        return self._run_plan(intent, sql, params)
+
+    def _plan(self, text: str) -> tuple:
+        """(intent, sql, params) para un texto; sql es None si no se entendió."""
+        if self.cache is not None:
+            plan = self.cache.get_plan(text)
+            if plan is not None:
+                intent, sql, params = plan
+                return dict(intent), sql, params
+
+        with self.metrics.timer("pipeline_parse_seconds"):
+            intent = self.intent_parser.parse(text)
+        sql, params = None, None
+        if intent["action"] != "unknown":
+            # 2. Build SQL (template + parámetros, para reutilizar planes)
+            with self.metrics.timer("pipeline_build_seconds"):
+                sql, params = self.query_builder.build_parameterized(intent)
+
+        if self.cache is not None:
+            self.cache.put_plan(text, (dict(intent), sql, params))
+        return intent, sql, params
+
+    def _run_plan(self, intent: dict, sql: str, params: tuple) -> dict:
         if intent["action"] == "unknown":
             return {
                 "intent": intent,
                 "sql": None,
+                "params": None,
                 "result": None,
                 "explanation": "Sorry, I could not understand your request.",
             }
 
-        # 2. Build SQL
-        sql = self.query_builder.build(intent)
+        # 2a. Vista materializada, si la forma del intent es frecuente
+        routed = self._route_preaggregate(intent)
+        if routed is not None:
+            return self._execute_plan(intent, *routed)
+        return self._execute_plan(intent, sql, params)
+
+    def _route_preaggregate(self, intent: dict):
+        if self.preaggregates is None or intent["action"] not in ("count", "aggregate"):
+            return None
+        return self.preaggregates.route(intent)
+
+    def _execute_plan(self, intent: dict, sql: str, params: tuple, preaggregate: dict = None) -> dict:
+        # Lo leído de una vista materializada no se cachea: leerla ya es
+        # barato, y un hit repetiría un age_seconds / refreshed_at viejo
+        cache = self.cache if preaggregate is None else None
+
+        cached = cache.get_result(sql, params) if cache is not None else None
+        if cached is not None:
+            response = self._build_response(intent, params, **cached)
+            response["cached"] = True
+            return response
+
+        # 2b. Cost guard (EXPLAIN) opcional
+        query_sql, guard, rejected = self._apply_cost_guard(intent, sql, params)
+        if rejected is not None:
+            return rejected
 
         # 3. Execute SQL
-        result = self.query_executor.execute(sql)
+        with self.metrics.timer("pipeline_execute_seconds"):
+            result = self.query_executor.execute(query_sql, params)
+        self.metrics.observe("pipeline_rows", len(result) if result else 0)
+
+        if cache is not None:
+            cache.put_result(
+                sql, params,
+                {"sql": query_sql, "result": result, "cost_guard": guard, "preaggregate": None},
+                table=intent.get("table"),
+            )
 
+        return self._build_response(intent, params, query_sql, result, guard, preaggregate)
+
+    def _apply_cost_guard(self, intent: dict, sql: str, params: tuple) -> tuple:
+        """(SQL a ejecutar, resultado del guard, respuesta si se rechaza o None)."""
+        if self.cost_guard is None:
+            return sql, None, None
+
+        with self.metrics.timer("pipeline_explain_seconds"):
+            estimate = self.query_executor.explain(sql, params)
+        guard = self.cost_guard.evaluate(sql, estimate)
+
+        if guard["action"] == "reject":
+            return sql, guard, {
+                "intent": intent,
+                "sql": sql,
+                "params": params,
+                "result": None,
+                "explanation": guard["reason"],
+                "cost_guard": guard,
+            }
+        return guard["sql"], guard, None
+
+    def _build_response(self, intent: dict, params: tuple, sql: str, result, cost_guard, preaggregate=None) -> dict:
         # 4. Build explanation
         explanation = self._build_explanation(intent, result)
+        if cost_guard and (cost_guard["action"] == "limit" or cost_guard.get("warning")):
+            explanation += " " + cost_guard["reason"]
+        if preaggregate is not None:
+            explanation += f" (from pre-aggregate refreshed {preaggregate['age_seconds']:.0f}s ago)"
 
         return {
             "intent": intent,
             "sql": sql,
+            "params": params,
             "result": result,
             "explanation": explanation,
+            "cost_guard": cost_guard,
+            "preaggregate": preaggregate,
+            "cached": False,
+        }
+
+    def _run_approximate(self, intent: dict, exact_sql: str, exact_params: tuple) -> dict:
+        sql, params, plan = self.approximator.build(intent)
+
+        estimates = self.cache.get_result(sql, params) if self.cache is not None else None
+        cached = estimates is not None
+        if not cached:
+            with self.metrics.timer("pipeline_execute_seconds"):
+                rows = self.query_executor.execute(sql, params)
+            estimates = self.approximator.estimate(plan, rows)
+
+        if not estimates:
+            # p. ej. tabla nunca analizada (reltuples = -1): respuesta exacta
+            return self._run_plan(intent, exact_sql, exact_params)
+
+        if self.cache is not None and not cached:
+            self.cache.put_result(sql, params, estimates, table=intent.get("table"))
+
+        return {
+            "intent": intent,
+            "sql": sql,
+            "params": params,
+            "result": estimates,
+            "explanation": self._build_approximate_explanation(intent, plan, estimates),
+            "approximate": {
+                "method": plan["method"],
+                "sample_percent": plan["sample_percent"],
+                "confidence": self.approximator.confidence,
+            },
+            "cost_guard": None,
+            "cached": cached,
+        }
+
+    def run_stream(self, text: str, page_size: int = 100) -> dict:
+        """
+        Variante de `run` para SELECTs grandes: `result` contiene sólo la
+        primera página y `batches` es un iterador con las páginas restantes,
+        leídas con un cursor server-side a medida que se consumen.
+
+        Pasa por el mismo cost guard, cache de resultados y métricas que
+        `run`; sólo se cachean los resultados que entran en una página.
+        pipeline_rows se registra cuando el stream termina o se cierra.
+
+        Cerrar `batches` (o agotarlo) devuelve la conexión al pool.
+        """
+        with self.metrics.timer("pipeline_total_seconds"):
+            intent, sql, params = self._plan(text)
+
+            if intent["action"] != "select":
+                response = self._run_plan(intent, sql, params)
+                response["batches"] = iter(())
+                return response
+
+            return self._stream_plan(intent, sql, params, page_size)
+
+    def _stream_plan(self, intent: dict, sql: str, params: tuple, page_size: int) -> dict:
+        cached = self.cache.get_result(sql, params) if self.cache is not None else None
+        if cached is not None:
+            rows = cached["result"] or []
+            response = self._build_response(intent, params, **cached)
+            response["result"] = rows[:page_size]
+            response["batches"] = iter([rows[n:n + page_size] for n in range(page_size, len(rows), page_size)])
+            response["cached"] = True
+            return response
+
+        query_sql, guard, rejected = self._apply_cost_guard(intent, sql, params)
+        if rejected is not None:
+            rejected["batches"] = iter(())
+            return rejected
+
+        with self.metrics.timer("pipeline_execute_seconds"):
+            batches = self.query_executor.execute_stream(query_sql, params, batch_size=page_size)
+            first_page = next(batches, [])
+
+        if len(first_page) < page_size:
+            # Página incompleta: no hay más filas, terminar el cursor
+            for _ in batches:
+                pass
+            self.metrics.observe("pipeline_rows", len(first_page))
+
+            if self.cache is not None:
+                self.cache.put_result(
+                    sql, params,
+                    {"sql": query_sql, "result": first_page, "cost_guard": guard, "preaggregate": None},
+                    table=intent.get("table"),
+                )
+
+            response = self._build_response(intent, params, query_sql, first_page, guard)
+            response["batches"] = iter(())
+            return response
+
+        response = self._build_response(intent, params, query_sql, first_page, guard)
+        response["explanation"] = (
+            f"Showing first {len(first_page)} rows from {intent['table']} "
+            "(more rows available)."
+        )
+        if guard and guard["action"] == "limit":
+            response["explanation"] += " " + guard["reason"]
+        response["batches"] = self._observe_stream(batches, len(first_page))
+        return response
+
+    def _observe_stream(self, batches, rows: int):
+        """Reenvía las páginas y registra pipeline_rows al agotar o cerrar el stream."""
+        try:
+            for batch in batches:
+                rows += len(batch)
+                yield batch
+        finally:
+            close = getattr(batches, "close", None)
+            if close is not None:
+                close()
+            self.metrics.observe("pipeline_rows", rows)
+
+    def _error_response(self, intent, error: Exception) -> dict:
+        return {
+            "intent": intent,
+            "sql": None,
+            "params": None,
+            "result": None,
+            "explanation": f"Query failed: {error}",
+            "error": str(error),
         }
 
+    def _build_approximate_explanation(self, intent: dict, plan: dict, estimates: list) -> str:
+        how = self.approximator.describe(plan)
+        table = intent["table"]
+
+        if plan["grouped"]:
+            return (
+                f"Approximate {plan['metric'].upper()} per {intent['group_by']} in {table} "
+                f"({len(estimates)} groups; {how})."
+            )
+
+        estimate = estimates[0]["estimate"]
+        bound = estimates[0]["error_bound"]
+        if estimate is None:
+            return f"No rows in the sample of {table}; try a larger sample."
+
+        bound_text = f" ± {bound:,.2f}" if bound is not None else ""
+        if plan["metric"] == "count":
+            return f"There are approximately {estimate:,.0f}{bound_text} rows in {table} ({how})."
+
+        column = (intent.get("columns") or ["*"])[0]
+        return (
+            f"Approximate {plan['metric'].upper()}({column}) in {table}: "
+            f"{estimate:,.2f}{bound_text} ({how})."
+        )
+
     def _build_explanation(self, intent: dict, result):
         action = intent["action"]
 
@@ -45,7 +492,7 @@ class NLToSQLPipeline:
 
         if action == "count":
             if result and len(result) > 0:
-                value = list(result[0].values())[0]
+                value = as_tuple(result[0])[0]
                 return f"There are {value} rows in {intent['table']}."
             return "No results found."
 
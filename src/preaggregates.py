@@ -0,0 +1,257 @@
+import hashlib
+import logging
+import threading
+import time
+
+from src.sql_query_builder import SQLQueryBuilder
+
+logger = logging.getLogger(__name__)
+
+# métrica -> expresión sobre las columnas de la vista materializada
+METRIC_EXPRESSIONS = {
+    "count": "row_count",
+    "sum": "total",
+    # * 1.0: con columnas enteras SUM/COUNT sería división entera y no daría
+    # lo mismo que AVG() sobre la tabla
+    "avg": "total * 1.0 / NULLIF(n, 0)",
+    "min": "min_value",
+    "max": "max_value",
+}
+
+
+class PreAggregateManager:
+    """
+    Vistas materializadas para los intents de agregación más frecuentes.
+
+    Cuenta cuántas veces aparece cada forma (tabla, columna, group_by). Al
+    llegar a `threshold` crea una vista materializada con COUNT/SUM/MIN/MAX
+    por grupo, que sirve a todas las métricas de esa forma, y desde entonces
+    `route` reescribe los intents compatibles para leer de la vista.
+
+    Las vistas se refrescan con `refresh_stale()` (o con el hilo de
+    `start_scheduler`); Postgres no tiene refresh incremental nativo, así que
+    se usa REFRESH ... CONCURRENTLY para no bloquear lecturas. Si una vista
+    supera `max_staleness` segundos sin refrescar, se vuelve a la tabla base.
+
+    `executor` es un QueryExecutor; si es None, NLToSQLPipeline le asigna
+    el suyo.
+    """
+
+    def __init__(
+        self,
+        executor=None,
+        threshold: int = 5,
+        refresh_interval: float = 300.0,
+        max_staleness: float = None,
+        clock=time.time,
+    ):
+        self.executor = executor
+        self.threshold = threshold
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness
+        self._clock = clock
+        self._builder = SQLQueryBuilder()
+        self._lock = threading.Lock()
+
+        self._counts = {}  # shape -> apariciones
+        self._views = {}   # shape -> {"name", "status", "refreshed_at", "error"}
+        self._scheduler = None
+
+    # -------------------------
+    # Routing
+    # -------------------------
+
+    def route(self, intent: dict):
+        """
+        Registra el intent y, si su forma ya está materializada, devuelve
+        (sql, params, metadata) para leer de la vista. Si no, None.
+        """
+        shape = self._shape(intent)
+        if shape is None:
+            return None
+
+        with self._lock:
+            self._counts[shape] = self._counts.get(shape, 0) + 1
+            view = self._views.get(shape)
+            should_build = view is None and self._counts[shape] >= self.threshold
+            if should_build:
+                view = self._views[shape] = {
+                    "name": _view_name(shape),
+                    "status": "building",
+                    "refreshed_at": None,
+                    "error": None,
+                }
+
+        if should_build:
+            self._materialize(shape, view)
+
+        if view is None or view["status"] != "ready":
+            return None
+
+        age = self._clock() - view["refreshed_at"]
+        if self.max_staleness is not None and age > self.max_staleness:
+            return None
+
+        sql, params = self._build_routed_query(intent, shape, view["name"])
+        return sql, params, {
+            "source": view["name"],
+            "refreshed_at": view["refreshed_at"],
+            "age_seconds": age,
+        }
+
+    def hot_shapes(self) -> list:
+        """[(shape, apariciones)] de mayor a menor."""
+        with self._lock:
+            return sorted(self._counts.items(), key=lambda kv: kv[1], reverse=True)
+
+    def views(self) -> dict:
+        with self._lock:
+            return {shape: dict(view) for shape, view in self._views.items()}
+
+    # -------------------------
+    # Refresh
+    # -------------------------
+
+    def refresh(self, shape: tuple) -> None:
+        with self._lock:
+            view = self._views.get(shape)
+        if view is None or view["status"] != "ready":
+            return
+        try:
+            self.executor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view['name']};")
+        except Exception as e:
+            # la vista sigue sirviendo hasta pasar max_staleness
+            with self._lock:
+                view["error"] = str(e)
+            raise
+        with self._lock:
+            view["refreshed_at"] = self._clock()
+            view["error"] = None
+
+    def refresh_stale(self) -> int:
+        """Refresca las vistas más viejas que `refresh_interval`. Devuelve cuántas."""
+        now = self._clock()
+        with self._lock:
+            stale = [
+                shape for shape, view in self._views.items()
+                if view["status"] == "ready" and now - view["refreshed_at"] >= self.refresh_interval
+            ]
+        for shape in stale:
+            self.refresh(shape)
+        return len(stale)
+
+    def start_scheduler(self) -> None:
+        """Hilo daemon que llama a `refresh_stale` cada `refresh_interval` segundos."""
+        if self._scheduler is not None:
+            return
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(self.refresh_interval):
+                try:
+                    self.refresh_stale()
+                except Exception:
+                    # el error queda en views()[shape]["error"]
+                    logger.exception("Pre-aggregate refresh failed")
+
+        thread = threading.Thread(target=loop, name="preaggregate-refresh", daemon=True)
+        self._scheduler = (thread, stop)
+        thread.start()
+
+    def stop_scheduler(self) -> None:
+        if self._scheduler is None:
+            return
+        thread, stop = self._scheduler
+        stop.set()
+        thread.join()
+        self._scheduler = None
+
+    # -------------------------
+    # Internals
+    # -------------------------
+
+    def _shape(self, intent: dict):
+        action = intent.get("action")
+        table = intent.get("table")
+        if action not in ("count", "aggregate") or not table:
+            return None
+
+        column = None
+        if action == "aggregate":
+            if (intent.get("metric") or "").lower() not in METRIC_EXPRESSIONS:
+                return None
+            columns = intent.get("columns") or []
+            if not columns:
+                return None
+            column = columns[0]
+
+        group_by = intent.get("group_by")
+        # sólo se pueden filtrar columnas que sobreviven en la vista
+        for f in intent.get("filters") or []:
+            if f.get("column") != group_by:
+                return None
+
+        return (table, column, group_by)
+
+    def _materialize(self, shape: tuple, view: dict) -> None:
+        table, column, group_by = shape
+        table_sql = self._builder._identifier(table)
+
+        select = [self._builder._identifier(group_by) if group_by else "1 AS pk", "COUNT(*) AS row_count"]
+        if column:
+            col = self._builder._identifier(column)
+            select += [
+                f"COUNT({col}) AS n",
+                f"SUM({col}) AS total",
+                f"MIN({col}) AS min_value",
+                f"MAX({col}) AS max_value",
+            ]
+        key = group_by or "pk"
+        group_sql = f" GROUP BY {group_by}" if group_by else ""
+
+        try:
+            existing = self.executor.execute(
+                "SELECT 1 FROM pg_matviews WHERE matviewname = %s;", (view["name"],)
+            )
+            self.executor.execute(
+                f"CREATE MATERIALIZED VIEW IF NOT EXISTS {view['name']} AS "
+                f"SELECT {', '.join(select)} FROM {table_sql}{group_sql};"
+            )
+            # REFRESH ... CONCURRENTLY necesita un índice único
+            self.executor.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {view['name']}_key ON {view['name']} ({key});"
+            )
+            if existing:
+                # quedó de otro proceso: sus datos pueden ser de cualquier momento
+                self.executor.execute(f"REFRESH MATERIALIZED VIEW {view['name']};")
+        except Exception as e:
+            with self._lock:
+                view["status"] = "failed"
+                view["error"] = str(e)
+            return
+
+        with self._lock:
+            view["status"] = "ready"
+            view["refreshed_at"] = self._clock()
+
+    def _build_routed_query(self, intent: dict, shape: tuple, view_name: str) -> tuple:
+        _, _, group_by = shape
+        if intent["action"] == "count":
+            metric, expression = "count", METRIC_EXPRESSIONS["count"]
+        else:
+            metric = intent["metric"].lower()
+            # COUNT(col) no cuenta NULLs: es `n`, no `row_count`
+            expression = "n" if metric == "count" else METRIC_EXPRESSIONS[metric]
+        expression = f"{expression} AS {metric}"
+
+        where, params = self._builder._build_where(intent.get("filters"))
+        if group_by:
+            sql = f"SELECT {group_by}, {expression} FROM {view_name}{where};"
+        else:
+            sql = f"SELECT {expression} FROM {view_name}{where};"
+        return sql, tuple(params)
+
+
+def _view_name(shape: tuple) -> str:
+    digest = hashlib.sha1(repr(shape).encode("utf-8")).hexdigest()[:12]
+    return f"nl2sql_agg_{digest}"
@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueryCache:
+    """
+    Cache de dos niveles para NLToSQLPipeline.
+
+    - Nivel 1 (plans): texto normalizado -> (intent, sql, params). Sólo
+      depende del schema, así que no expira (LRU acotado).
+    - Nivel 2 (results): (sql, params) -> resultado, con TTL e invalidación
+      explícita por tabla.
+
+    Los resultados se devuelven tal cual están guardados: no modificarlos.
+    """
+
+    def __init__(self, max_plans: int = 1024, max_results: int = 256, result_ttl: float = 60.0, clock=time.monotonic):
+        self.max_plans = max_plans
+        self.max_results = max_results
+        self.result_ttl = result_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._plans = OrderedDict()
+        self._results = OrderedDict()  # key -> (expires_at, table, value)
+        self._counters = {
+            "plans": {"hits": 0, "misses": 0},
+            "results": {"hits": 0, "misses": 0, "expired": 0, "invalidated": 0},
+        }
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        # Sin pasar a minúsculas: los valores de los filtros distinguen mayúsculas
+        text = " ".join(text.split())
+        return text.rstrip(" ?!.")
+
+    # -------------------------
+    # Level 1: text -> plan
+    # -------------------------
+
+    def get_plan(self, text: str):
+        key = self.normalize(text)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is None:
+                self._counters["plans"]["misses"] += 1
+                return None
+            self._plans.move_to_end(key)
+            self._counters["plans"]["hits"] += 1
+            return plan
+
+    def put_plan(self, text: str, plan: tuple) -> None:
+        key = self.normalize(text)
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+
+    # -------------------------
+    # Level 2: sql -> result
+    # -------------------------
+
+    def get_result(self, sql: str, params: tuple = None):
+        key = (sql, params)
+        with self._lock:
+            entry = self._results.get(key)
+            counters = self._counters["results"]
+            if entry is None:
+                counters["misses"] += 1
+                return None
+            expires_at, _, value = entry
+            if self._clock() >= expires_at:
+                del self._results[key]
+                counters["expired"] += 1
+                counters["misses"] += 1
+                return None
+            self._results.move_to_end(key)
+            counters["hits"] += 1
+            return value
+
+    def put_result(self, sql: str, params: tuple, value, table: str = None, ttl: float = None) -> None:
+        ttl = self.result_ttl if ttl is None else ttl
+        key = (sql, params)
+        with self._lock:
+            self._results[key] = (self._clock() + ttl, table.lower() if table else None, value)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    # -------------------------
+    # Invalidation hooks
+    # -------------------------
+
+    def invalidate(self, table: str = None) -> int:
+        """
+        Invalida resultados (nivel 2). Con `table`, sólo los de esa tabla.
+        Devuelve la cantidad de entradas eliminadas.
+        """
+        with self._lock:
+            if table is None:
+                removed = len(self._results)
+                self._results.clear()
+            else:
+                table = table.lower()
+                keys = [k for k, (_, t, _) in self._results.items() if t == table]
+                for k in keys:
+                    del self._results[k]
+                removed = len(keys)
+            self._counters["results"]["invalidated"] += removed
+            return removed
+
+    def clear_plans(self) -> None:
+        """Vacía el nivel 1 (por ejemplo, si cambió el schema)."""
+        with self._lock:
+            self._plans.clear()
+
+    def clear(self) -> None:
+        self.clear_plans()
+        self.invalidate()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "plans": _with_rate(self._counters["plans"], len(self._plans)),
+                "results": _with_rate(self._counters["results"], len(self._results)),
+            }
+
+
+def _with_rate(counters: dict, size: int) -> dict:
+    lookups = counters["hits"] + counters["misses"]
+    return {
+        **counters,
+        "size": size,
+        "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+    }
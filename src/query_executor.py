@@ -1,18 +1,143 @@
+import itertools
+import re
+from collections import OrderedDict
+
 import psycopg2
 
+from src.connection_pool import ConnectionPool
+from src.cost_guard import parse_postgres_explain
+
 class QueryExecutor:
-    def __init__(self, connection_params: dict):
+    def __init__(
+        self,
+        connection_params: dict,
+        min_connections: int = 1,
+        max_connections: int = 10,
+        connection_factory=None,
+        prepare_statements: bool = True,
+        max_prepared_per_connection: int = 100,
+        **pool_options,
+    ):
+        """
+        connection_params: parámetros para psycopg2.connect
+        connection_factory: callable sin argumentos que devuelve una conexión
+            (por defecto psycopg2.connect(**connection_params))
+        prepare_statements: si es True, las consultas con parámetros se
+            ejecutan como prepared statements server-side (uno por template
+            y por conexión del pool)
+        pool_options: acquire_timeout, health_check_interval, ...
+        """
         self.connection_params = connection_params
+        self.prepare_statements = prepare_statements
+        self.max_prepared_per_connection = max_prepared_per_connection
+        self.pool = ConnectionPool(
+            connection_factory or self._connect,
+            min_connections=min_connections,
+            max_connections=max_connections,
+            **pool_options,
+        )
+        self._cursor_ids = itertools.count(1)
 
-    def execute(self, sql: str):
-        with psycopg2.connect(**self.connection_params) as conn:
+    def execute(self, sql: str, params: tuple = None):
+        """
+        sql: consulta o template con placeholders `%s`
+        params: valores para los placeholders (None = consulta literal)
+        """
+        with self.pool.connection() as conn:
             with conn.cursor() as cursor:
-                cursor.execute(sql)
+                if params is not None and self.prepare_statements:
+                    self._execute_prepared(conn, cursor, sql, params)
+                elif params is not None:
+                    cursor.execute(sql, params)
+                else:
+                    cursor.execute(sql)
 
                 # SELECT
                 if cursor.description is not None:
-                    return cursor.fetchall()
+                    rows = cursor.fetchall()
+                    conn.commit()
+                    return rows
 
                 # NON-SELECT
                 conn.commit()
                 return None
+
+    def explain(self, sql: str, params: tuple = None) -> dict:
+        """Estimaciones del planner: {"estimated_rows", "estimated_cost"}."""
+        with self.pool.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql.strip().rstrip(';')}", params)
+                rows = cursor.fetchall()
+            conn.rollback()
+        return parse_postgres_explain(rows)
+
+    def execute_stream(self, sql: str, params: tuple = None, batch_size: int = 1000):
+        """
+        Ejecuta un SELECT con un cursor server-side (named cursor) y devuelve
+        un iterador de lotes de filas (listas de hasta `batch_size` filas).
+
+        La conexión queda prestada hasta que el iterador se agota o se cierra.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+
+        with self.pool.connection() as conn:
+            name = f"nl2sql_stream_{next(self._cursor_ids)}"
+            with conn.cursor(name=name) as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(sql, params)
+
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+
+            conn.commit()
+
+    def prepared_statements(self, conn) -> OrderedDict:
+        """Prepared statements vivos en una conexión: template -> nombre."""
+        return self.pool.session_state(conn).setdefault("prepared", OrderedDict())
+
+    def pool_stats(self) -> dict:
+        return self.pool.stats()
+
+    def close(self) -> None:
+        self.pool.close()
+
+    def _execute_prepared(self, conn, cursor, sql: str, params: tuple) -> None:
+        prepared = self.prepared_statements(conn)
+        name = prepared.get(sql)
+
+        if name is None:
+            state = self.pool.session_state(conn)
+            state["next_id"] = state.get("next_id", 0) + 1
+            name = f"nl2sql_stmt_{state['next_id']}"
+            cursor.execute(f"PREPARE {name} AS {_to_positional(sql)}")
+
+            prepared[sql] = name
+            if len(prepared) > self.max_prepared_per_connection:
+                _, evicted = prepared.popitem(last=False)
+                cursor.execute(f"DEALLOCATE {evicted}")
+        else:
+            prepared.move_to_end(sql)
+
+        if params:
+            placeholders = ", ".join(["%s"] * len(params))
+            cursor.execute(f"EXECUTE {name} ({placeholders})", tuple(params))
+        else:
+            cursor.execute(f"EXECUTE {name}")
+
+    def _connect(self):
+        return psycopg2.connect(**self.connection_params)
+
+
+PLACEHOLDER_RE = re.compile(r"%s|%%")
+
+def _to_positional(sql: str) -> str:
+    """Convierte placeholders psycopg2 (`%s`) en parámetros de PREPARE ($1, $2, ...)."""
+    counter = itertools.count(1)
+    return PLACEHOLDER_RE.sub(
+        lambda m: "%" if m.group(0) == "%%" else f"${next(counter)}",
+        sql.rstrip().rstrip(";"),
+    )
@@ -0,0 +1,167 @@
+import hashlib
+import os
+import pickle
+import threading
+import zlib
+
+from src.ddl_parser import PARSER_VERSION, parse_ddl_text
+from src.schema_converter import CONVERTER_VERSION, schema_to_dict
+
+ENTRY_SUFFIX = ".schema.z"
+# Subirlo cuando cambie lo que se guarda en cada entrada (la tupla pickleada)
+ENTRY_VERSION = 1
+
+
+class SchemaCache:
+    """
+    Cache en disco de schemas ya parseados.
+
+    La clave es el sha256 del texto DDL junto con PARSER_VERSION,
+    CONVERTER_VERSION y ENTRY_VERSION: si cambia el DDL, el parser, el
+    formato del dict o el de la entrada, es otra entrada. Cada entrada
+    guarda las Table de parse_ddl_text y el dict de schema_to_dict, como
+    pickle comprimido con zlib, en un archivo `<clave>.schema.z`.
+
+    El tamaño total se limita a `max_bytes`. Al pasarse, se borran las
+    entradas usadas hace más tiempo (cada hit actualiza el mtime del
+    archivo).
+
+    Los archivos se cargan con pickle: el directorio tiene que ser de
+    confianza (es un cache local, no un formato de intercambio).
+    """
+
+    def __init__(self, directory: str = ".schema_cache", max_bytes: int = 64 * 1024 * 1024, compress_level: int = 6):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(ddl_text: str) -> str:
+        digest = hashlib.sha256(f"{PARSER_VERSION}\0{CONVERTER_VERSION}\0{ENTRY_VERSION}\0".encode("utf-8"))
+        digest.update(ddl_text.encode("utf-8"))
+        return digest.hexdigest()
+
+    # -------------------------
+    # Lookup
+    # -------------------------
+
+    def get_or_parse(self, ddl_text: str) -> tuple:
+        """
+        Devuelve (tables, schema) para `ddl_text`: desde el cache si ya se
+        parseó, o parseando y convirtiendo (y guardando) si no.
+        """
+        key = self.key(ddl_text)
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+
+        tables = parse_ddl_text(ddl_text)
+        entry = (tables, schema_to_dict(tables))
+        self.put(key, entry)
+        return entry
+
+    def get_or_parse_file(self, path: str) -> tuple:
+        with open(path, "r", encoding="utf-8") as f:
+            return self.get_or_parse(f.read())
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.loads(zlib.decompress(f.read()))
+            os.utime(path)  # para el LRU
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        except Exception:
+            # entrada corrupta o de otra versión de Python: se descarta
+            self._count("misses")
+            self._count("errors")
+            self._remove(path)
+            return None
+
+        self._count("hits")
+        return entry
+
+    def put(self, key: str, entry: tuple) -> None:
+        data = zlib.compress(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL), self.compress_level)
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)  # atómico: nunca se lee un archivo a medias
+
+        self._count("writes")
+        self._evict()
+
+    # -------------------------
+    # Maintenance
+    # -------------------------
+
+    def clear(self) -> int:
+        """Borra todas las entradas. Devuelve cuántas había."""
+        entries = self._entries()
+        for path, _, _ in entries:
+            self._remove(path)
+        return len(entries)
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "entries": len(entries),
+            "size_bytes": sum(size for _, size, _ in entries),
+            "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+        }
+
+    # -------------------------
+    # Internals
+    # -------------------------
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ENTRY_SUFFIX)
+
+    def _entries(self) -> list:
+        """[(path, tamaño, mtime)] de las entradas del directorio."""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if not item.name.endswith(ENTRY_SUFFIX):
+                    continue
+                try:
+                    st = item.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((item.path, st.st_size, st.st_mtime))
+        return entries
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+            self._count("evictions")
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
@@ -1,6 +1,12 @@
 import json
+import marshal
+import struct
 from typing import List, Dict, Any
 from .ddl_parser import Table
+from .schema_index import SchemaIndex
+
+# Subirlo cuando cambie la forma del dict de schema_to_dict (invalida SchemaCache)
+CONVERTER_VERSION = 1
 
 def normalize_type(raw_type: str) -> str:
     """
@@ -55,6 +61,13 @@ def schema_to_dict(tables: List[Table]) -> Dict[str, Any]:
     }
     return schema
 
+def schema_to_index(tables: List[Table]) -> SchemaIndex:
+    """
+    Convierte las tablas y arma el SchemaIndex que comparten IntentParser,
+    DataGenerator e InstructionEngine.
+    """
+    return SchemaIndex(schema_to_dict(tables))
+
 def schema_to_json(tables: List[Table], indent: int = 2) -> str:
     """
     Devuelve un string JSON bien formateado del esquema.
@@ -70,3 +83,143 @@ def save_schema_json(tables: List[Table], output_path: str = "schema_output.json
         json.dump(schema_dict, f, indent=indent, ensure_ascii=False)
     print(f"✅ Esquema guardado en {output_path}")
 
+
+# -------------------------
+# Binary format
+# -------------------------
+# Encabezado | índice | páginas. Las tablas se agrupan en páginas de
+# TABLES_PER_PAGE, cada una un bloque marshal independiente; el índice
+# guarda dónde está cada página y en qué página y posición está cada tabla.
+# Así SchemaFile lee una tabla decodificando sólo su página, y la carga
+# completa hace pocas llamadas a marshal (más rápido que json.load).
+# marshal conserva exactamente el dict (orden de claves, None, bools), pero
+# su formato depende de la versión de Python: el encabezado la guarda y al
+# abrir se valida. Es un formato de cache local, no de intercambio (como
+# pickle, no abrir archivos de terceros).
+
+BINARY_MAGIC = b"NL2SQLSC"
+BINARY_VERSION = 1
+TABLES_PER_PAGE = 32
+# magic, versión del formato, versión de marshal, largo del índice
+_BINARY_HEADER = struct.Struct("<8sHHI")
+
+def schema_dict_to_binary(schema: Dict[str, Any]) -> bytes:
+    """Serializa un dict con la forma de schema_to_dict (o un SchemaIndex)."""
+    if isinstance(schema, SchemaIndex):
+        schema = schema.to_dict()
+    names = list(schema["tables"])
+    tables = list(schema["tables"].values())
+
+    pages = []
+    page_index = []
+    offset = 0
+    for start in range(0, len(tables), TABLES_PER_PAGE):
+        page = marshal.dumps(tables[start:start + TABLES_PER_PAGE], marshal.version)
+        page_index.append((offset, len(page)))
+        pages.append(page)
+        offset += len(page)
+
+    # el resto de las claves (meta, ...) va en el índice, con su orden
+    rest = [(k, None if k == "tables" else v) for k, v in schema.items()]
+    index_block = marshal.dumps({"rest": rest, "tables": names, "pages": page_index}, marshal.version)
+    header = _BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, marshal.version, len(index_block))
+    return b"".join([header, index_block, *pages])
+
+def schema_to_binary(tables: List[Table]) -> bytes:
+    return schema_dict_to_binary(schema_to_dict(tables))
+
+def save_schema_binary(tables: List[Table], output_path: str = "schema_output.bin") -> None:
+    """
+    Como save_schema_json, pero en formato binario (ver SchemaFile).
+    """
+    data = schema_to_binary(tables)
+    with open(output_path, "wb") as f:
+        f.write(data)
+    print(f"✅ Esquema binario guardado en {output_path}")
+
+def load_schema_binary(path: str) -> Dict[str, Any]:
+    """Carga el schema completo; es el mismo dict que schema_to_dict."""
+    with SchemaFile(path) as schema_file:
+        return schema_file.to_dict()
+
+class SchemaFile:
+    """
+    Acceso perezoso a un schema binario: al abrir sólo se lee el índice y
+    cada tabla se decodifica la primera vez que se pide.
+
+        with SchemaFile("schema_output.bin") as schema:
+            employees = schema.table("Employees")
+
+    Los dicts devueltos se cachean y se comparten entre llamadas: no
+    modificarlos.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            header = self._file.read(_BINARY_HEADER.size)
+            if len(header) != _BINARY_HEADER.size:
+                raise ValueError(f"{path}: archivo de schema binario inválido")
+            magic, version, marshal_version, index_size = _BINARY_HEADER.unpack(header)
+            if magic != BINARY_MAGIC or version != BINARY_VERSION:
+                raise ValueError(f"{path}: archivo de schema binario inválido o de otra versión")
+            if marshal_version > marshal.version:
+                raise ValueError(f"{path}: generado con una versión de Python más nueva")
+
+            index = marshal.loads(self._file.read(index_size))
+        except Exception:
+            self._file.close()
+            raise
+
+        self._rest = index["rest"]
+        self._data_start = _BINARY_HEADER.size + index_size
+        self._pages = index["pages"]
+        self._names = index["tables"]
+        self._position = {name: i for i, name in enumerate(self._names)}
+        self._loaded = {}  # número de página -> lista de tablas
+
+    def table_names(self) -> List[str]:
+        return list(self._names)
+
+    def table(self, name: str) -> Dict[str, Any]:
+        """Definición de una tabla (KeyError si no existe)."""
+        page, position = divmod(self._position[name], TABLES_PER_PAGE)
+        tables = self._loaded.get(page)
+        if tables is None:
+            offset, length = self._pages[page]
+            self._file.seek(self._data_start + offset)
+            tables = self._loaded[page] = marshal.loads(self._file.read(length))
+        return tables[position]
+
+    def to_dict(self) -> Dict[str, Any]:
+        if len(self._loaded) < len(self._pages):
+            # las páginas están contiguas: una sola lectura
+            self._file.seek(self._data_start)
+            data = self._file.read()
+            for page, (offset, length) in enumerate(self._pages):
+                if page not in self._loaded:
+                    self._loaded[page] = marshal.loads(data[offset:offset + length])
+
+        values = [table for page in range(len(self._pages)) for table in self._loaded[page]]
+        tables = dict(zip(self._names, values))
+        return {k: tables if k == "tables" else v for k, v in self._rest}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._position
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
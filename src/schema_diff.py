@@ -0,0 +1,140 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.ddl_parser import Table
+from src.schema_converter import table_to_dict
+
+
+@dataclass
+class TableDiff:
+    """
+    Cambios de una tabla que está en los dos schemas. Los cambios de
+    columnas se expresan sobre el dict de table_to_dict:
+    changed_columns = {columna: {atributo: (antes, después)}}.
+    """
+    name: str
+    added_columns: List[str] = field(default_factory=list)
+    removed_columns: List[str] = field(default_factory=list)
+    changed_columns: Dict[str, Dict[str, Tuple[Any, Any]]] = field(default_factory=dict)
+    columns_reordered: bool = False
+    primary_keys: Optional[Tuple[List[str], List[str]]] = None
+    foreign_keys: Optional[Tuple[list, list]] = None
+
+
+@dataclass
+class SchemaDiff:
+    added_tables: List[str] = field(default_factory=list)
+    removed_tables: List[str] = field(default_factory=list)
+    changed_tables: Dict[str, TableDiff] = field(default_factory=dict)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added_tables or self.removed_tables or self.changed_tables)
+
+    def stale_tables(self) -> List[str]:
+        """Tablas cuya conversión o datos generados hay que rehacer."""
+        return self.added_tables + list(self.changed_tables)
+
+
+def diff_schemas(old: List[Table], new: List[Table]) -> SchemaDiff:
+    """
+    Compara dos resultados de parse_ddl_text. Una tabla cuyo raw_body,
+    primary_keys y foreign_keys no cambiaron se da por igual sin convertirla
+    (las columnas salen del raw_body); sólo las demás se comparan en detalle.
+    Una tabla renombrada aparece como eliminada y agregada.
+    """
+    old_by_name = {t.name: t for t in old}
+    new_by_name = {t.name: t for t in new}
+
+    diff = SchemaDiff(
+        added_tables=[name for name in new_by_name if name not in old_by_name],
+        removed_tables=[name for name in old_by_name if name not in new_by_name],
+    )
+    for name, new_table in new_by_name.items():
+        old_table = old_by_name.get(name)
+        if old_table is None or _same_table(old_table, new_table):
+            continue
+        table_diff = _diff_table(table_to_dict(old_table), table_to_dict(new_table))
+        if table_diff is not None:
+            diff.changed_tables[name] = table_diff
+    return diff
+
+
+def update_schema_dict(schema: Dict[str, Any], new_tables: List[Table], diff: SchemaDiff) -> Dict[str, Any]:
+    """
+    Equivalente a schema_to_dict(new_tables), partiendo del `schema` ya
+    convertido del DDL anterior: sólo se convierten las tablas agregadas o
+    cambiadas; el resto reutiliza su dict (no se copia).
+    """
+    stale = set(diff.stale_tables())
+    old_tables = schema["tables"]
+    tables = {}
+    for table in new_tables:
+        if table.name in stale or table.name not in old_tables:
+            tables[table.name] = table_to_dict(table)
+        else:
+            tables[table.name] = old_tables[table.name]
+    return {**schema, "tables": tables}
+
+
+def sqlite_migration(diff: SchemaDiff, new_schema: Dict[str, Any]) -> List[str]:
+    """
+    Sentencias para llevar una base de fixtures de sqlite_manager (todas las
+    columnas TEXT) al schema nuevo. Los cambios de tipo o de constraints no
+    necesitan nada en ese modelo; DROP COLUMN requiere SQLite 3.35+.
+    """
+    statements = []
+    for name in diff.removed_tables:
+        statements.append(f"DROP TABLE IF EXISTS {_quote(name)};")
+    for name in diff.added_tables:
+        columns = ", ".join(f"{_quote(c)} TEXT" for c in new_schema["tables"][name]["columns"])
+        statements.append(f"CREATE TABLE IF NOT EXISTS {_quote(name)} ({columns});")
+    for name, table_diff in diff.changed_tables.items():
+        for column in table_diff.added_columns:
+            statements.append(f"ALTER TABLE {_quote(name)} ADD COLUMN {_quote(column)} TEXT;")
+        for column in table_diff.removed_columns:
+            statements.append(f"ALTER TABLE {_quote(name)} DROP COLUMN {_quote(column)};")
+    return statements
+
+
+def _same_table(old: Table, new: Table) -> bool:
+    return (
+        old.raw_body == new.raw_body
+        and old.primary_keys == new.primary_keys
+        and old.foreign_keys == new.foreign_keys
+    )
+
+
+def _diff_table(old: Dict[str, Any], new: Dict[str, Any]) -> Optional[TableDiff]:
+    old_columns = old["columns"]
+    new_columns = new["columns"]
+    table_diff = TableDiff(
+        name=new["name"],
+        added_columns=[c for c in new_columns if c not in old_columns],
+        removed_columns=[c for c in old_columns if c not in new_columns],
+    )
+    for column, spec in new_columns.items():
+        before = old_columns.get(column)
+        if before is None or before == spec:
+            continue
+        keys = list(spec) + [key for key in before if key not in spec]
+        table_diff.changed_columns[column] = {
+            key: (before.get(key), spec.get(key)) for key in keys if before.get(key) != spec.get(key)
+        }
+    if not (table_diff.added_columns or table_diff.removed_columns):
+        table_diff.columns_reordered = list(old_columns) != list(new_columns)
+    if old["primary_keys"] != new["primary_keys"]:
+        table_diff.primary_keys = (old["primary_keys"], new["primary_keys"])
+    if old["foreign_keys"] != new["foreign_keys"]:
+        table_diff.foreign_keys = (old["foreign_keys"], new["foreign_keys"])
+
+    changed = (
+        table_diff.added_columns or table_diff.removed_columns or table_diff.changed_columns
+        or table_diff.columns_reordered or table_diff.primary_keys is not None or table_diff.foreign_keys is not None
+    )
+    # sólo cambió texto que no llega al schema (comentarios, espacios, raw)
+    return table_diff if changed else None
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
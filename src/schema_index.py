@@ -0,0 +1,186 @@
+from types import MappingProxyType
+from typing import Any, Dict, Optional
+
+from src.ddl_parser import analyze_dependency_graph
+
+
+class SchemaIndex:
+    """
+    Índice inmutable de un schema, armado una sola vez y compartido por
+    IntentParser, DataGenerator, InstructionEngine y schema_converter.
+
+    Acepta las dos formas de schema que circulan en el proyecto:
+    - la de schema_to_dict: {"tables": {nombre: {"columns": {col: {...}}, ...}}}
+    - la de IntentParser: {"tables": [{"name": ..., "columns": [{"name": ...}]}]}
+
+    Todas las búsquedas son O(1): tabla por nombre (también sin distinguir
+    mayúsculas), columna por nombre, columna -> tablas, FKs salientes y
+    entrantes, FK de una columna y niveles de dependencia.
+
+    Los dicts devueltos son los del schema original (o registros armados
+    una vez al indexar): no modificarlos.
+    """
+
+    __slots__ = (
+        "_schema", "_tables", "_lower", "_columns", "_column_tables",
+        "_fks_out", "_fks_in", "_fk_by_column", "_dependencies",
+    )
+
+    def __init__(self, schema: Dict[str, Any]):
+        tables = schema["tables"]
+        table_dicts = tables.values() if isinstance(tables, dict) else tables
+
+        self._schema = schema
+        self._tables = {}
+        self._lower = {}
+        self._columns = {}
+        column_tables = {}
+        fks_out = {}
+        fk_by_column = {}
+
+        for table in table_dicts:
+            name = table["name"]
+            self._tables[name] = table
+            self._lower[name.lower()] = name
+
+            columns = table.get("columns") or {}
+            if isinstance(columns, dict):
+                records = {col: {"name": col, **spec} for col, spec in columns.items()}
+            else:
+                records = {col["name"]: col for col in columns}
+            self._columns[name] = MappingProxyType(records)
+            for col in records:
+                column_tables.setdefault(col, []).append(name)
+
+            fks = tuple(table.get("foreign_keys") or ())
+            fks_out[name] = fks
+            for fk in fks:
+                for col in fk["columns"]:
+                    fk_by_column.setdefault((name, col), fk)
+
+        fks_in = {name: [] for name in self._tables}
+        for name, fks in fks_out.items():
+            for fk in fks:
+                if fk["ref_table"] in fks_in:
+                    fks_in[fk["ref_table"]].append((name, fk))
+
+        self._column_tables = {col: tuple(names) for col, names in column_tables.items()}
+        self._fks_out = fks_out
+        self._fks_in = {name: tuple(refs) for name, refs in fks_in.items()}
+        self._fk_by_column = fk_by_column
+        self._dependencies = analyze_dependency_graph(
+            list(self._tables),
+            ((name, fk["ref_table"], fk) for name, fks in fks_out.items() for fk in fks),
+        )
+
+    @classmethod
+    def of(cls, schema) -> "SchemaIndex":
+        """`schema` si ya es un SchemaIndex; si no, lo indexa."""
+        return schema if isinstance(schema, cls) else cls(schema)
+
+    # -------------------------
+    # Tables and columns
+    # -------------------------
+
+    @property
+    def table_names(self) -> tuple:
+        return tuple(self._tables)
+
+    def has_table(self, name: str) -> bool:
+        return name in self._tables
+
+    def table(self, name: str) -> Dict[str, Any]:
+        """Dict de la tabla tal como está en el schema (KeyError si no existe)."""
+        return self._tables[name]
+
+    def resolve_table(self, name: str) -> Optional[str]:
+        """Nombre real de una tabla, sin distinguir mayúsculas (o None)."""
+        if name in self._tables:
+            return name
+        return self._lower.get(name.lower())
+
+    def columns(self, table: str):
+        """{columna: registro} en orden; cada registro incluye "name"."""
+        return self._columns[table]
+
+    def column(self, table: str, column: str) -> Optional[Dict[str, Any]]:
+        return self._columns[table].get(column)
+
+    def has_column(self, table: str, column: str) -> bool:
+        return table in self._columns and column in self._columns[table]
+
+    @property
+    def column_names(self) -> tuple:
+        """Nombres de columna distintos de todo el schema, en orden de aparición."""
+        return tuple(self._column_tables)
+
+    def tables_with_column(self, column: str) -> tuple:
+        return self._column_tables.get(column, ())
+
+    # -------------------------
+    # Foreign keys
+    # -------------------------
+
+    def foreign_keys(self, table: str) -> tuple:
+        """FKs de `table` hacia otras tablas."""
+        return self._fks_out.get(table, ())
+
+    def referenced_by(self, table: str) -> tuple:
+        """(tabla, fk) de las FKs que apuntan a `table`."""
+        return self._fks_in.get(table, ())
+
+    def foreign_key_for(self, table: str, column: str) -> Optional[Dict[str, Any]]:
+        """Primera FK de `table` que incluye `column` (o None)."""
+        return self._fk_by_column.get((table, column))
+
+    # -------------------------
+    # Dependencies
+    # -------------------------
+
+    @property
+    def levels(self) -> tuple:
+        """Niveles topológicos (ver ddl_parser.analyze_dependencies)."""
+        return tuple(tuple(level) for level in self._dependencies.levels)
+
+    @property
+    def order(self) -> tuple:
+        return tuple(self._dependencies.order)
+
+    @property
+    def cycles(self) -> tuple:
+        return tuple(tuple(cycle) for cycle in self._dependencies.cycles)
+
+    @property
+    def deferred(self) -> tuple:
+        """(tabla, fk) a diferir para romper los ciclos."""
+        return tuple(self._dependencies.deferred)
+
+    # -------------------------
+    # Conversion
+    # -------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        """El schema con la forma de schema_to_dict."""
+        if isinstance(self._schema["tables"], dict):
+            return self._schema
+        tables = {}
+        for name, table in self._tables.items():
+            tables[name] = {
+                **table,
+                "columns": {
+                    col: {k: v for k, v in record.items() if k != "name"}
+                    for col, record in self._columns[name].items()
+                },
+                "primary_keys": list(table.get("primary_keys") or []),
+                "foreign_keys": list(self._fks_out[name]),
+            }
+        return {**self._schema, "tables": tables}
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def __iter__(self):
+        return iter(self._tables)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tables
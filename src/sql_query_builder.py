@@ -1,9 +1,23 @@
+import re
+
+IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$")
+FILTER_OPERATORS = {"=", "!=", "<", "<=", ">", ">="}
+
 class SQLQueryBuilder:
     """
     Construye consultas SQL (PostgreSQL) a partir de intents estructurados.
+
+    `build_parameterized` devuelve un template con placeholders `%s` y la
+    tupla de parámetros (formato psycopg2), de modo que intents que sólo
+    difieren en valores comparten el mismo template (y el mismo plan).
+    `build` devuelve la misma consulta con los valores ya inlineados.
     """
 
     def build(self, intent: dict) -> str:
+        sql, params = self.build_parameterized(intent)
+        return self._inline_params(sql, params)
+
+    def build_parameterized(self, intent: dict) -> tuple:
         action = intent.get("action")
 
         if action == "select":
@@ -21,29 +35,36 @@ class SQLQueryBuilder:
     # Builders
     # -------------------------
 
-    def _build_select(self, intent: dict) -> str:
+    def _build_select(self, intent: dict) -> tuple:
         table = intent["table"]
         limit = intent.get("limit")
 
         if not table:
             raise ValueError("SELECT intent requires a table")
 
-        sql = f"SELECT * FROM {table}"
+        columns = intent.get("columns")
+        projection = ", ".join(self._identifier(c) for c in columns) if columns else "*"
+
+        sql = f"SELECT {projection} FROM {self._identifier(table)}"
+        where, params = self._build_where(intent.get("filters"))
+        sql += where
 
         if limit:
-            sql += f" LIMIT {limit}"
+            sql += " LIMIT %s"
+            params.append(int(limit))
 
-        return sql + ";"
+        return sql + ";", tuple(params)
 
-    def _build_count(self, intent: dict) -> str:
+    def _build_count(self, intent: dict) -> tuple:
         table = intent["table"]
 
         if not table:
             raise ValueError("COUNT intent requires a table")
 
-        return f"SELECT COUNT(*) FROM {table};"
+        where, params = self._build_where(intent.get("filters"))
+        return f"SELECT COUNT(*) FROM {self._identifier(table)}{where};", tuple(params)
 
-    def _build_aggregate(self, intent: dict) -> str:
+    def _build_aggregate(self, intent: dict) -> tuple:
         table = intent["table"]
         metric = intent["metric"]
         group_by = intent.get("group_by")
@@ -51,13 +72,250 @@ class SQLQueryBuilder:
         if not table or not metric:
             raise ValueError("AGGREGATE intent requires table and metric")
 
-        metric_sql = metric.upper()
+        metric_sql = self._metric_sql(intent)
+        table_sql = self._identifier(table)
+        where, params = self._build_where(intent.get("filters"))
 
         if group_by:
+            group_sql = self._identifier(group_by)
             return (
-                f"SELECT {group_by}, {metric_sql}(*) "
-                f"FROM {table} "
-                f"GROUP BY {group_by};"
-            )
+                f"SELECT {group_sql}, {metric_sql} "
+                f"FROM {table_sql}{where} "
+                f"GROUP BY {group_sql};"
+            ), tuple(params)
+
+        return f"SELECT {metric_sql} FROM {table_sql}{where};", tuple(params)
+
+    # -------------------------
+    # Batches
+    # -------------------------
+
+    def build_batch(self, intents: list) -> tuple:
+        """
+        Une count/aggregate sin GROUP BY (de una o varias tablas) en una sola
+        consulta de una fila: una subconsulta por tabla, combinadas con
+        CROSS JOIN, de modo que cada tabla se recorre una sola vez.
+
+        Si todas las consultas de una tabla tienen los mismos filtros van al
+        WHERE; si no, cada expresión lleva su `FILTER (WHERE ...)`.
+
+        Devuelve (sql, params, positions): positions[i] es la columna de la
+        fila resultante que responde a intents[i].
+        """
+        tables = {}
+        for i, intent in enumerate(intents):
+            if intent.get("action") not in ("count", "aggregate") or intent.get("group_by"):
+                raise ValueError("Batches only support count/aggregate intents without GROUP BY")
+            if not intent.get("table"):
+                raise ValueError("Batched intent requires a table")
+            tables.setdefault(intent["table"], []).append(i)
+
+        subqueries = []
+        params = []
+        positions = [None] * len(intents)
+        column = 0
+
+        for n, (table, members) in enumerate(tables.items()):
+            filters = [_filters_key(intents[i].get("filters")) for i in members]
+            shared_where = len(set(filters)) == 1
+
+            select = []
+            for i in members:
+                expression = self._metric_sql(intents[i])
+                if not shared_where:
+                    where, where_params = self._build_where(intents[i].get("filters"))
+                    if where:
+                        expression += f" FILTER ({where.strip()})"
+                        params.extend(where_params)
+                select.append(f"{expression} AS c{column}")
+                positions[i] = column
+                column += 1
+
+            where = ""
+            if shared_where:
+                where, where_params = self._build_where(intents[members[0]].get("filters"))
+                params.extend(where_params)
+
+            subqueries.append(f"(SELECT {', '.join(select)} FROM {self._identifier(table)}{where}) AS b{n}")
+
+        return f"SELECT * FROM {' CROSS JOIN '.join(subqueries)};", tuple(params), positions
+
+    def build_grouped_batch(self, intents: list) -> tuple:
+        """
+        Varios aggregate con la misma tabla, GROUP BY y filtros en un solo
+        recorrido. Devuelve (sql, params); la columna i + 1 responde a
+        intents[i] (la 0 es la del grupo).
+        """
+        first = intents[0]
+        key = (first.get("table"), first.get("group_by"), _filters_key(first.get("filters")))
+        for intent in intents:
+            if intent.get("action") != "aggregate" or not intent.get("group_by"):
+                raise ValueError("Grouped batches only support aggregate intents with GROUP BY")
+            if (intent.get("table"), intent.get("group_by"), _filters_key(intent.get("filters"))) != key:
+                raise ValueError("Grouped batches require the same table, GROUP BY and filters")
+
+        group_sql = self._identifier(first["group_by"])
+        select = [group_sql] + [self._metric_sql(intent) for intent in intents]
+        where, params = self._build_where(first.get("filters"))
+
+        sql = (
+            f"SELECT {', '.join(select)} "
+            f"FROM {self._identifier(first['table'])}{where} "
+            f"GROUP BY {group_sql};"
+        )
+        return sql, tuple(params)
+
+    # -------------------------
+    # Approximate mode
+    # -------------------------
+
+    def build_approximate(self, intent: dict, sample_percent: float, dialect: str = "postgresql") -> tuple:
+        """
+        Consulta aproximada para intents count/aggregate (ver
+        src.approximate.ApproximateAggregator). Devuelve (sql, params, plan);
+        `plan` describe cómo escalar el resultado de la muestra.
+        """
+        action = intent.get("action")
+        table = intent.get("table")
+
+        if action not in ("count", "aggregate"):
+            raise ValueError(f"Approximate mode only supports count/aggregate intents, got: {action}")
+        if not table:
+            raise ValueError("Approximate intent requires a table")
+
+        table_sql = self._identifier(table)
+        filters = intent.get("filters")
+        group_by = intent.get("group_by")
+
+        if action == "count" and not filters and not group_by:
+            return self._build_table_estimate(table_sql, dialect)
+
+        metric = "count" if action == "count" else (intent.get("metric") or "").lower()
+        if metric not in ("count", "sum", "avg", "min", "max"):
+            raise ValueError(f"Unsupported metric for approximate mode: {metric}")
+
+        columns = intent.get("columns") or []
+        column = self._identifier(columns[0]) if columns else None
+        if metric != "count" and column is None:
+            raise ValueError(f"Approximate {metric.upper()} requires a metric column")
+
+        group_sql = self._identifier(group_by) if group_by else None
+
+        if metric in ("min", "max"):
+            select = [f"{metric.upper()}({column})"]
+        elif metric == "count":
+            select = ["COUNT(*)"]
+        else:
+            # con n, Σx y Σx² se calculan estimación y varianza en ambos dialectos
+            select = ["COUNT(*)", f"COUNT({column})", f"SUM({column})", f"SUM({column} * {column})"]
+
+        if group_sql:
+            select.insert(0, group_sql)
+
+        where, params = self._build_where(filters)
+        if dialect == "postgresql":
+            source = f"{table_sql} TABLESAMPLE SYSTEM (%s)"
+            params.insert(0, sample_percent)
+        else:
+            sample_filter = f"(abs(random()) % 1000000) < {int(sample_percent * 10000)}"
+            where = f"{where} AND {sample_filter}" if where else f" WHERE {sample_filter}"
+            source = table_sql
+
+        sql = f"SELECT {', '.join(select)} FROM {source}{where}"
+        if group_sql:
+            sql += f" GROUP BY {group_sql}"
+        sql += ";"
+
+        if dialect == "sqlite":
+            sql = sql.replace("%s", "?")
+
+        plan = {
+            "method": "tablesample" if dialect == "postgresql" else "random_sample",
+            "metric": metric,
+            "grouped": bool(group_sql),
+            "sample_percent": sample_percent,
+        }
+        return sql, tuple(params), plan
+
+    def _build_table_estimate(self, table_sql: str, dialect: str) -> tuple:
+        plan = {"metric": "count", "grouped": False, "sample_percent": None}
+
+        if dialect == "sqlite":
+            # MAX(rowid) sale del índice del rowid: O(log n), exacto si no hubo
+            # borrados; no hay forma barata de acotar el error
+            return f"SELECT MAX(rowid), NULL FROM {table_sql};", (), {**plan, "method": "max_rowid"}
+
+        sql = (
+            "SELECT c.reltuples::bigint, COALESCE(s.n_mod_since_analyze, 0) "
+            "FROM pg_class c "
+            "LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid "
+            "WHERE c.oid = to_regclass(%s);"
+        )
+        return sql, (table_sql,), {**plan, "method": "reltuples"}
+
+    # -------------------------
+    # Helpers
+    # -------------------------
+
+    def _build_where(self, filters) -> tuple:
+        """
+        filters: [{"column": str, "op": str, "value": Any}]
+        Devuelve (" WHERE ...", [params]) o ("", []).
+        """
+        if not filters:
+            return "", []
+
+        clauses = []
+        params = []
+        for f in filters:
+            op = f.get("op", "=")
+            if op not in FILTER_OPERATORS:
+                raise ValueError(f"Unsupported filter operator: {op}")
+            clauses.append(f"{self._identifier(f['column'])} {op} %s")
+            params.append(f["value"])
+
+        return " WHERE " + " AND ".join(clauses), params
+
+    def _metric_sql(self, intent: dict) -> str:
+        if intent["action"] == "count":
+            return "COUNT(*)"
+        if not intent.get("metric"):
+            raise ValueError("AGGREGATE intent requires table and metric")
+        metric = intent["metric"].upper()
+        columns = intent.get("columns")
+        if columns:
+            return f"{metric}({self._identifier(columns[0])})"
+        # sólo COUNT acepta *: AVG(*), SUM(*), ... no son SQL válido
+        if metric != "COUNT":
+            raise ValueError(f"{metric} requires a column")
+        return "COUNT(*)"
+
+    def _identifier(self, name: str) -> str:
+        # Los nombres de tablas/columnas no se pueden parametrizar: validar
+        if not IDENTIFIER_RE.match(str(name)):
+            raise ValueError(f"Invalid SQL identifier: {name}")
+        return name
+
+    def _inline_params(self, sql: str, params: tuple) -> str:
+        if not params:
+            return sql
+
+        parts = sql.split("%s")
+        out = [parts[0]]
+        for value, part in zip(params, parts[1:]):
+            out.append(_sql_literal(value))
+            out.append(part)
+        return "".join(out)
+
+
+def _filters_key(filters) -> tuple:
+    return tuple((f["column"], f.get("op", "="), f["value"]) for f in filters or [])
 
-        return f"SELECT {metric_sql}(*) FROM {table};"
+def _sql_literal(value) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
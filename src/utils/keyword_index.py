@@ -0,0 +1,116 @@
+from collections import deque
+
+
+class KeywordIndex:
+    """
+    Índice multi-patrón (autómata Aho-Corasick) para buscar muchos nombres
+    (tablas, columnas, sinónimos) en un texto con una sola pasada.
+
+    Sólo cuenta coincidencias de palabra completa: "order" no matchea dentro
+    de "order_items". Los patrones se comparan en minúsculas.
+    """
+
+    def __init__(self):
+        self._goto = [{}]    # nodo -> {caracter: nodo}
+        self._fail = [0]
+        self._own = [[]]     # nodo -> [(largo, patrón, valor)] terminados en el nodo
+        self._out = [[]]     # _own + salidas heredadas por los enlaces de fallo
+        self._values = {}
+        self._built = True
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, pattern: str):
+        return pattern.lower() in self._values
+
+    def add(self, pattern: str, value) -> None:
+        """Agrega un patrón. Si ya existía se mantiene el primer valor."""
+        pattern = pattern.lower()
+        if not pattern or pattern in self._values:
+            return
+        self._values[pattern] = value
+
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._own.append([])
+                self._out.append([])
+                self._goto[node][ch] = nxt
+            node = nxt
+        self._own[node].append((len(pattern), pattern, value))
+        self._built = False
+
+    def build(self) -> None:
+        """Calcula los enlaces de fallo (BFS). Se llama solo si hace falta."""
+        queue = deque()
+        for nxt in self._goto[0].values():
+            self._fail[nxt] = 0
+            self._out[nxt] = list(self._own[nxt])
+            queue.append(nxt)
+
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                # heredar las salidas del sufijo más largo (ya calculado: BFS)
+                self._out[nxt] = self._own[nxt] + self._out[self._fail[nxt]]
+
+        self._built = True
+
+    def find_all(self, text: str) -> list:
+        """
+        Devuelve todas las coincidencias de palabra completa como tuplas
+        (inicio, fin, patrón, valor), ordenadas por posición.
+        """
+        if not self._built:
+            self.build()
+
+        text = text.lower()
+        matches = []
+        node = 0
+
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+
+            for length, pattern, value in self._out[node]:
+                start = i - length + 1
+                end = i + 1
+                if _is_boundary(text, start - 1) and _is_boundary(text, end):
+                    matches.append((start, end, pattern, value))
+
+        matches.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        return matches
+
+    def longest_match(self, text: str):
+        """
+        Primera coincidencia del texto; el largo sólo desempata entre las
+        que se solapan con ella ("order items" gana sobre "order").
+        Devuelve (inicio, fin, patrón, valor) o None.
+        """
+        best = None
+        for match in self.find_all(text):
+            if best is None:
+                best = match
+            elif match[0] >= best[1]:
+                break  # find_all ordena por posición: ya no se solapan
+            elif (match[1] - match[0]) > (best[1] - best[0]):
+                best = match
+        return best
+
+
+def _is_boundary(text: str, idx: int) -> bool:
+    if idx < 0 or idx >= len(text):
+        return True
+    ch = text[idx]
+    return not (ch.isalnum() or ch == "_")
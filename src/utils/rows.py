@@ -0,0 +1,5 @@
+def as_tuple(row) -> tuple:
+    """Fila de un executor como tupla: acepta dicts (RealDictCursor) o secuencias."""
+    if isinstance(row, dict):
+        return tuple(row.values())
+    return tuple(row)
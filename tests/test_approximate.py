@@ -0,0 +1,94 @@
+import sys
+import os
+import random
+import sqlite3
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.approximate import ApproximateAggregator
+
+
+@pytest.fixture
+def sqlite_conn():
+    rng = random.Random(7)
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE Employees (id INTEGER PRIMARY KEY, department_id INT, salary REAL)")
+    conn.executemany(
+        "INSERT INTO Employees (department_id, salary) VALUES (?, ?)",
+        [(i % 3, rng.uniform(1000, 5000)) for i in range(20000)],
+    )
+    yield conn
+    conn.close()
+
+
+def run(conn, aggregator, intent):
+    sql, params, plan = aggregator.build(intent)
+    rows = conn.execute(sql, params).fetchall()
+    return aggregator.estimate(plan, rows)
+
+
+def test_postgres_avg_uses_tablesample():
+    aggregator = ApproximateAggregator(sample_percent=2)
+    sql, params, plan = aggregator.build({
+        "action": "aggregate",
+        "table": "Employees",
+        "metric": "avg",
+        "columns": ["salary"],
+        "filters": [{"column": "department_id", "op": "=", "value": 3}],
+    })
+
+    assert sql == (
+        "SELECT COUNT(*), COUNT(salary), SUM(salary), SUM(salary * salary) "
+        "FROM Employees TABLESAMPLE SYSTEM (%s) WHERE department_id = %s;"
+    )
+    assert params == (2, 3)
+    assert plan["method"] == "tablesample"
+
+
+def test_postgres_plain_count_uses_reltuples():
+    aggregator = ApproximateAggregator()
+    sql, params, plan = aggregator.build({"action": "count", "table": "Employees"})
+
+    assert "pg_class" in sql and "reltuples" in sql
+    assert params == ("Employees",)
+
+    estimates = aggregator.estimate(plan, [(120000, 350)])
+    assert estimates == [{"group": None, "estimate": 120000, "error_bound": 350}]
+
+    # Tabla nunca analizada: sin estimación
+    assert aggregator.estimate(plan, [(-1, 0)]) == []
+
+
+def test_sqlite_sampled_avg_within_bound(sqlite_conn):
+    exact = sqlite_conn.execute("SELECT AVG(salary) FROM Employees").fetchone()[0]
+    aggregator = ApproximateAggregator(sample_percent=20, dialect="sqlite", confidence=0.99999)
+
+    [estimate] = run(sqlite_conn, aggregator, {
+        "action": "aggregate",
+        "table": "Employees",
+        "metric": "avg",
+        "columns": ["salary"],
+    })
+
+    assert estimate["error_bound"] > 0
+    assert abs(estimate["estimate"] - exact) <= estimate["error_bound"]
+
+
+def test_sqlite_sampled_count_per_group(sqlite_conn):
+    aggregator = ApproximateAggregator(sample_percent=25, dialect="sqlite", confidence=0.99999)
+
+    estimates = run(sqlite_conn, aggregator, {
+        "action": "count",
+        "table": "Employees",
+        "group_by": "department_id",
+    })
+
+    assert sorted(e["group"] for e in estimates) == [0, 1, 2]
+    for e in estimates:
+        assert abs(e["estimate"] - 20000 / 3) <= e["error_bound"]
+
+
+def test_metric_column_required():
+    with pytest.raises(ValueError):
+        ApproximateAggregator().build({"action": "aggregate", "table": "Employees", "metric": "sum"})
@@ -0,0 +1,222 @@
+import sys
+import os
+import json
+import time
+import asyncio
+import threading
+import pytest
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from google import genai
+from google.genai import errors, types
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.llm.gemini_client import GeminiClient
+from src.llm.async_gemini_client import AsyncGeminiClient, QuotaExhausted, TokenBucket, get_async_gemini_client
+
+
+class FakeGeminiServer:
+    """
+    Servidor HTTP local que responde como la API de Gemini. Los primeros
+    `quota_errors` pedidos devuelven 429 RESOURCE_EXHAUSTED; cada respuesta
+    tarda `latency` segundos.
+    """
+
+    def __init__(self, quota_errors=0, latency=0.0, retry_delay=None, status=429):
+        self.quota_errors = quota_errors
+        self.latency = latency
+        self.retry_delay = retry_delay
+        self.status = status
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def client(self, **kwargs):
+        http_client = genai.Client(api_key="test", http_options=types.HttpOptions(base_url=self.base_url))
+        return AsyncGeminiClient(GeminiClient(temperature=0.0, client=http_client), **kwargs)
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # keep-alive, como la API real: las conexiones quedan en el pool
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                prompt = body["contents"][0]["parts"][0]["text"]
+                with server._lock:
+                    server.requests.append((self.path, prompt))
+                    failing = len(server.requests) <= server.quota_errors
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    time.sleep(server.latency)
+                    if failing:
+                        self._send_error()
+                    elif "streamGenerateContent" in self.path:
+                        self._send_stream(prompt)
+                    else:
+                        self._send_json(200, _response(f"echo {prompt}"))
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+            def _send_error(self):
+                error = {"code": server.status, "message": "quota", "status": "RESOURCE_EXHAUSTED" if server.status == 429 else "INVALID_ARGUMENT"}
+                if server.retry_delay:
+                    error["details"] = [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": server.retry_delay}]
+                self._send_json(server.status, {"error": error})
+
+            def _send_json(self, status, payload):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, prompt):
+                data = b"".join(
+                    b"data: " + json.dumps(_response(word)).encode("utf-8") + b"\r\n\r\n"
+                    for word in prompt.split()
+                )
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def _response(text):
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+
+@pytest.fixture
+def server_factory():
+    servers = []
+
+    def make(**kwargs):
+        server = FakeGeminiServer(**kwargs)
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        server.close()
+
+
+def test_concurrency_is_limited_by_semaphore(server_factory):
+    server = server_factory(latency=0.05)
+    client = server.client(max_concurrency=2)
+
+    async def run():
+        return await asyncio.gather(*(client.generate(f"p{n}") for n in range(6)))
+
+    assert asyncio.run(run()) == [f"echo p{n}" for n in range(6)]
+    assert server.max_in_flight == 2
+
+
+def test_quota_errors_are_retried_with_backoff(server_factory):
+    server = server_factory(quota_errors=2, retry_delay="0.05s")
+    client = server.client(base_delay=0.01, rng=lambda: 1.0)
+
+    start = time.monotonic()
+    assert asyncio.run(client.generate_json("hello")) == "echo hello"
+
+    assert time.monotonic() - start >= 0.1  # nunca menos que el retryDelay del servidor
+    assert len(server.requests) == 3
+    assert client.stats()["retries"] == 2
+
+
+def test_quota_exhausted_after_max_retries(server_factory):
+    server = server_factory(quota_errors=10)
+    client = server.client(max_retries=2, base_delay=0.001)
+
+    with pytest.raises(QuotaExhausted):
+        asyncio.run(client.generate("hello"))
+    assert len(server.requests) == 3
+
+
+def test_other_errors_are_not_retried(server_factory):
+    server = server_factory(quota_errors=1, status=400)
+    client = server.client(base_delay=0.001)
+
+    with pytest.raises(errors.ClientError):
+        asyncio.run(client.generate("hello"))
+    assert len(server.requests) == 1
+
+
+def test_stream_retries_before_first_chunk(server_factory):
+    server = server_factory(quota_errors=1)
+    client = server.client(base_delay=0.001)
+
+    async def run():
+        return [chunk async for chunk in client.generate_stream("select one row")]
+
+    assert asyncio.run(run()) == ["select", "one", "row"]
+    assert len(server.requests) == 2
+
+
+def test_client_survives_several_event_loops(server_factory):
+    # Streamlit hace un asyncio.run por click: las conexiones keep-alive
+    # del loop anterior (ya cerrado) no se pueden reutilizar
+    server = server_factory()
+    client = server.client()
+
+    async def stream(prompt):
+        return [chunk async for chunk in client.generate_stream(prompt)]
+
+    for n in range(3):
+        assert asyncio.run(client.generate(f"run{n}")) == f"echo run{n}"
+        assert asyncio.run(stream(f"stream run{n}")) == ["stream", f"run{n}"]
+    assert len(client._aio_clients) == 1  # los de loops cerrados se descartan
+
+
+def test_shared_async_client_is_keyed_by_client_object():
+    first, second = GeminiClient(client=object()), GeminiClient(client=object())
+
+    with patch("src.llm.async_gemini_client.get_gemini_client", side_effect=[first, first, second]):
+        a = get_async_gemini_client(max_concurrency=3)
+        b = get_async_gemini_client(max_concurrency=3)
+        c = get_async_gemini_client(max_concurrency=3)
+
+    assert a is b and a.client is first
+    assert c is not a and c.client is second
+
+
+def test_token_bucket_spaces_requests():
+    clock = [0.0]
+    waits = []
+
+    async def sleep(seconds):
+        waits.append(seconds)
+        clock[0] += seconds
+
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: clock[0], sleep=sleep)
+
+    async def run():
+        for _ in range(5):
+            await bucket.acquire()
+
+    asyncio.run(run())
+    # dos de ráfaga y después uno cada 0.5 s
+    assert waits == [0.5, 0.5, 0.5]
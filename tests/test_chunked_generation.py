@@ -0,0 +1,101 @@
+import sys
+import os
+import json
+import asyncio
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.ddl_parser import parse_ddl_text
+from src.schema_converter import schema_to_dict
+from src.llm.data_generation.chunked_generation import generate_rows, key_columns, merge_chunks, split_rows
+from src.llm.data_generation.prompt_builder import build_generation_prompt
+
+DDL = """
+CREATE TABLE employees (
+    id INT PRIMARY KEY,
+    email VARCHAR(255) UNIQUE,
+    name VARCHAR(100)
+);
+CREATE TABLE order_items (
+    order_id INT,
+    product_id INT,
+    PRIMARY KEY (order_id, product_id)
+);
+"""
+
+
+class FakeLLM:
+    """Como AsyncGeminiClient: cada chunk numera sus filas desde 1."""
+
+    def __init__(self):
+        self.prompts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_json(self, prompt, temperature=None, max_tokens=None):
+        self.prompts.append(prompt)
+        batch = len(self.prompts)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        count = int(prompt.split("MUST contain exactly ")[1].split()[0])
+        rows = [{"id": n, "email": f"user{n}@batch{batch}.com", "name": f"n{n}"} for n in range(1, count + 2)]
+        return json.dumps({"data": rows})
+
+
+def test_split_rows():
+    assert split_rows(120, 50) == [50, 50, 20]
+    assert split_rows(10, 50) == [10]
+    with pytest.raises(ValueError):
+        split_rows(0, 50)
+
+
+def test_prompt_includes_row_count_and_batch():
+    single = build_generation_prompt({"tables": {}}, "employees", rows_per_table=7)
+    assert "exactly 7 rows" in single and "batch" not in single
+
+    chunk = build_generation_prompt({"tables": {}}, "employees", rows_per_table=7, chunk_index=1, chunk_count=3)
+    assert "batch 2 of 3" in chunk
+
+
+def test_key_columns_from_ddl_and_dict():
+    assert key_columns(DDL, "Employees") == (["id"], ["email"])
+    assert key_columns(schema_to_dict(parse_ddl_text(DDL)), "order_items") == (["order_id", "product_id"], [])
+    assert key_columns({"anything": 1}, "employees") == (["id"], [])
+    assert key_columns(DDL, "missing") == (["id"], [])
+
+
+def test_merge_renumbers_integer_primary_key_and_dedupes_unique():
+    chunks = [
+        [{"id": 1, "email": "a@x.com"}, {"id": 2, "email": "b@x.com"}],
+        [{"id": "1", "email": "c@x.com"}, {"id": 2, "email": "a@x.com"}, {"id": 3, "email": None}],
+    ]
+    merged = merge_chunks(chunks, ["id"], ["email"])
+
+    assert [(row["id"], row["email"]) for row in merged] == [(1, "a@x.com"), (2, "b@x.com"), (3, "c@x.com"), (4, None)]
+
+
+def test_merge_dedupes_composite_and_text_keys():
+    chunks = [
+        [{"order_id": 1, "product_id": 1}, {"order_id": 1, "product_id": 2}],
+        [{"order_id": 1, "product_id": 1}, {"order_id": 2, "product_id": 1}],
+    ]
+    assert merge_chunks(chunks, ["order_id", "product_id"]) == [
+        {"order_id": 1, "product_id": 1}, {"order_id": 1, "product_id": 2}, {"order_id": 2, "product_id": 1},
+    ]
+
+    codes = [[{"id": "A-1"}, {"id": "A-2"}], [{"id": "A-1"}]]
+    assert merge_chunks(codes, ["id"]) == [{"id": "A-1"}, {"id": "A-2"}]
+
+
+def test_generate_rows_runs_chunks_concurrently():
+    llm = FakeLLM()
+    rows = asyncio.run(generate_rows(llm, DDL, "employees", total_rows=120, rows_per_chunk=50, table_name="employees"))
+
+    assert len(llm.prompts) == 3 and llm.max_in_flight == 3
+    assert len(rows) == 120  # cada respuesta trae una fila de más y se recorta
+    assert [row["id"] for row in rows] == list(range(1, 121))
+    assert len({row["email"] for row in rows}) == 120
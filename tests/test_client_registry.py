@@ -0,0 +1,83 @@
+import sys
+import os
+import threading
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.llm.client_registry import ClientRegistry
+from src.llm.response_cache import ResponseCache
+
+
+def fake_response(text):
+    part = SimpleNamespace(text=text)
+    return SimpleNamespace(parsed=None, candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+
+def test_clients_and_http_clients_are_reused():
+    factory = MagicMock(side_effect=lambda api_key: MagicMock(name=api_key))
+    registry = ClientRegistry(client_factory=factory)
+
+    with patch.dict(os.environ, {"GEMINI_API_KEY": "key-a"}):
+        first = registry.get()
+        assert registry.get() is first
+    other_key = registry.get(api_key="key-b")
+
+    assert other_key is not first
+    assert [call.args for call in factory.call_args_list] == [("key-a",), ("key-b",)]
+    assert registry.stats() == {"hits": 1, "created": 2, "http_clients": 2}
+
+
+def test_http_client_is_shared_between_cache_variants(tmp_path):
+    factory = MagicMock(side_effect=lambda api_key: MagicMock())
+    registry = ClientRegistry(client_factory=factory)
+    cache = ResponseCache(str(tmp_path))
+
+    plain = registry.get(api_key="key")
+    cached = registry.get(api_key="key", cache=cache)
+
+    assert plain is not cached
+    assert plain.client is cached.client
+    assert factory.call_count == 1
+
+
+def test_temperature_and_max_tokens_are_per_call():
+    http_client = MagicMock()
+    http_client.models.generate_content.return_value = fake_response("ok")
+    client = ClientRegistry(client_factory=lambda api_key: http_client).get(api_key="key")
+
+    client.generate("p", temperature=0.1, max_tokens=100)
+    client.generate("p")
+
+    configs = [call.kwargs["config"] for call in http_client.models.generate_content.call_args_list]
+    assert (configs[0].temperature, configs[0].max_output_tokens) == (0.1, 100)
+    assert (configs[1].temperature, configs[1].max_output_tokens) == (client.temperature, client.max_tokens)
+
+
+def test_concurrent_sessions_get_one_client():
+    factory = MagicMock(side_effect=lambda api_key: MagicMock())
+    registry = ClientRegistry(client_factory=factory)
+    clients = []
+
+    threads = [threading.Thread(target=lambda: clients.append(registry.get(api_key="key"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(client) for client in clients}) == 1
+    assert factory.call_count == 1
+
+
+def test_close_and_missing_key():
+    http_client = MagicMock()
+    registry = ClientRegistry(client_factory=lambda api_key: http_client)
+    first = registry.get(api_key="key")
+    registry.close()
+
+    http_client.close.assert_called_once()
+    assert registry.get(api_key="key") is not first
+    with patch.dict(os.environ, {}, clear=True), pytest.raises(RuntimeError):
+        registry.get()
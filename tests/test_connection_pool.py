@@ -0,0 +1,208 @@
+import sys
+import os
+import threading
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.connection_pool import ConnectionPool
+
+
+class StubCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql):
+        if self.conn.broken:
+            raise RuntimeError("server closed the connection unexpectedly")
+        self.conn.executed.append(sql)
+
+    def close(self):
+        pass
+
+
+class StubConnection:
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.executed = []
+        self.rollbacks = 0
+
+    def cursor(self):
+        return StubCursor(self)
+
+    def rollback(self):
+        if self.broken:
+            raise RuntimeError("connection already closed")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def factory():
+    created = []
+
+    def connect():
+        conn = StubConnection()
+        created.append(conn)
+        return conn
+
+    connect.created = created
+    return connect
+
+
+def test_reuses_connections(factory):
+    pool = ConnectionPool(factory, min_connections=1, max_connections=3)
+
+    for _ in range(5):
+        with pool.connection() as conn:
+            conn.cursor().execute("SELECT 1")
+
+    assert len(factory.created) == 1
+    stats = pool.stats()
+    assert stats["size"] == 1
+    assert stats["idle"] == 1
+    assert stats["acquired"] == 5
+
+
+def test_min_connections_opened_lazily(factory):
+    pool = ConnectionPool(factory, min_connections=2, max_connections=4)
+    assert factory.created == []
+
+    with pool.connection():
+        pass
+
+    assert len(factory.created) == 2
+
+
+def test_max_connections_and_timeout(factory):
+    pool = ConnectionPool(factory, min_connections=0, max_connections=2)
+
+    first = pool.acquire()
+    second = pool.acquire()
+
+    with pytest.raises(RuntimeError, match="Timed out"):
+        pool.acquire(timeout=0.01)
+
+    assert pool.stats()["timeouts"] == 1
+
+    pool.release(first)
+    third = pool.acquire(timeout=0.01)
+    assert third is first
+    pool.release(second)
+    pool.release(third)
+
+
+def test_waiting_thread_gets_released_connection(factory):
+    pool = ConnectionPool(factory, min_connections=0, max_connections=1)
+    held = pool.acquire()
+    got = []
+
+    worker = threading.Thread(target=lambda: got.append(pool.acquire(timeout=2)))
+    worker.start()
+    pool.release(held)
+    worker.join()
+
+    assert got == [held]
+    assert len(factory.created) == 1
+
+
+def test_error_resets_connection(factory):
+    pool = ConnectionPool(factory, min_connections=0, max_connections=1)
+
+    with pytest.raises(ValueError):
+        with pool.connection():
+            raise ValueError("bad query")
+
+    conn = factory.created[0]
+    assert conn.rollbacks == 1
+    assert pool.stats()["idle"] == 1
+    assert pool.stats()["resets"] == 1
+
+
+def test_broken_connection_is_discarded(factory):
+    pool = ConnectionPool(factory, min_connections=0, max_connections=1)
+
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.broken = True
+            conn.cursor().execute("SELECT 1")
+
+    assert pool.stats()["size"] == 0
+    assert factory.created[0].closed
+
+    with pool.connection() as conn:
+        assert conn is factory.created[1]
+
+
+def test_health_check_replaces_dead_idle_connection(factory):
+    pool = ConnectionPool(factory, min_connections=0, max_connections=2, health_check_interval=0)
+
+    with pool.connection() as conn:
+        pass
+    conn.broken = True
+
+    with pool.connection() as fresh:
+        assert fresh is not conn
+
+    stats = pool.stats()
+    assert stats["health_check_failures"] == 1
+    assert stats["discarded"] == 1
+
+
+def test_session_state_dropped_with_connection(factory):
+    pool = ConnectionPool(factory, min_connections=0, max_connections=1)
+
+    conn = pool.acquire()
+    pool.session_state(conn)["prepared"] = {"q": "stmt_1"}
+    pool.release(conn, broken=True)
+
+    conn = pool.acquire()
+    assert pool.session_state(conn) == {}
+
+
+def test_health_check_runs_outside_the_lock(factory):
+    pool = ConnectionPool(factory, min_connections=0, max_connections=2, health_check_interval=0)
+    with pool.connection():
+        pass
+
+    held = []
+    original = StubCursor.execute
+
+    def execute(cursor, sql):
+        # otro hilo tiene que poder usar el pool mientras dura el SELECT 1
+        probe = threading.Thread(target=lambda: held.append(pool.stats()))
+        probe.start()
+        probe.join(timeout=1)
+        original(cursor, sql)
+
+    StubCursor.execute = execute
+    try:
+        with pool.connection():
+            pass
+    finally:
+        StubCursor.execute = original
+
+    assert len(held) == 1
+
+
+def test_failed_fill_is_retried(factory):
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 2:
+            raise RuntimeError("connection refused")
+        return factory()
+
+    pool = ConnectionPool(flaky, min_connections=2, max_connections=2)
+
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    assert pool.stats()["size"] == 1
+
+    conn = pool.acquire()
+    assert conn in factory.created
+    assert pool.stats()["size"] == 2
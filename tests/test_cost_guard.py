@@ -0,0 +1,128 @@
+import sys
+import os
+import sqlite3
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.cost_guard import CostGuard, parse_postgres_explain, estimate_sqlite_plan
+
+
+@pytest.fixture
+def sqlite_conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE Employees (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany(
+        "INSERT INTO Employees (name) VALUES (?)",
+        [(f"emp {i}",) for i in range(500)],
+    )
+    yield conn
+    conn.close()
+
+
+# -------------------------
+# Decisions
+# -------------------------
+
+def test_allow_below_thresholds():
+    guard = CostGuard(max_rows=1000)
+    decision = guard.evaluate("SELECT * FROM Employees;", {"estimated_rows": 10, "estimated_cost": 5.0})
+
+    assert decision["action"] == "allow"
+    assert decision["sql"] == "SELECT * FROM Employees;"
+
+
+def test_limit_when_too_many_rows():
+    guard = CostGuard(max_rows=1000, row_limit=100)
+    decision = guard.evaluate(
+        "SELECT * FROM Employees WHERE salary > %s;",
+        {"estimated_rows": 50000, "estimated_cost": 900.0},
+    )
+
+    assert decision["action"] == "limit"
+    assert decision["sql"] == (
+        "SELECT * FROM (SELECT * FROM Employees WHERE salary > %s) AS guarded LIMIT 100;"
+    )
+    assert decision["estimated_rows"] == 50000
+    assert "truncated to 100 rows" in decision["reason"]
+
+
+def test_reject_when_too_costly():
+    guard = CostGuard(reject_cost=1e6)
+    decision = guard.evaluate("SELECT * FROM Employees;", {"estimated_rows": 10, "estimated_cost": 2e6})
+
+    assert decision["action"] == "reject"
+    assert decision["sql"] is None
+
+
+def test_costly_aggregate_is_allowed_with_warning():
+    guard = CostGuard(max_rows=1000, max_cost=500.0, row_limit=100)
+    sql = "SELECT COUNT(*) FROM Employees;"
+
+    decision = guard.evaluate(sql, {"estimated_rows": 1, "estimated_cost": 90000.0})
+
+    # un LIMIT sobre una sola fila no baja el costo
+    assert decision["action"] == "allow"
+    assert decision["sql"] == sql
+    assert decision["warning"] is True
+    assert "truncated" not in decision["reason"]
+    assert "90,000" in decision["reason"]
+
+    # un GROUP BY con demasiados grupos sí se trunca
+    grouped = guard.evaluate(
+        "SELECT city, COUNT(*) FROM Employees GROUP BY city;",
+        {"estimated_rows": 50000, "estimated_cost": 90000.0},
+    )
+    assert grouped["action"] == "limit"
+
+
+def test_postgres_sampling_only_for_simple_selects():
+    guard = CostGuard(max_rows=10, sample_percent=5)
+
+    decision = guard.evaluate("SELECT * FROM Employees;", {"estimated_rows": 100, "estimated_cost": 1.0})
+    assert "FROM Employees TABLESAMPLE SYSTEM (5)" in decision["sql"]
+    assert decision["sampled"] is True
+
+    decision = guard.evaluate(
+        "SELECT department_id, COUNT(*) FROM Employees GROUP BY department_id;",
+        {"estimated_rows": 100, "estimated_cost": 1.0},
+    )
+    assert "TABLESAMPLE" not in decision["sql"]
+    assert decision["sampled"] is False
+
+
+# -------------------------
+# EXPLAIN estimates
+# -------------------------
+
+def test_parse_postgres_explain():
+    rows = [([{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 1234, "Total Cost": 56.5}}],)]
+
+    assert parse_postgres_explain(rows) == {"estimated_rows": 1234, "estimated_cost": 56.5}
+
+
+def test_sqlite_estimate_and_rewrite(sqlite_conn):
+    sql = "SELECT * FROM Employees"
+    estimate = estimate_sqlite_plan(sqlite_conn, sql)
+    assert estimate["estimated_rows"] == 500
+
+    count_estimate = estimate_sqlite_plan(sqlite_conn, "SELECT COUNT(*) FROM Employees")
+    assert count_estimate["estimated_rows"] == 1
+
+    guard = CostGuard(max_rows=100, row_limit=50, sample_percent=50)
+    decision = guard.evaluate(sql, estimate, dialect="sqlite")
+    rows = sqlite_conn.execute(decision["sql"]).fetchall()
+
+    assert decision["action"] == "limit"
+    assert 0 < len(rows) <= 50
+
+
+def test_sqlite_estimate_respects_limit(sqlite_conn):
+    assert estimate_sqlite_plan(sqlite_conn, "SELECT * FROM Employees LIMIT 10;")["estimated_rows"] == 10
+    assert estimate_sqlite_plan(sqlite_conn, "SELECT * FROM Employees LIMIT 10 OFFSET 20")["estimated_rows"] == 10
+    assert estimate_sqlite_plan(sqlite_conn, "SELECT * FROM Employees LIMIT 20, 5")["estimated_rows"] == 5
+    assert estimate_sqlite_plan(sqlite_conn, "SELECT * FROM Employees LIMIT 5000")["estimated_rows"] == 500
+
+    guard = CostGuard(max_rows=100)
+    estimate = estimate_sqlite_plan(sqlite_conn, "SELECT * FROM Employees LIMIT 10")
+    assert guard.evaluate("SELECT * FROM Employees LIMIT 10", estimate, dialect="sqlite")["action"] == "allow"
@@ -0,0 +1,247 @@
+import sys
+import os
+import pickle
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.ddl_parser import (
+    parse_ddl_file,
+    parse_ddl_text,
+    parse_column_definition,
+    iter_ddl_file,
+    analyze_dependencies,
+    tables_dependency_order,
+    Table,
+    Column,
+    ForeignKey,
+)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DDL_PATH = os.path.join(BASE_DIR, "src", "ddl", "company_employee_schema.ddl")
+
+
+def test_sample_schema_keeps_legacy_output():
+    from benchmarks.legacy_ddl_parser import parse_ddl_text as legacy_parse_ddl_text
+
+    with open(DDL_PATH, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    assert parse_ddl_file(DDL_PATH) == legacy_parse_ddl_text(text)
+
+
+def test_quoted_identifiers_types_and_constraints():
+    ddl = """
+    CREATE TABLE IF NOT EXISTS public."Order Items" (
+        "id" integer NOT NULL, -- primary key
+        order_id integer REFERENCES public.orders(id),
+        price numeric(10,2) DEFAULT 0.00 CHECK (price >= (0)),
+        created_at timestamp without time zone DEFAULT now() NOT NULL,
+        tags text[],
+        CONSTRAINT oi_pk PRIMARY KEY ("id"),
+        CONSTRAINT uq UNIQUE (order_id, tags)
+    ) WITH (fillfactor = 70);
+    """
+    [table] = parse_ddl_text(ddl)
+
+    assert table.name == "public.Order Items"
+    assert table.primary_keys == ["id"]
+    assert [c.name for c in table.columns] == ["id", "order_id", "price", "created_at", "tags"]
+
+    columns = {c.name: c for c in table.columns}
+    assert columns["id"].not_null
+    assert columns["price"].raw_type == "numeric(10,2)"
+    assert columns["price"].default == "0.00"
+    assert columns["price"].check == "price >= (0)"
+    assert columns["created_at"].raw_type == "timestamp without time zone"
+    assert columns["created_at"].default == "now()"
+    assert columns["tags"].raw_type == "text[]"
+
+    [fk] = table.foreign_keys
+    assert (fk.cols, fk.ref_table, fk.ref_cols) == (["order_id"], "public.orders", ["id"])
+
+
+def test_skips_functions_strings_and_copy_data():
+    ddl = """
+    -- header; with 'quote
+    CREATE FUNCTION f() RETURNS trigger AS $body$
+    BEGIN RETURN 'x; CREATE TABLE nope (a int);'; END
+    $body$ LANGUAGE plpgsql;
+    CREATE VIEW v AS SELECT ';' AS "x;y" FROM t;
+    COPY public.orders (id, name) FROM stdin;
+1	CREATE TABLE fake (x int);
+2	it's ( broken
+\\.
+
+    CREATE TABLE orders (id int PRIMARY KEY, name text);
+    ALTER TABLE ONLY orders ADD CONSTRAINT orders_self FOREIGN KEY (id) REFERENCES orders(id);
+    ALTER TABLE orders OWNER TO app;
+    """
+    [table] = parse_ddl_text(ddl)
+
+    assert table.name == "orders"
+    assert table.primary_keys == ["id"]
+    assert [c.name for c in table.columns] == ["id", "name"]
+    assert [(fk.cols, fk.ref_table) for fk in table.foreign_keys] == [(["id"], "orders")]
+
+
+def test_compact_objects_keep_the_dataclass_api():
+    [table] = parse_ddl_text("CREATE TABLE t (id INT PRIMARY KEY NOT NULL, parent_id INT REFERENCES t(id));")
+    column = table.columns[0]
+
+    assert not hasattr(column, "__dict__")
+    assert column == Column(name="id", raw_type="INT", not_null=True, is_primary=True, raw="id INT PRIMARY KEY NOT NULL")
+    assert repr(column).startswith("Column(name='id', raw_type='INT', not_null=True, default=None, is_primary=True")
+    # raw apunta dentro de raw_body en lugar de copiarlo
+    assert column._source is table.raw_body
+    assert table.foreign_keys[0].raw == "parent_id INT REFERENCES t(id)"
+
+    column.not_null = False
+    column.is_unique = True
+    column.raw = "id INT"
+    assert (column.not_null, column.is_primary, column.is_unique, column.raw) == (False, True, True, "id INT")
+    assert pickle.loads(pickle.dumps(table)) == table
+
+
+def test_iter_ddl_file_matches_whole_file_parse_for_any_chunk_size(tmp_path):
+    ddl = """
+    CREATE FUNCTION f() RETURNS int AS $$ SELECT 1; $$ LANGUAGE sql;
+    CREATE TABLE "Orders" (id int NOT NULL, note text DEFAULT 'a;b'); -- trailing
+    COPY "Orders" (id, note) FROM stdin;
+1	x;y
+2	CREATE TABLE fake (x int);
+\\.
+    CREATE TABLE items (id int, order_id int);
+    ALTER TABLE ONLY items ADD CONSTRAINT items_fk FOREIGN KEY (order_id) REFERENCES "Orders"(id);
+    ALTER TABLE ONLY "Orders" ADD CONSTRAINT orders_pkey PRIMARY KEY (id);
+    """
+    path = tmp_path / "dump.sql"
+    path.write_text(ddl, encoding="utf-8")
+    expected = parse_ddl_text(ddl)
+
+    assert [t.name for t in expected] == ["Orders", "items"]
+    assert expected[0].primary_keys == ["id"]
+    for chunk_size in (1, 2, 7, 64, 1 << 20):
+        assert list(iter_ddl_file(str(path), chunk_size=chunk_size)) == expected
+
+
+def test_iter_ddl_file_yields_before_reading_everything(tmp_path):
+    path = tmp_path / "schema.sql"
+    path.write_text("CREATE TABLE a (id int);\nCREATE TABLE b (id int);\n" + "-- padding\n" * 1000)
+
+    tables = iter_ddl_file(str(path), chunk_size=32)
+
+    assert next(tables).name == "a"
+    assert [t.name for t in tables] == ["b"]
+
+
+def test_parallel_parse_matches_sequential_with_trailing_alters():
+    creates = "".join(
+        f"CREATE TABLE t{i} (id int NOT NULL, parent_id int, note text DEFAULT ';');\n"
+        for i in range(40)
+    )
+    # como en pg_dump: las constraints de todas las tablas van al final
+    alters = "".join(
+        f"ALTER TABLE ONLY t{i} ADD CONSTRAINT t{i}_pkey PRIMARY KEY (id);\n"
+        f"ALTER TABLE ONLY t{i} ADD CONSTRAINT t{i}_fk FOREIGN KEY (parent_id) REFERENCES t{i - 1}(id);\n"
+        for i in range(1, 40)
+    )
+    ddl = creates + "COPY t0 (id) FROM stdin;\n1\n2\n\\.\n" + alters + "CREATE TABLE t0 (id int);\n"
+    expected = parse_ddl_text(ddl)
+
+    assert expected[1].primary_keys == ["id"]
+    assert expected[1].foreign_keys[0].ref_table == "t0"
+    for workers in (2, 3, 7):
+        assert parse_ddl_text(ddl, workers=workers, min_parallel_size=0) == expected
+
+
+def test_parallel_parse_stays_sequential_below_threshold():
+    with patch("src.ddl_parser.ProcessPoolExecutor") as pool:
+        tables = parse_ddl_text("CREATE TABLE a (id int);", workers=4)
+
+    pool.assert_not_called()
+    assert [t.name for t in tables] == ["a"]
+
+
+def test_comment_foreign_key_and_unterminated_statement():
+    ddl = """
+    CREATE TABLE employees (
+        id INT PRIMARY KEY,
+        company_id INT NOT NULL, -- foreign key to Companies table
+        name VARCHAR(100)
+    );
+    CREATE TABLE broken (a int,
+    """
+    employees, broken = parse_ddl_text(ddl)
+
+    [fk] = employees.foreign_keys
+    assert (fk.cols, fk.ref_table, fk.ref_cols) == (["company_id"], "Companies", ["company_id"])
+    assert [c.name for c in broken.columns] == ["a"]
+
+
+def test_parse_column_definition():
+    column = parse_column_definition("  email VARCHAR(255) UNIQUE NOT NULL,")
+
+    assert column["name"] == "email"
+    assert column["raw_type"] == "VARCHAR(255)"
+    assert column["is_unique"] and column["not_null"]
+    assert parse_column_definition("PRIMARY") is None
+
+
+def test_dependency_levels_for_sample_schema():
+    analysis = analyze_dependencies(parse_ddl_file(DDL_PATH))
+
+    assert analysis.levels[0] == ["Companies"]
+    assert analysis.cycles == []
+    assert analysis.deferred == []
+    assert analysis.order == [name for level in analysis.levels for name in level]
+
+
+def test_dependency_cycles_report_deferred_edges():
+    ddl = """
+    CREATE TABLE a (id int, c_id int REFERENCES c(id));
+    CREATE TABLE b (id int, a_id int REFERENCES a(id));
+    CREATE TABLE c (id int, b_id int REFERENCES b(id), x_id int REFERENCES x(id));
+    CREATE TABLE x (id int);
+    CREATE TABLE emp (id int, boss_id int REFERENCES emp(id));
+    CREATE TABLE d (id int, a_id int REFERENCES a(id), missing_id int REFERENCES missing(id));
+    """
+    tables = parse_ddl_text(ddl)
+    analysis = analyze_dependencies(tables)
+
+    # dentro del ciclo sólo se difiere b -> a: c y a van en niveles propios
+    assert analysis.levels == [["b", "x", "emp"], ["c"], ["a"], ["d"]]
+    assert analysis.cycles == [["b", "c", "a"], ["emp"]]
+    assert [(table, fk.cols) for table, fk in analysis.deferred] == [("b", ["a_id"]), ("emp", ["boss_id"])]
+    assert tables_dependency_order(tables) == analysis.order
+
+    # sin las FKs diferidas, el orden respeta todas las demás
+    deferred = {id(fk) for _, fk in analysis.deferred}
+    loaded = set()
+    for name in analysis.order:
+        table = next(t for t in tables if t.name == name)
+        for fk in table.foreign_keys:
+            if id(fk) not in deferred and fk.ref_table in {t.name for t in tables}:
+                assert fk.ref_table in loaded
+        loaded.add(name)
+
+    # ninguna FK no diferida une dos tablas del mismo nivel
+    level_of = {name: n for n, level in enumerate(analysis.levels) for name in level}
+    for table in tables:
+        for fk in table.foreign_keys:
+            if id(fk) not in deferred and fk.ref_table in level_of:
+                assert level_of[fk.ref_table] < level_of[table.name]
+
+
+def test_dependency_analysis_handles_long_chains():
+    n = 5000
+    tables = [Table(name="t0")] + [
+        Table(name=f"t{i}", foreign_keys=[ForeignKey(cols=["parent_id"], ref_table=f"t{i - 1}", ref_cols=["id"])])
+        for i in range(1, n)
+    ]
+    tables[0].foreign_keys.append(ForeignKey(cols=["last_id"], ref_table=f"t{n - 1}", ref_cols=["id"]))
+
+    analysis = analyze_dependencies(tables)
+
+    assert len(analysis.cycles) == 1 and len(analysis.cycles[0]) == n
+    assert len(analysis.deferred) == 1
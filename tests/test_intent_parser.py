@@ -77,4 +77,131 @@ def test_unknown_intent(sample_schema):
     intent = parser.parse("anything")
 
     assert intent["action"] == "unknown"
-    assert intent["table"] is None
\ No newline at end of file
+    assert intent["table"] is None
+
+# -------------------------
+# TABLE / COLUMN INDEX
+# -------------------------
+
+@pytest.fixture
+def overlapping_schema():
+    return {
+        "tables": [
+            {"name": "order", "columns": [{"name": "id"}, {"name": "customer_id"}]},
+            {"name": "order_items", "columns": [{"name": "id"}, {"name": "product_id"}]},
+            {"name": "Categories", "columns": [{"name": "id"}]},
+        ]
+    }
+
+def test_longest_table_name_wins(overlapping_schema):
+    parser = IntentParser(overlapping_schema)
+
+    assert parser.parse("show order_items")["table"] == "order_items"
+    assert parser.parse("list order items")["table"] == "order_items"
+    assert parser.parse("how many orders")["table"] == "order"
+
+def test_first_table_wins_over_longer_later_one():
+    parser = IntentParser({
+        "tables": [
+            {"name": "Employees", "columns": [{"name": "salary"}, {"name": "department_id"}]},
+            {"name": "Departments", "columns": [{"name": "name"}]},
+        ]
+    })
+    intent = parser.parse("average salary of employees by department")
+
+    assert intent["table"] == "Employees"
+    assert intent["columns"] == ["salary"]
+
+def test_singular_and_synonym_tables(overlapping_schema):
+    parser = IntentParser(overlapping_schema, synonyms={"product groups": "Categories"})
+
+    assert parser.parse("show every category")["table"] == "Categories"
+    assert parser.parse("count product groups")["table"] == "Categories"
+
+def test_group_by_column_with_spaces(overlapping_schema):
+    parser = IntentParser(overlapping_schema)
+    intent = parser.parse("max id in order_items by product id")
+
+    assert intent["group_by"] == "product_id"
+
+def test_unknown_synonym_target_rejected(sample_schema):
+    with pytest.raises(ValueError):
+        IntentParser(sample_schema, synonyms={"staff": "People"})
+
+# -------------------------
+# PROJECTION / FILTERS
+# -------------------------
+
+@pytest.fixture
+def employees_schema():
+    return {
+        "tables": [
+            {
+                "name": "Employees",
+                "columns": [
+                    {"name": "employee_id"},
+                    {"name": "first_name"},
+                    {"name": "salary"},
+                    {"name": "city"},
+                    {"name": "hire_date", "type": "DATE"},
+                ],
+            }
+        ]
+    }
+
+def test_select_projection_and_comparison(employees_schema):
+    parser = IntentParser(employees_schema)
+    intent = parser.parse("show first_name and salary of employees where salary > 5000")
+
+    assert intent["columns"] == ["first_name", "salary"]
+    assert intent["filters"] == [{"column": "salary", "op": ">", "value": 5000}]
+
+def test_sort_and_group_keys_are_not_projected(employees_schema):
+    parser = IntentParser(employees_schema)
+
+    intent = parser.parse("show top 5 employees by salary")
+    assert intent["columns"] is None
+    assert intent["limit"] == 5
+
+    intent = parser.parse("list employees hired since 2021 ordered by first_name")
+    assert intent["columns"] is None
+    assert intent["filters"] == [{"column": "hire_date", "op": ">=", "value": "2021-01-01"}]
+
+def test_unresolved_requested_column_falls_back_to_all(employees_schema):
+    parser = IntentParser(employees_schema)
+
+    # "name" no es una columna: SELECT * en vez de sólo city
+    assert parser.parse("show the name and city of employees")["columns"] is None
+    assert parser.parse("show the first name and city of employees")["columns"] == ["first_name", "city"]
+
+def test_equality_keeps_value_case(employees_schema):
+    parser = IntentParser(employees_schema)
+
+    intent = parser.parse("list employees where city = 'New York'")
+    assert intent["filters"] == [{"column": "city", "op": "=", "value": "New York"}]
+    assert intent["columns"] is None
+
+    intent = parser.parse("how many employees whose city is Rosario")
+    assert intent["filters"] == [{"column": "city", "op": "=", "value": "Rosario"}]
+
+def test_range_and_since_filters(employees_schema):
+    parser = IntentParser(employees_schema)
+
+    intent = parser.parse("show employees with salary between 1000 and 2000")
+    assert intent["filters"] == [
+        {"column": "salary", "op": ">=", "value": 1000},
+        {"column": "salary", "op": "<=", "value": 2000},
+    ]
+
+    intent = parser.parse("show employees hired since 2021")
+    assert intent["filters"] == [{"column": "hire_date", "op": ">=", "value": "2021-01-01"}]
+
+def test_aggregate_metric_column_and_approximate(employees_schema):
+    parser = IntentParser(employees_schema)
+
+    intent = parser.parse("roughly what is the average salary of employees by city")
+    assert intent["columns"] == ["salary"]
+    assert intent["group_by"] == "city"
+    assert intent["approximate"] is True
+
+    assert parser.parse("how many employees")["approximate"] is False
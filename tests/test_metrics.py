@@ -0,0 +1,82 @@
+import sys
+import os
+import json
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.metrics import Metrics, NULL_METRICS
+from src.llm.chat_with_data.sql_agent import SQLAgent
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_percentiles_and_exports(tmp_path):
+    metrics = Metrics()
+    for value in range(1, 101):
+        metrics.observe("pipeline_rows", value)
+
+    summary = metrics.summary()["pipeline_rows"]
+    assert summary["count"] == 100
+    assert summary["sum"] == 5050
+    assert (summary["p50"], summary["p95"], summary["p99"]) == (50, 95, 99)
+    assert (summary["min"], summary["max"]) == (1, 100)
+
+    metrics.export_json(tmp_path / "metrics.json")
+    assert json.loads((tmp_path / "metrics.json").read_text())["pipeline_rows"]["p95"] == 95
+
+    metrics.export_prometheus(tmp_path / "metrics.prom")
+    text = (tmp_path / "metrics.prom").read_text()
+    assert "# TYPE nl2sql_pipeline_rows summary" in text
+    assert 'nl2sql_pipeline_rows{quantile="0.99"} 99.0' in text
+    assert "nl2sql_pipeline_rows_count 100" in text
+
+
+def test_timer_and_sample_window():
+    clock = FakeClock()
+    metrics = Metrics(max_samples=2, clock=clock)
+
+    for duration in (5.0, 1.0, 2.0):
+        with metrics.timer("pipeline_parse_seconds"):
+            clock.now += duration
+
+    summary = metrics.summary()["pipeline_parse_seconds"]
+    assert summary["count"] == 3
+    assert summary["sum"] == 8.0
+    # sólo quedan las últimas `max_samples` muestras para los percentiles
+    assert summary["max"] == 2.0
+
+
+def test_disabled_metrics_record_nothing():
+    NULL_METRICS.observe("x", 1)
+    with NULL_METRICS.timer("y"):
+        pass
+    assert NULL_METRICS.summary() == {}
+
+
+def test_sql_agent_records_time_to_first_token():
+    clock = FakeClock()
+    metrics = Metrics(clock=clock)
+
+    def stream(prompt):
+        clock.now += 0.5
+        yield "SELECT "
+        clock.now += 1.5
+        yield "1"
+
+    llm = MagicMock()
+    llm.generate_stream.side_effect = stream
+    agent = SQLAgent(llm, metrics=metrics)
+
+    with patch.object(SQLAgent, "get_schema_from_db", return_value="t(a)\n"):
+        assert "".join(agent.generate_sql_stream("q")) == "SELECT 1"
+
+    summary = metrics.summary()
+    assert summary["chat_llm_ttft_seconds"]["sum"] == 0.5
+    assert summary["chat_llm_total_seconds"]["sum"] == 2.0
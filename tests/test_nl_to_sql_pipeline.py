@@ -37,7 +37,10 @@ def test_pipeline_select():
         }
 
         mock_builder = MockBuilder.return_value
-        mock_builder.build.return_value = "SELECT * FROM Employees LIMIT 10"
+        mock_builder.build_parameterized.return_value = (
+            "SELECT * FROM Employees LIMIT %s;",
+            (10,),
+        )
 
         mock_executor = MockExecutor.return_value
         mock_executor.execute.return_value = [
@@ -48,7 +51,11 @@ def test_pipeline_select():
         pipeline = NLToSQLPipeline(schema, connection_params)
         response = pipeline.run("show employees")
 
-        assert response["sql"] == "SELECT * FROM Employees LIMIT 10"
+        assert response["sql"] == "SELECT * FROM Employees LIMIT %s;"
+        assert response["params"] == (10,)
+        mock_executor.execute.assert_called_once_with(
+            "SELECT * FROM Employees LIMIT %s;", (10,)
+        )
         assert len(response["result"]) == 2
         assert response["intent"]["action"] == "select"
 
@@ -70,3 +77,287 @@ def test_pipeline_unknown_intent():
         assert response["sql"] is None
         assert response["result"] is None
         assert response["intent"]["action"] == "unknown"
+
+
+def test_pipeline_run_stream_returns_first_page():
+    schema = sample_schema()
+
+    with patch("src.nl_to_sql_pipeline.IntentParser") as MockParser, \
+         patch("src.nl_to_sql_pipeline.SQLQueryBuilder") as MockBuilder, \
+         patch("src.nl_to_sql_pipeline.QueryExecutor") as MockExecutor:
+
+        MockParser.return_value.parse.return_value = {
+            "action": "select",
+            "table": "Employees",
+            "limit": None,
+        }
+        MockBuilder.return_value.build_parameterized.return_value = (
+            "SELECT * FROM Employees;",
+            (),
+        )
+        MockExecutor.return_value.execute_stream.return_value = iter([
+            [(1,), (2,)],
+            [(3,)],
+        ])
+
+        pipeline = NLToSQLPipeline(schema, {"host": "x"})
+        response = pipeline.run_stream("show employees", page_size=2)
+
+        assert response["result"] == [(1,), (2,)]
+        assert "more rows available" in response["explanation"]
+        assert list(response["batches"]) == [[(3,)]]
+        MockExecutor.return_value.execute.assert_not_called()
+
+
+def test_pipeline_run_stream_uses_guard_cache_and_metrics():
+    from src.cost_guard import CostGuard
+    from src.metrics import Metrics
+    from src.query_cache import QueryCache
+
+    metrics = Metrics()
+
+    with patch("src.nl_to_sql_pipeline.QueryExecutor") as MockExecutor:
+        executor = MockExecutor.return_value
+        executor.explain.return_value = {"estimated_rows": 5_000_000, "estimated_cost": 90000.0}
+        executor.execute_stream.side_effect = lambda sql, params, batch_size: iter([[(1,), (2,)]])
+
+        pipeline = NLToSQLPipeline(
+            sample_schema(),
+            {"host": "x"},
+            cost_guard=CostGuard(max_rows=1000, row_limit=3),
+            cache=QueryCache(),
+            metrics=metrics,
+        )
+        first = pipeline.run_stream("list employees", page_size=10)
+        second = pipeline.run_stream("list employees", page_size=10)
+
+    streamed_sql = executor.execute_stream.call_args.args[0]
+    assert streamed_sql.endswith("AS guarded LIMIT 3;")
+    assert first["cost_guard"]["action"] == "limit"
+    assert first["result"] == [(1,), (2,)]
+    assert list(first["batches"]) == []
+
+    assert second["cached"] is True
+    assert second["result"] == [(1,), (2,)]
+    assert executor.execute_stream.call_count == 1
+    executor.execute.assert_not_called()
+
+    summary = metrics.summary()
+    assert summary["pipeline_total_seconds"]["count"] == 2
+    assert summary["pipeline_explain_seconds"]["count"] == 1
+    assert summary["pipeline_execute_seconds"]["count"] == 1
+    assert summary["pipeline_rows"]["sum"] == 2
+
+
+def test_pipeline_run_stream_rejected_by_cost_guard():
+    from src.cost_guard import CostGuard
+
+    with patch("src.nl_to_sql_pipeline.QueryExecutor") as MockExecutor:
+        executor = MockExecutor.return_value
+        executor.explain.return_value = {"estimated_rows": 5_000_000, "estimated_cost": 10_000_000.0}
+
+        pipeline = NLToSQLPipeline(
+            sample_schema(),
+            {"host": "x"},
+            cost_guard=CostGuard(max_rows=1000, reject_cost=1000.0),
+        )
+        response = pipeline.run_stream("list employees")
+
+    assert response["cost_guard"]["action"] == "reject"
+    assert response["result"] is None
+    assert list(response["batches"]) == []
+    executor.execute_stream.assert_not_called()
+
+
+def test_pipeline_run_many_keeps_order_and_errors():
+    schema = {
+        "tables": [
+            {"name": "Employees", "columns": [{"name": "id"}]},
+            {"name": "Companies", "columns": [{"name": "id"}]},
+        ]
+    }
+
+    def fake_execute(sql, params):
+        if "Companies" in sql:
+            raise RuntimeError("relation does not exist")
+        return [{"count": 7}]
+
+    with patch("src.nl_to_sql_pipeline.QueryExecutor") as MockExecutor:
+        MockExecutor.return_value.execute.side_effect = fake_execute
+
+        pipeline = NLToSQLPipeline(schema, {"host": "x"})
+        responses = pipeline.run_many(
+            [
+                "how many employees",
+                "how many companies",
+                "asdf qwer",
+                "how many employees",
+            ],
+            max_workers=3,
+        )
+
+    assert [r["error"] for r in responses] == [
+        None,
+        "relation does not exist",
+        None,
+        None,
+    ]
+    assert responses[0]["explanation"] == "There are 7 rows in Employees."
+    assert responses[1]["intent"]["table"] == "Companies"
+    assert responses[2]["intent"]["action"] == "unknown"
+    assert responses[3]["result"] == [{"count": 7}]
+
+
+def test_pipeline_cost_guard_limits_query():
+    from src.cost_guard import CostGuard
+
+    with patch("src.nl_to_sql_pipeline.QueryExecutor") as MockExecutor:
+        mock_executor = MockExecutor.return_value
+        mock_executor.explain.return_value = {
+            "estimated_rows": 5_000_000,
+            "estimated_cost": 90000.0,
+        }
+        mock_executor.execute.return_value = [(1,), (2,)]
+
+        pipeline = NLToSQLPipeline(
+            sample_schema(),
+            {"host": "x"},
+            cost_guard=CostGuard(max_rows=1000, row_limit=2),
+        )
+        response = pipeline.run("list employees")
+
+    assert response["cost_guard"]["action"] == "limit"
+    assert response["cost_guard"]["estimated_rows"] == 5_000_000
+    assert response["sql"].endswith("AS guarded LIMIT 2;")
+    assert "truncated" in response["explanation"]
+
+
+def test_pipeline_cache_skips_parse_and_execution():
+    from src.query_cache import QueryCache
+
+    with patch("src.nl_to_sql_pipeline.IntentParser") as MockParser, \
+         patch("src.nl_to_sql_pipeline.QueryExecutor") as MockExecutor:
+
+        MockParser.return_value.parse.return_value = {
+            "action": "select",
+            "table": "Employees",
+            "limit": 10,
+        }
+        MockExecutor.return_value.execute.return_value = [(1,), (2,)]
+
+        pipeline = NLToSQLPipeline(sample_schema(), {"host": "x"}, cache=QueryCache())
+        first = pipeline.run("show employees")
+        second = pipeline.run("show  employees?")
+
+        assert first["cached"] is False
+        assert second["cached"] is True
+        assert second["result"] == [(1,), (2,)]
+        assert MockParser.return_value.parse.call_count == 1
+        assert MockExecutor.return_value.execute.call_count == 1
+
+        pipeline.invalidate("Employees")
+        pipeline.run("show employees")
+        assert MockExecutor.return_value.execute.call_count == 2
+
+        stats = pipeline.cache_stats()
+        assert stats["plans"]["hits"] == 2
+        assert stats["results"]["hits"] == 1
+
+
+def test_pipeline_approximate_count():
+    with patch("src.nl_to_sql_pipeline.QueryExecutor") as MockExecutor:
+        MockExecutor.return_value.execute.return_value = [(1_000_000, 2500)]
+
+        pipeline = NLToSQLPipeline(sample_schema(), {"host": "x"})
+        response = pipeline.run("how many employees", approximate=True)
+
+    assert "reltuples" in response["sql"]
+    assert response["result"] == [{"group": None, "estimate": 1_000_000, "error_bound": 2500}]
+    assert response["approximate"]["method"] == "reltuples"
+    assert response["explanation"].startswith("There are approximately 1,000,000")
+
+
+def test_pipeline_run_batch_merges_round_trips():
+    schema = {
+        "tables": [
+            {"name": "Employees", "columns": [{"name": "id"}, {"name": "salary"}]},
+            {"name": "Companies", "columns": [{"name": "id"}]},
+        ]
+    }
+
+    with patch("src.nl_to_sql_pipeline.QueryExecutor") as MockExecutor:
+        executor = MockExecutor.return_value
+        executor.execute.side_effect = [
+            [{"id": 1}, {"id": 2}],    # select, por separado
+            [(3, 12)],                 # batch de counts
+        ]
+
+        pipeline = NLToSQLPipeline(schema, {"host": "x"})
+        responses = pipeline.run_batch([
+            "how many employees",
+            "show companies",
+            "how many companies",
+            "asdf qwer",
+        ])
+
+    assert executor.execute.call_count == 2
+    batch_sql = executor.execute.call_args_list[1].args[0]
+    assert "CROSS JOIN" in batch_sql
+
+    assert [r["error"] for r in responses] == [None, None, None, None]
+    assert responses[0]["result"] == [(3,)]
+    assert responses[0]["sql"] == "SELECT COUNT(*) FROM Employees;"
+    assert responses[0]["explanation"] == "There are 3 rows in Employees."
+    assert responses[0]["batch"]["size"] == 2
+    assert responses[1]["result"] == [{"id": 1}, {"id": 2}]
+    assert responses[2]["explanation"] == "There are 12 rows in Companies."
+    assert responses[3]["intent"]["action"] == "unknown"
+
+
+def test_pipeline_run_batch_error_marks_every_member():
+    schema = {"tables": [{"name": "Employees", "columns": [{"name": "id"}]}, {"name": "Companies", "columns": [{"name": "id"}]}]}
+
+    with patch("src.nl_to_sql_pipeline.QueryExecutor") as MockExecutor:
+        MockExecutor.return_value.execute.side_effect = RuntimeError("boom")
+        pipeline = NLToSQLPipeline(schema, {"host": "x"})
+        responses = pipeline.run_batch(["how many employees", "how many companies"])
+
+    assert [r["error"] for r in responses] == ["boom", "boom"]
+
+
+def test_pipeline_run_batch_failure_isolates_invalid_member():
+    schema = {"tables": [{"name": "Employees", "columns": [{"name": "id"}]}, {"name": "Companies", "columns": [{"name": "id"}]}]}
+
+    def execute(sql, params=None):
+        if "Companies" in sql:
+            raise RuntimeError('relation "companies" does not exist')
+        return [(3,)]
+
+    with patch("src.nl_to_sql_pipeline.QueryExecutor") as MockExecutor:
+        executor = MockExecutor.return_value
+        executor.execute.side_effect = execute
+        pipeline = NLToSQLPipeline(schema, {"host": "x"})
+        responses = pipeline.run_batch(["how many employees", "how many companies"])
+
+    # la consulta combinada falla y cada pregunta se reintenta sola
+    assert executor.execute.call_count == 3
+    assert responses[0]["error"] is None
+    assert responses[0]["result"] == [(3,)]
+    assert responses[1]["error"] == 'relation "companies" does not exist'
+
+
+def test_pipeline_records_stage_metrics():
+    from src.metrics import Metrics
+
+    schema = {"tables": [{"name": "Employees", "columns": [{"name": "id"}]}]}
+    metrics = Metrics()
+
+    with patch("src.nl_to_sql_pipeline.QueryExecutor") as MockExecutor:
+        MockExecutor.return_value.execute.return_value = [(1,), (2,)]
+        pipeline = NLToSQLPipeline(schema, {"host": "x"}, metrics=metrics)
+        pipeline.run("show employees")
+
+    summary = metrics.summary()
+    for stage in ("parse", "build", "execute", "total"):
+        assert summary[f"pipeline_{stage}_seconds"]["count"] == 1
+    assert summary["pipeline_rows"]["sum"] == 2
@@ -0,0 +1,198 @@
+import sys
+import os
+import sqlite3
+import pytest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.preaggregates import PreAggregateManager
+from src.nl_to_sql_pipeline import NLToSQLPipeline
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+AVG_BY_DEPT = {
+    "action": "aggregate",
+    "table": "Employees",
+    "metric": "avg",
+    "columns": ["salary"],
+    "group_by": "department_id",
+}
+
+
+def test_materializes_after_threshold_and_routes():
+    executor = MagicMock()
+    executor.execute.return_value = []  # la vista no existía
+    clock = FakeClock()
+    manager = PreAggregateManager(executor, threshold=2, clock=clock)
+
+    assert manager.route(AVG_BY_DEPT) is None
+    executor.execute.assert_not_called()
+
+    sql, params, meta = manager.route(AVG_BY_DEPT)
+    assert executor.execute.call_count == 3
+    create_sql = executor.execute.call_args_list[1].args[0]
+    index_sql = executor.execute.call_args_list[2].args[0]
+
+    assert create_sql.startswith(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {meta['source']} AS")
+    assert "SUM(salary) AS total" in create_sql
+    assert "GROUP BY department_id" in create_sql
+    assert "CREATE UNIQUE INDEX" in index_sql and "(department_id)" in index_sql
+
+    assert sql == f"SELECT department_id, total * 1.0 / NULLIF(n, 0) AS avg FROM {meta['source']};"
+    assert params == ()
+    assert meta["age_seconds"] == 0
+
+
+def test_existing_view_is_refreshed_before_use():
+    executor = MagicMock()
+    executor.execute.return_value = [{"?column?": 1}]  # quedó de otro proceso
+    manager = PreAggregateManager(executor, threshold=1, clock=FakeClock())
+
+    _, _, meta = manager.route(AVG_BY_DEPT)
+    assert executor.execute.call_args.args[0] == f"REFRESH MATERIALIZED VIEW {meta['source']};"
+
+
+class SQLiteExecutor:
+    """QueryExecutor sobre SQLite: la vista materializada se emula con una tabla."""
+
+    def __init__(self):
+        self.connection = sqlite3.connect(":memory:")
+
+    def execute(self, sql, params=None):
+        if "pg_matviews" in sql:
+            return []
+        sql = sql.replace("CREATE MATERIALIZED VIEW", "CREATE TABLE").replace("%s", "?")
+        cursor = self.connection.execute(sql, params or ())
+        return cursor.fetchall()
+
+
+def test_avg_matches_direct_query_on_integer_column():
+    executor = SQLiteExecutor()
+    executor.connection.execute("CREATE TABLE Employees (department_id INTEGER, salary INTEGER)")
+    executor.connection.executemany(
+        "INSERT INTO Employees VALUES (?, ?)", [(1, 10), (1, 11), (2, 7), (2, 8), (2, 8)],
+    )
+    manager = PreAggregateManager(executor, threshold=1, clock=FakeClock())
+
+    sql, params, _ = manager.route(AVG_BY_DEPT)
+    routed = sorted(executor.execute(sql, params))
+    direct = sorted(executor.execute("SELECT department_id, AVG(salary) FROM Employees GROUP BY department_id"))
+
+    assert routed == direct == [(1, 10.5), (2, 23 / 3)]
+
+
+def test_refresh_failure_is_recorded():
+    executor = MagicMock()
+    executor.execute.return_value = []
+    clock = FakeClock()
+    manager = PreAggregateManager(executor, threshold=1, refresh_interval=60, clock=clock)
+    manager.route(AVG_BY_DEPT)
+
+    executor.execute.side_effect = Exception("lock timeout")
+    clock.now += 61
+    with pytest.raises(Exception):
+        manager.refresh_stale()
+    view = list(manager.views().values())[0]
+    assert view["status"] == "ready" and view["error"] == "lock timeout"
+
+
+def test_other_metrics_share_the_view():
+    manager = PreAggregateManager(MagicMock(), threshold=1, clock=FakeClock())
+    _, _, first = manager.route(AVG_BY_DEPT)
+
+    sql, _, meta = manager.route({**AVG_BY_DEPT, "metric": "max"})
+    assert meta["source"] == first["source"]
+    assert sql.startswith("SELECT department_id, max_value AS max FROM")
+
+
+def test_filter_on_group_column_is_routed_other_filters_are_not():
+    manager = PreAggregateManager(MagicMock(), threshold=1, clock=FakeClock())
+
+    sql, params, _ = manager.route({
+        **AVG_BY_DEPT,
+        "filters": [{"column": "department_id", "op": "=", "value": 3}],
+    })
+    assert sql.endswith(" WHERE department_id = %s;")
+    assert params == (3,)
+
+    assert manager.route({
+        **AVG_BY_DEPT,
+        "filters": [{"column": "salary", "op": ">", "value": 10}],
+    }) is None
+
+
+def test_staleness_and_refresh():
+    executor = MagicMock()
+    clock = FakeClock()
+    manager = PreAggregateManager(executor, threshold=1, refresh_interval=60, max_staleness=120, clock=clock)
+    manager.route({"action": "count", "table": "Orders"})
+
+    clock.now += 90
+    _, _, meta = manager.route({"action": "count", "table": "Orders"})
+    assert meta["age_seconds"] == 90
+
+    assert manager.refresh_stale() == 1
+    assert executor.execute.call_args.args[0].startswith("REFRESH MATERIALIZED VIEW CONCURRENTLY")
+
+    clock.now += 200
+    assert manager.route({"action": "count", "table": "Orders"}) is None
+
+
+def test_failed_materialization_is_not_retried():
+    executor = MagicMock()
+    executor.execute.side_effect = Exception("permission denied")
+    manager = PreAggregateManager(executor, threshold=1, clock=FakeClock())
+
+    assert manager.route(AVG_BY_DEPT) is None
+    assert manager.route(AVG_BY_DEPT) is None
+    assert executor.execute.call_count == 1
+    assert list(manager.views().values())[0]["status"] == "failed"
+
+
+def test_pipeline_reads_from_preaggregate():
+    with patch("src.nl_to_sql_pipeline.QueryExecutor") as MockExecutor:
+        executor = MockExecutor.return_value
+        executor.execute.return_value = [{"count": 42}]
+
+        manager = PreAggregateManager(threshold=1)
+        pipeline = NLToSQLPipeline({"tables": []}, {}, preaggregates=manager)
+        pipeline.intent_parser = MagicMock()
+        pipeline.intent_parser.parse.return_value = {"action": "count", "table": "Orders"}
+
+        response = pipeline.run("how many orders")
+
+        assert manager.executor is executor
+        assert response["sql"].startswith("SELECT row_count AS count FROM nl2sql_agg_")
+        assert response["preaggregate"]["source"] in response["sql"]
+        assert "There are 42 rows in Orders." in response["explanation"]
+
+
+def test_preaggregate_age_is_not_replayed_from_result_cache():
+    from src.query_cache import QueryCache
+
+    clock = FakeClock()
+    with patch("src.nl_to_sql_pipeline.QueryExecutor") as MockExecutor:
+        executor = MockExecutor.return_value
+        executor.execute.return_value = [{"count": 42}]
+
+        manager = PreAggregateManager(threshold=1, clock=clock)
+        pipeline = NLToSQLPipeline({"tables": []}, {}, cache=QueryCache(), preaggregates=manager)
+        pipeline.intent_parser = MagicMock()
+        pipeline.intent_parser.parse.return_value = {"action": "count", "table": "Orders"}
+
+        first = pipeline.run("how many orders")
+        clock.now += 120
+        second = pipeline.run("how many orders")
+
+    assert first["preaggregate"]["age_seconds"] == 0
+    assert second["preaggregate"]["age_seconds"] == 120
+    assert second["cached"] is False
+    assert "refreshed 120s ago" in second["explanation"]
@@ -0,0 +1,72 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.query_cache import QueryCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_plans_are_keyed_by_normalized_text():
+    cache = QueryCache()
+    cache.put_plan("how many   employees?", ({"action": "count"}, "SELECT 1;", ()))
+
+    assert cache.get_plan(" how many employees") is not None
+    assert cache.get_plan("how many companies") is None
+
+    stats = cache.stats()["plans"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_plans_keep_value_case():
+    cache = QueryCache()
+    cache.put_plan("show employees where city = 'Rosario'", ("plan",))
+
+    assert cache.get_plan("show employees where city = 'rosario'") is None
+
+
+def test_results_expire_after_ttl():
+    clock = FakeClock()
+    cache = QueryCache(result_ttl=10, clock=clock)
+    cache.put_result("SELECT * FROM t LIMIT %s;", (5,), [1, 2])
+
+    clock.now = 9
+    assert cache.get_result("SELECT * FROM t LIMIT %s;", (5,)) == [1, 2]
+    assert cache.get_result("SELECT * FROM t LIMIT %s;", (6,)) is None
+
+    clock.now = 10
+    assert cache.get_result("SELECT * FROM t LIMIT %s;", (5,)) is None
+    assert cache.stats()["results"]["expired"] == 1
+
+
+def test_lru_eviction():
+    cache = QueryCache(max_plans=2)
+    cache.put_plan("a", ("a",))
+    cache.put_plan("b", ("b",))
+    cache.get_plan("a")
+    cache.put_plan("c", ("c",))
+
+    assert cache.get_plan("b") is None
+    assert cache.get_plan("a") == ("a",)
+
+
+def test_invalidate_by_table():
+    cache = QueryCache()
+    cache.put_result("q1", (), 1, table="Employees")
+    cache.put_result("q2", (), 2, table="Companies")
+
+    assert cache.invalidate("employees") == 1
+    assert cache.get_result("q1", ()) is None
+    assert cache.get_result("q2", ()) == 2
+
+    assert cache.invalidate() == 1
+    assert cache.stats()["results"]["size"] == 0
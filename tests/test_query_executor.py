@@ -43,3 +43,85 @@ def test_execute_non_select():
 
     assert result is None
 
+def test_execute_reuses_pooled_connection():
+    mock_cursor = MagicMock()
+    mock_cursor.description = True
+    mock_cursor.fetchall.return_value = [{"id": 1}]
+
+    mock_conn = MagicMock()
+    mock_conn.closed = 0
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+    factory = MagicMock(return_value=mock_conn)
+    executor = QueryExecutor({}, max_connections=2, connection_factory=factory)
+
+    executor.execute("SELECT 1")
+    executor.execute("SELECT 2")
+
+    assert factory.call_count == 1
+    stats = executor.pool_stats()
+    assert stats["acquired"] == 2
+    assert stats["in_use"] == 0
+
+def test_execute_stream_uses_named_cursor_batches():
+    mock_cursor = MagicMock()
+    mock_cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+
+    mock_conn = MagicMock()
+    mock_conn.closed = 0
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+    executor = QueryExecutor({}, connection_factory=lambda: mock_conn)
+    batches = executor.execute_stream("SELECT id FROM users", batch_size=2)
+
+    # La conexión sólo se toma al empezar a iterar
+    assert executor.pool_stats()["in_use"] == 0
+    assert next(batches) == [(1,), (2,)]
+    assert executor.pool_stats()["in_use"] == 1
+    assert list(batches) == [[(3,)]]
+
+    assert "name" in mock_conn.cursor.call_args.kwargs
+    mock_cursor.fetchmany.assert_called_with(2)
+    assert executor.pool_stats()["in_use"] == 0
+
+
+def test_execute_stream_close_releases_connection():
+    mock_cursor = MagicMock()
+    mock_cursor.fetchmany.return_value = [(1,)]
+
+    mock_conn = MagicMock()
+    mock_conn.closed = 0
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+    executor = QueryExecutor({}, connection_factory=lambda: mock_conn)
+    batches = executor.execute_stream("SELECT id FROM users", batch_size=1)
+    next(batches)
+    batches.close()
+
+    stats = executor.pool_stats()
+    assert stats["in_use"] == 0
+    assert stats["idle"] == 1
+    mock_conn.rollback.assert_called_once()
+
+def test_parameterized_queries_reuse_prepared_statement():
+    mock_cursor = MagicMock()
+    mock_cursor.description = True
+    mock_cursor.fetchall.return_value = [(1,)]
+
+    mock_conn = MagicMock()
+    mock_conn.closed = 0
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+    executor = QueryExecutor({}, connection_factory=lambda: mock_conn)
+    template = "SELECT * FROM users WHERE id = %s LIMIT %s;"
+
+    executor.execute(template, (1, 10))
+    executor.execute(template, (2, 5))
+
+    statements = [c.args for c in mock_cursor.execute.call_args_list]
+    assert statements == [
+        ("PREPARE nl2sql_stmt_1 AS SELECT * FROM users WHERE id = $1 LIMIT $2",),
+        ("EXECUTE nl2sql_stmt_1 (%s, %s)", (1, 10)),
+        ("EXECUTE nl2sql_stmt_1 (%s, %s)", (2, 5)),
+    ]
+    assert dict(executor.prepared_statements(mock_conn)) == {template: "nl2sql_stmt_1"}
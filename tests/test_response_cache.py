@@ -0,0 +1,112 @@
+import sys
+import os
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.llm.response_cache import ResponseCache, ReplayMiss
+from src.llm.gemini_client import GeminiClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def fake_response(text):
+    part = SimpleNamespace(text=text)
+    return SimpleNamespace(parsed=None, candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+
+def make_client(cache, temperature=0.0):
+    with patch.dict(os.environ, {"GEMINI_API_KEY": "test"}), patch("src.llm.gemini_client.genai.Client") as client_cls:
+        client = GeminiClient(temperature=temperature, cache=cache)
+    return client, client_cls.return_value
+
+
+def test_key_depends_on_every_parameter():
+    base = ResponseCache.key("json", "gemini-2.5-flash", 0.0, 5000, "prompt")
+    assert base == ResponseCache.key("json", "gemini-2.5-flash", 0.0, 5000, "prompt")
+    assert base != ResponseCache.key("json", "gemini-2.5-flash", 0.0, 5000, "prompt!")
+    assert base != ResponseCache.key("json", "gemini-2.5-flash", 0.1, 5000, "prompt")
+    assert base != ResponseCache.key("json", "gemini-2.5-flash", 0.0, 4000, "prompt")
+    assert base != ResponseCache.key("json", "gemini-2.5-pro", 0.0, 5000, "prompt")
+    assert base != ResponseCache.key("stream", "gemini-2.5-flash", 0.0, 5000, "prompt")
+
+
+def test_entries_expire_by_age(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(str(tmp_path), max_age=60, clock=clock)
+    cache.put("k", {"value": "hello"})
+
+    clock.now += 59
+    assert cache.get("k")["value"] == "hello"
+    clock.now += 2
+    assert cache.get("k") is None
+    assert cache.stats()["expired"] == 1 and cache.stats()["entries"] == 0
+
+
+def test_size_limit_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=8_000)
+    for n in range(3):
+        cache.put(f"k{n}", {"value": os.urandom(2_000).hex()})
+        os.utime(cache._path(f"k{n}"), (n, n))
+    cache.get("k0")  # k0 pasa a ser la más reciente
+    cache.put("k3", {"value": os.urandom(2_000).hex()})
+
+    assert cache.get("k1") is None
+    assert cache.get("k0") is not None and cache.get("k3") is not None
+    assert cache.stats()["size_bytes"] <= 8_000
+
+
+def test_client_caches_deterministic_calls(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    client, api = make_client(cache)
+    api.models.generate_content.return_value = fake_response('{"a": 1}')
+
+    assert client.generate_json("prompt") == '{"a": 1}'
+    assert client.generate_json("prompt") == '{"a": 1}'
+    assert client.generate("prompt") == '{"a": 1}'
+    assert client.generate("prompt") == '{"a": 1}'
+    assert api.models.generate_content.call_count == 2  # una por tipo de llamada
+
+    hot, hot_api = make_client(cache, temperature=0.7)
+    hot_api.models.generate_content.return_value = fake_response("x")
+    hot.generate("prompt")
+    hot.generate("prompt")
+    assert hot_api.models.generate_content.call_count == 2  # no se cachea
+
+
+def test_stream_is_recorded_and_replayed_offline(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_temperature=None)
+    client, api = make_client(cache, temperature=0.5)
+    api.models.generate_content_stream.return_value = iter([fake_response("SELECT "), fake_response("1;")])
+    assert list(client.generate_stream("q")) == ["SELECT ", "1;"]
+
+    with patch.dict(os.environ, {}, clear=True), patch("src.llm.gemini_client.genai.Client") as client_cls:
+        offline = GeminiClient(temperature=0.5, cache=cache, replay_only=True)
+        assert list(offline.generate_stream("q")) == ["SELECT ", "1;"]
+        with pytest.raises(ReplayMiss):
+            offline.generate("not recorded")
+    client_cls.assert_not_called()
+
+
+def test_partial_stream_is_not_recorded(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    client, api = make_client(cache)
+    api.models.generate_content_stream.return_value = iter([fake_response("a"), fake_response("b")])
+
+    stream = client.generate_stream("q")
+    assert next(stream) == "a"
+    stream.close()
+    assert cache.stats()["entries"] == 0
+
+
+def test_replay_only_requires_cache():
+    with pytest.raises(ValueError):
+        GeminiClient(replay_only=True)
@@ -0,0 +1,76 @@
+import sys
+import os
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.schema_cache import SchemaCache
+
+DDL = """
+CREATE TABLE companies (id INT PRIMARY KEY, name VARCHAR(100) NOT NULL);
+CREATE TABLE employees (id INT PRIMARY KEY, company_id INT REFERENCES companies(id));
+"""
+
+
+def test_second_open_skips_parsing(tmp_path):
+    cache = SchemaCache(directory=str(tmp_path))
+    tables, schema = cache.get_or_parse(DDL)
+
+    with patch("src.schema_cache.parse_ddl_text") as parse:
+        cached_tables, cached_schema = SchemaCache(directory=str(tmp_path)).get_or_parse(DDL)
+
+    parse.assert_not_called()
+    assert cached_tables == tables
+    assert cached_schema == schema
+    assert set(schema["tables"]) == {"companies", "employees"}
+
+
+def test_key_depends_on_text_and_parser_version():
+    key = SchemaCache.key(DDL)
+
+    assert SchemaCache.key(DDL + " ") != key
+    with patch("src.schema_cache.PARSER_VERSION", -1):
+        assert SchemaCache.key(DDL) != key
+
+
+def test_key_depends_on_converter_and_entry_version():
+    key = SchemaCache.key(DDL)
+
+    with patch("src.schema_cache.CONVERTER_VERSION", -1):
+        assert SchemaCache.key(DDL) != key
+    with patch("src.schema_cache.ENTRY_VERSION", -1):
+        assert SchemaCache.key(DDL) != key
+
+
+def test_stats_and_corrupt_entries(tmp_path):
+    cache = SchemaCache(directory=str(tmp_path))
+    cache.get_or_parse(DDL)
+    cache.get_or_parse(DDL)
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["writes"]) == (1, 1, 1)
+    assert stats["entries"] == 1
+    assert stats["hit_rate"] == 0.5
+
+    with open(cache._path(cache.key(DDL)), "wb") as f:
+        f.write(b"not zlib")
+    tables, _ = cache.get_or_parse(DDL)
+
+    assert len(tables) == 2
+    assert cache.stats()["errors"] == 1
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = SchemaCache(directory=str(tmp_path))
+    ddls = [f"CREATE TABLE t{i} (id INT PRIMARY KEY);" for i in range(3)]
+    for i, ddl in enumerate(ddls):
+        cache.get_or_parse(ddl)
+        os.utime(cache._path(cache.key(ddl)), (i, i))
+    os.utime(cache._path(cache.key(ddls[0])), (10, 10))  # t0 es la más reciente
+
+    cache.max_bytes = cache.stats()["size_bytes"] - 1
+    cache._evict()
+
+    assert cache.get(cache.key(ddls[1])) is None
+    assert cache.get(cache.key(ddls[0])) is not None
+    assert cache.stats()["evictions"] == 1
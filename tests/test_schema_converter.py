@@ -1,6 +1,8 @@
 import os
 import sys
 
+import pytest
+
 # 1️⃣ Determinar el directorio raíz del proyecto
 base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -9,7 +11,17 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 # 3️⃣ Ahora sí importar
 from src.ddl_parser import parse_ddl_file, tables_dependency_order
-from src.schema_converter import schema_to_json, save_schema_json
+from src.schema_converter import (
+    schema_to_json,
+    save_schema_json,
+    schema_to_dict,
+    schema_dict_to_binary,
+    save_schema_binary,
+    load_schema_binary,
+    SchemaFile,
+    TABLES_PER_PAGE,
+)
+from src.ddl_parser import parse_ddl_text
 
 ddl_path = os.path.join(base_dir, "src", "ddl", "company_employee_schema.ddl")
 output_path = os.path.join(base_dir, "schema_output.json")
@@ -29,6 +41,41 @@ def test_schema_conversion():
     save_schema_json(tables, output_path)
     assert os.path.exists(output_path)
 
+def test_binary_schema_round_trips_exactly(tmp_path):
+    tables = parse_ddl_file(ddl_path)
+    path = str(tmp_path / "schema.bin")
+    save_schema_binary(tables, path)
+
+    loaded = load_schema_binary(path)
+
+    assert loaded == schema_to_dict(tables)
+    assert __import__("json").dumps(loaded) == schema_to_json(tables, indent=None)
+
+def test_binary_schema_loads_single_tables_lazily(tmp_path):
+    ddl = "".join(f"CREATE TABLE t{i} (id INT PRIMARY KEY, name VARCHAR(20));\n" for i in range(TABLES_PER_PAGE * 3))
+    schema = schema_to_dict(parse_ddl_text(ddl))
+    # el resto de las claves se conserva, en su orden
+    schema = {"meta": {"version": 1, "note": None}, **schema}
+    path = tmp_path / "schema.bin"
+    path.write_bytes(schema_dict_to_binary(schema))
+
+    with SchemaFile(str(path)) as schema_file:
+        assert len(schema_file) == TABLES_PER_PAGE * 3
+        assert "t40" in schema_file and "missing" not in schema_file
+        assert schema_file.table("t40") == schema["tables"]["t40"]
+        assert len(schema_file._loaded) == 1  # sólo la página de t40
+
+        full = schema_file.to_dict()
+        assert list(full) == ["meta", "tables"]
+        assert full == schema
+
+def test_binary_schema_rejects_other_files(tmp_path):
+    path = tmp_path / "schema.json"
+    path.write_text('{"tables": {}}')
+
+    with pytest.raises(ValueError):
+        SchemaFile(str(path))
+
 # Permite ejecutarlo manualmente también
 if __name__ == "__main__":
     tables = parse_ddl_file(ddl_path)
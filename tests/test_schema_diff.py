@@ -0,0 +1,86 @@
+import sys
+import os
+import sqlite3
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.ddl_parser import parse_ddl_text
+from src.schema_converter import schema_to_dict, table_to_dict
+from src.schema_diff import diff_schemas, update_schema_dict, sqlite_migration
+from src.db import sqlite_manager
+
+OLD_DDL = """
+CREATE TABLE companies (id INT PRIMARY KEY, name VARCHAR(100) NOT NULL);
+CREATE TABLE employees (
+    id INT PRIMARY KEY,
+    company_id INT, -- foreign key to companies table
+    salary DECIMAL(10,2),
+    nickname TEXT
+);
+CREATE TABLE legacy (id INT);
+"""
+
+NEW_DDL = """
+CREATE TABLE companies (id INT PRIMARY KEY,   name VARCHAR(100) NOT NULL); -- reformatted
+CREATE TABLE employees (
+    id INT PRIMARY KEY,
+    company_id INT, -- foreign key to companies table
+    salary DECIMAL(12,2) NOT NULL,
+    email VARCHAR(255) UNIQUE
+);
+CREATE TABLE projects (id INT PRIMARY KEY, title TEXT);
+"""
+
+
+def test_diff_reports_tables_and_columns():
+    diff = diff_schemas(parse_ddl_text(OLD_DDL), parse_ddl_text(NEW_DDL))
+
+    assert diff.added_tables == ["projects"]
+    assert diff.removed_tables == ["legacy"]
+    assert list(diff.changed_tables) == ["employees"]  # companies sólo cambió el formato
+
+    employees = diff.changed_tables["employees"]
+    assert employees.added_columns == ["email"]
+    assert employees.removed_columns == ["nickname"]
+    assert employees.changed_columns == {
+        "salary": {"type": ("DECIMAL(10,2)", "DECIMAL(12,2)"), "not_null": (False, True)},
+    }
+    assert diff.stale_tables() == ["projects", "employees"]
+    assert diff_schemas(parse_ddl_text(OLD_DDL), parse_ddl_text(OLD_DDL)).is_empty
+
+
+def test_update_schema_dict_only_converts_stale_tables():
+    old_tables = parse_ddl_text(OLD_DDL)
+    new_tables = parse_ddl_text(NEW_DDL)
+    old_schema = schema_to_dict(old_tables)
+    diff = diff_schemas(old_tables, new_tables)
+
+    with patch("src.schema_diff.table_to_dict", wraps=table_to_dict) as convert:
+        updated = update_schema_dict(old_schema, new_tables, diff)
+
+    assert [call.args[0].name for call in convert.call_args_list] == ["employees", "projects"]
+    assert updated == schema_to_dict(new_tables)
+    assert list(updated["tables"]) == ["companies", "employees", "projects"]
+    assert updated["tables"]["companies"] is old_schema["tables"]["companies"]
+
+
+def test_sqlite_migration_updates_fixture_tables(tmp_path):
+    old_tables = parse_ddl_text(OLD_DDL)
+    new_tables = parse_ddl_text(NEW_DDL)
+    diff = diff_schemas(old_tables, new_tables)
+    statements = sqlite_migration(diff, schema_to_dict(new_tables))
+
+    db_file = tmp_path / "fixtures.db"
+    with patch.object(sqlite_manager, "DB_FILE", db_file):
+        sqlite_manager.create_table_if_not_exists("employees", [{"id": "1", "company_id": "1", "salary": "10", "nickname": "x"}])
+        sqlite_manager.create_table_if_not_exists("legacy", [{"id": "1"}])
+        sqlite_manager.apply_migration(statements)
+
+    connection = sqlite3.connect(db_file)
+    tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    columns = [row[1] for row in connection.execute('PRAGMA table_info("employees")')]
+    connection.close()
+
+    assert tables == {"employees", "projects"}
+    assert columns == ["id", "company_id", "salary", "email"]
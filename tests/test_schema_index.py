@@ -0,0 +1,104 @@
+import sys
+import os
+import pytest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.ddl_parser import parse_ddl_text
+from src.schema_converter import load_schema_binary, schema_to_index, schema_dict_to_binary, schema_to_dict
+from src.schema_index import SchemaIndex
+from src.intent_parser import IntentParser
+from src.generator import DataGenerator
+from src.instruction_engine import InstructionEngine
+
+DDL = """
+CREATE TABLE employees (
+    id INT PRIMARY KEY,
+    company_id INT,
+    name VARCHAR(100),
+    FOREIGN KEY (company_id) REFERENCES companies(id)
+);
+CREATE TABLE companies (id INT PRIMARY KEY, name VARCHAR(100), created_at DATE);
+CREATE TABLE projects (
+    id INT PRIMARY KEY,
+    company_id INT,
+    lead_id INT,
+    FOREIGN KEY (company_id) REFERENCES companies(id),
+    FOREIGN KEY (lead_id) REFERENCES employees(id)
+);
+"""
+
+
+def make_index():
+    return schema_to_index(parse_ddl_text(DDL))
+
+
+def test_lookups_and_foreign_keys():
+    index = make_index()
+
+    assert index.table_names == ("employees", "companies", "projects")
+    assert index.resolve_table("COMPANIES") == "companies"
+    assert index.resolve_table("nope") is None
+    assert index.column("companies", "created_at")["type"] == "DATE"
+    assert index.columns("employees")["id"]["name"] == "id"
+    assert index.column_names == ("id", "company_id", "name", "created_at", "lead_id")
+    assert index.tables_with_column("company_id") == ("employees", "projects")
+
+    assert index.foreign_key_for("projects", "lead_id")["ref_table"] == "employees"
+    assert index.foreign_key_for("projects", "id") is None
+    assert [t for t, _ in index.referenced_by("companies")] == ["employees", "projects"]
+
+    assert index.levels == (("companies",), ("employees",), ("projects",))
+    assert index.order == ("companies", "employees", "projects")
+    assert index.cycles == ()
+
+
+def test_index_is_read_only():
+    index = make_index()
+    with pytest.raises(TypeError):
+        index.columns("companies")["extra"] = {}
+    with pytest.raises(AttributeError):
+        index.extra = 1
+
+
+def test_list_schema_is_indexed_like_converted_schema():
+    schema = {"tables": [
+        {"name": "Users", "columns": [{"name": "id", "type": "INT"}, {"name": "email"}]},
+    ]}
+    index = SchemaIndex(schema)
+
+    assert index.resolve_table("users") == "Users"
+    assert index.to_dict()["tables"]["Users"]["columns"] == {"id": {"type": "INT"}, "email": {}}
+
+
+def test_consumers_share_one_index():
+    index = make_index()
+
+    with patch("src.schema_index.analyze_dependency_graph") as analyze:
+        parser = IntentParser(index)
+        engine = InstructionEngine(index)
+        generator = DataGenerator(index)
+    analyze.assert_not_called()
+
+    assert parser.index is engine.index is generator.index is index
+    assert parser.parse("show companies")["table"] == "companies"
+    assert list(generator.generate(num_rows=2)) == ["companies", "employees", "projects"]
+    with pytest.raises(ValueError):
+        engine.add_override("companies", "missing", {"type": "fixed", "value": 1})
+
+
+def test_binary_accepts_index(tmp_path):
+    index = make_index()
+    path = tmp_path / "schema.bin"
+    path.write_bytes(schema_dict_to_binary(index))
+    assert load_schema_binary(str(path)) == schema_to_dict(parse_ddl_text(DDL))
+
+
+def test_generator_rejects_cycles():
+    schema = schema_to_dict(parse_ddl_text("""
+    CREATE TABLE a (id INT PRIMARY KEY, b_id INT, FOREIGN KEY (b_id) REFERENCES b(id));
+    CREATE TABLE b (id INT PRIMARY KEY, a_id INT, FOREIGN KEY (a_id) REFERENCES a(id));
+    """))
+    with pytest.raises(ValueError):
+        DataGenerator(schema).generate(num_rows=1)
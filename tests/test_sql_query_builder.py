@@ -61,12 +61,13 @@ def test_average_with_group_by(builder):
         "action": "aggregate",
         "table": "Employees",
         "metric": "avg",
+        "columns": ["salary"],
         "group_by": "department_id",
     }
 
     sql = builder.build(intent)
     assert sql == (
-        "SELECT department_id, AVG(*) FROM Employees GROUP BY department_id;"
+        "SELECT department_id, AVG(salary) FROM Employees GROUP BY department_id;"
     )
 
 
@@ -78,5 +79,130 @@ def test_average_without_group_by(builder):
         "group_by": None,
     }
 
-    sql = builder.build(intent)
-    assert sql == "SELECT AVG(*) FROM Employees;"
+    with pytest.raises(ValueError):
+        builder.build(intent)
+
+    assert builder.build({**intent, "columns": ["salary"]}) == "SELECT AVG(salary) FROM Employees;"
+    assert builder.build({**intent, "metric": "count"}) == "SELECT COUNT(*) FROM Employees;"
+
+
+# -------------------------
+# PARAMETERIZED
+# -------------------------
+
+def test_select_parameterized_shares_template(builder):
+    sql_5, params_5 = builder.build_parameterized(
+        {"action": "select", "table": "Employees", "limit": 5}
+    )
+    sql_20, params_20 = builder.build_parameterized(
+        {"action": "select", "table": "Employees", "limit": 20}
+    )
+
+    assert sql_5 == sql_20 == "SELECT * FROM Employees LIMIT %s;"
+    assert params_5 == (5,)
+    assert params_20 == (20,)
+
+
+def test_filters_are_parameterized(builder):
+    intent = {
+        "action": "count",
+        "table": "Employees",
+        "filters": [
+            {"column": "department_id", "op": "=", "value": 3},
+            {"column": "last_name", "op": "!=", "value": "O'Brien"},
+        ],
+    }
+
+    sql, params = builder.build_parameterized(intent)
+    assert sql == (
+        "SELECT COUNT(*) FROM Employees WHERE department_id = %s AND last_name != %s;"
+    )
+    assert params == (3, "O'Brien")
+
+    assert builder.build(intent) == (
+        "SELECT COUNT(*) FROM Employees "
+        "WHERE department_id = 3 AND last_name != 'O''Brien';"
+    )
+
+
+def test_invalid_identifier_rejected(builder):
+    with pytest.raises(ValueError):
+        builder.build({"action": "count", "table": "Employees; DROP TABLE x"})
+
+
+def test_select_projection_with_filters(builder):
+    intent = {
+        "action": "select",
+        "table": "Employees",
+        "columns": ["first_name", "salary"],
+        "filters": [{"column": "hire_date", "op": ">=", "value": "2021-01-01"}],
+        "limit": 10,
+    }
+
+    sql, params = builder.build_parameterized(intent)
+    assert sql == "SELECT first_name, salary FROM Employees WHERE hire_date >= %s LIMIT %s;"
+    assert params == ("2021-01-01", 10)
+
+
+def test_aggregate_uses_metric_column(builder):
+    intent = {
+        "action": "aggregate",
+        "table": "Employees",
+        "metric": "avg",
+        "columns": ["salary"],
+        "group_by": "department_id",
+    }
+
+    assert builder.build(intent) == (
+        "SELECT department_id, AVG(salary) FROM Employees GROUP BY department_id;"
+    )
+
+
+# -------------------------
+# Batches
+# -------------------------
+
+def test_build_batch_one_scan_per_table(builder):
+    sql, params, positions = builder.build_batch([
+        {"action": "count", "table": "Companies"},
+        {"action": "aggregate", "table": "Employees", "metric": "avg", "columns": ["salary"]},
+        {"action": "aggregate", "table": "Employees", "metric": "max", "columns": ["salary"]},
+    ])
+
+    assert sql == (
+        "SELECT * FROM (SELECT COUNT(*) AS c0 FROM Companies) AS b0 "
+        "CROSS JOIN (SELECT AVG(salary) AS c1, MAX(salary) AS c2 FROM Employees) AS b1;"
+    )
+    assert params == ()
+    assert positions == [0, 1, 2]
+
+
+def test_build_batch_uses_filter_clause_when_filters_differ(builder):
+    sql, params, positions = builder.build_batch([
+        {"action": "count", "table": "Employees", "filters": [{"column": "age", "op": ">", "value": 30}]},
+        {"action": "count", "table": "Companies"},
+        {"action": "aggregate", "table": "Employees", "metric": "sum", "columns": ["salary"]},
+    ])
+
+    assert sql == (
+        "SELECT * FROM (SELECT COUNT(*) FILTER (WHERE age > %s) AS c0, SUM(salary) AS c1 FROM Employees) AS b0 "
+        "CROSS JOIN (SELECT COUNT(*) AS c2 FROM Companies) AS b1;"
+    )
+    assert params == (30,)
+    assert positions == [0, 2, 1]
+
+
+def test_build_grouped_batch(builder):
+    sql, params = builder.build_grouped_batch([
+        {"action": "aggregate", "table": "Employees", "metric": "avg", "columns": ["salary"], "group_by": "department_id"},
+        {"action": "aggregate", "table": "Employees", "metric": "count", "group_by": "department_id"},
+    ])
+
+    assert sql == "SELECT department_id, AVG(salary), COUNT(*) FROM Employees GROUP BY department_id;"
+    assert params == ()
+
+    with pytest.raises(ValueError):
+        builder.build_grouped_batch([
+            {"action": "aggregate", "table": "Employees", "metric": "avg", "group_by": "department_id"},
+            {"action": "aggregate", "table": "Employees", "metric": "avg", "group_by": "age"},
+        ])
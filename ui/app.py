@@ -6,7 +6,7 @@ ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT_DIR not in sys.path:
     sys.path.append(ROOT_DIR)
 
-from src.llm.gemini_client import GeminiClient
+from src.llm.client_registry import get_gemini_client
 from ui.sections.data_generation.data_generation import render_data_generation
 from ui.sections.chat_with_data.chat_with_data import render_chat
 from streamlit_option_menu import option_menu
@@ -16,7 +16,7 @@ load_dotenv()
 
 # Initialize session state
 if "llm" not in st.session_state:
-    st.session_state.llm = GeminiClient()
+    st.session_state.llm = get_gemini_client()
 
 if "schema" not in st.session_state:
     st.session_state.schema = {}
@@ -5,6 +5,7 @@ from src.llm.chat_with_data.sql_agent import SQLAgent
 from src.llm.chat_with_data.sql_executor import SQLExecutor
 from src.llm.chat_with_data.visualization import create_bar_plot
 from src.llm.chat_with_data.guardrails import detect_prompt_injection
+from src.cost_guard import CostGuard
 
 def render_chat():
     if "messages" not in st.session_state:
@@ -64,7 +65,9 @@ def render_chat():
 
                 sql = sql_text
 
-                executor = SQLExecutor()
+                executor = SQLExecutor(
+                    cost_guard=CostGuard(max_rows=10000)
+                )
 
                 df = None
 
@@ -72,6 +75,11 @@ def render_chat():
 
                     df = executor.run_query(sql)
 
+                    guard = df.attrs.get("cost_guard")
+
+                    if guard and (guard["action"] == "limit" or guard.get("warning")):
+                        st.info(guard["reason"])
+
                     st.dataframe(df)
 
                     fig = create_bar_plot(df)
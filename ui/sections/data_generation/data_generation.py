@@ -1,15 +1,19 @@
+import asyncio
+import logging
+import os
 import streamlit as st
 import json
 import pandas as pd
 import io
 import zipfile
 
-from src.llm.gemini_client import GeminiClient
-from src.llm.data_generation.prompt_builder import build_generation_prompt
-from src.llm.data_generation.response_parser import parse_llm_response
+from src.llm.async_gemini_client import get_async_gemini_client
+from src.llm.data_generation.chunked_generation import DEFAULT_ROWS_PER_CHUNK, generate_rows
 from src.utils.table_detector import detect_table_name
 from src.db.sqlite_manager import create_table_if_not_exists, insert_rows
 
+logger = logging.getLogger(__name__)
+
 def render_advanced_parameters():
     st.subheader("Advanced Parameters")
 
@@ -19,6 +23,12 @@ def render_advanced_parameters():
     if "max_tokens" not in st.session_state:
         st.session_state.max_tokens = 2500
 
+    if "num_rows" not in st.session_state:
+        st.session_state.num_rows = 10
+
+    if "rows_per_chunk" not in st.session_state:
+        st.session_state.rows_per_chunk = DEFAULT_ROWS_PER_CHUNK
+
     col1, col2 = st.columns(2)
 
     with col1:
@@ -39,6 +49,27 @@ def render_advanced_parameters():
             key="max_tokens"
         )
 
+    col3, col4 = st.columns(2)
+
+    with col3:
+        st.number_input(
+            label="Rows",
+            min_value=1,
+            max_value=10000,
+            step=10,
+            key="num_rows"
+        )
+
+    # Más filas que rows_per_chunk se piden en varios llamados en paralelo
+    with col4:
+        st.number_input(
+            label="Rows per LLM call",
+            min_value=1,
+            max_value=500,
+            step=10,
+            key="rows_per_chunk"
+        )
+
 def render_data_generation():
     # Prompt
     prompt = st.text_area(
@@ -116,6 +147,8 @@ def render_data_generation():
                         schema=schema,
                         temperature=st.session_state.temperature,
                         max_tokens=st.session_state.max_tokens,
+                        num_rows=st.session_state.num_rows,
+                        rows_per_chunk=st.session_state.rows_per_chunk,
                     )
                 except Exception as e:
                     st.session_state.error = str(e)
@@ -204,31 +237,31 @@ def render_data_generation():
         "schema": schema,
         "temperature": st.session_state.temperature,
         "max_tokens": st.session_state.max_tokens,
+        "num_rows": st.session_state.num_rows,
     }
 
-def generate_data(prompt, schema, temperature, max_tokens):
-    client = GeminiClient(
-        temperature=temperature,
-        max_tokens=max_tokens,
-    )
-
-    llm_prompt = build_generation_prompt(
-        schema=schema,
-        user_prompt=prompt,
-        rows_per_table=10,
+def generate_data(prompt, schema, temperature, max_tokens, num_rows=10, rows_per_chunk=DEFAULT_ROWS_PER_CHUNK):
+    # cliente compartido: temperature y max_tokens van en cada llamada; los
+    # RESOURCE_EXHAUSTED se reintentan con backoff antes de fallar
+    client = get_async_gemini_client(
+        requests_per_minute=float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "0")) or None,
     )
 
     try:
-        raw_response = client.generate_json(llm_prompt)
-        data = parse_llm_response(raw_response)
-
-        if "data" not in data:
-            raise ValueError("JSON does not contain 'data' key")
-        
-        rows = data["data"]
-
         table_name = detect_table_name(prompt, schema)
 
+        # num_rows > rows_per_chunk: varios prompts en paralelo, ids renumerados
+        rows = asyncio.run(generate_rows(
+            client,
+            schema=schema,
+            user_prompt=prompt,
+            total_rows=num_rows,
+            rows_per_chunk=rows_per_chunk,
+            table_name=table_name,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        ))
+
         create_table_if_not_exists(table_name, rows)
         insert_rows(table_name, rows)
 
@@ -239,21 +272,22 @@ def generate_data(prompt, schema, temperature, max_tokens):
 
     except Exception as e:
         msg = str(e)
-
-        print("\n" + "=" * 80)
-        print("MESSAGE EXCEPTION")
-        print(msg)
-        print("=" * 80)
+        logger.exception("Data generation failed")
 
         if "quota" in msg.lower() or "resource_exhausted" in msg.lower():
             raise RuntimeError(
                 "Gemini quota exceeded. Please wait or upgrade your plan."
-            )
+            ) from e
 
-        raise RuntimeError(
-            "The AI returned an invalid response.\n"
-            "Try simplifying your prompt or reducing max tokens."
-        )
+        if isinstance(e, ValueError):
+            # parse_llm_response / generate_rows: JSON inválido o sin "data"
+            raise RuntimeError(
+                "The AI returned an invalid response.\n"
+                "Try simplifying your prompt or reducing max tokens."
+            ) from e
+
+        # cualquier otro error (red, SQLite, ...) se muestra tal cual
+        raise RuntimeError(f"Data generation failed: {msg}") from e
 
 def export_csv(data: list) -> str:
     df = pd.DataFrame(data)